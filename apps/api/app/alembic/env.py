@@ -28,7 +28,7 @@ from sqlalchemy import make_url
 
 # Import Base and models
 from app.db.base import Base
-from app.models import user  # noqa: F401
+from app.models import backtest, ohlcv, user  # noqa: F401
 
 from app.core.config import get_settings
 
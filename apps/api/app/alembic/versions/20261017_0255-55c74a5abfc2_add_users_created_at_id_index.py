@@ -0,0 +1,29 @@
+"""Mako template for Alembic migration scripts."""
+"""Add users created_at id index
+
+Revision ID: 55c74a5abfc2
+Revises: 4283aa44782d
+Create Date: 2026-10-17 02:55:17.422252
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '55c74a5abfc2'
+down_revision: Union[str, None] = '4283aa44782d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database."""
+    # Supports keyset pagination ordered by (created_at, id)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database."""
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,42 @@
+"""Add ohlcv_data
+
+Revision ID: 7d1e0b6c9a42
+Revises: 55c74a5abfc2
+Create Date: 2026-10-17 14:00:41.108394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1e0b6c9a42'
+down_revision: Union[str, None] = '55c74a5abfc2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database."""
+    op.create_table('ohlcv_data',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('symbol', sa.String(length=20), nullable=False),
+    sa.Column('timeframe', sa.String(length=10), nullable=False),
+    sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('open', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('high', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('low', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('close', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('volume', sa.Numeric(precision=30, scale=8), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('symbol', 'timeframe', 'timestamp', name='uq_ohlcv_symbol_time')
+    )
+    op.create_index('idx_ohlcv_timestamp', 'ohlcv_data', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database."""
+    op.drop_index('idx_ohlcv_timestamp', table_name='ohlcv_data')
+    op.drop_table('ohlcv_data')
@@ -0,0 +1,57 @@
+"""Add backtests
+
+Revision ID: b3f8e21d5c07
+Revises: 7d1e0b6c9a42
+Create Date: 2026-10-17 16:00:12.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8e21d5c07'
+down_revision: Union[str, None] = '7d1e0b6c9a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database."""
+    op.create_table('backtests',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('symbol', sa.String(length=20), nullable=True),
+    sa.Column('timeframe', sa.String(length=10), nullable=True),
+    sa.Column('start_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('request', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.SmallInteger(), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('initial_capital', sa.Numeric(precision=20, scale=8), nullable=False),
+    sa.Column('final_capital', sa.Numeric(precision=20, scale=8), nullable=True),
+    sa.Column('total_return_bp', sa.Integer(), nullable=True),
+    sa.Column('mdd_bp', sa.Integer(), nullable=True),
+    sa.Column('win_rate_bp', sa.Integer(), nullable=True),
+    sa.Column('sharpe_ratio', sa.Numeric(precision=10, scale=4), nullable=True),
+    sa.Column('trade_count', sa.Integer(), nullable=True),
+    sa.Column('result', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint('total_return_bp >= -10000', name='ck_backtests_total_return_bp'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_backtests_user_id', 'backtests', ['user_id', 'created_at'], unique=False)
+    op.create_index('idx_backtests_status', 'backtests', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database."""
+    op.drop_index('idx_backtests_status', table_name='backtests')
+    op.drop_index('idx_backtests_user_id', table_name='backtests')
+    op.drop_table('backtests')
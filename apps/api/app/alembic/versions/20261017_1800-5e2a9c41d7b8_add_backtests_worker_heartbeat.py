@@ -0,0 +1,31 @@
+"""Mako template for Alembic migration scripts."""
+"""Add backtests worker heartbeat
+
+Revision ID: 5e2a9c41d7b8
+Revises: b3f8e21d5c07
+Create Date: 2026-10-17 18:00:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c41d7b8'
+down_revision: Union[str, None] = 'b3f8e21d5c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database."""
+    op.add_column('backtests', sa.Column('worker_id', sa.String(length=64), nullable=True))
+    op.add_column('backtests', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database."""
+    op.drop_column('backtests', 'heartbeat_at')
+    op.drop_column('backtests', 'worker_id')
@@ -1,9 +1,10 @@
 """API v1 router."""
 from fastapi import APIRouter
 
-from app.api.v1 import auth, users
+from app.api.v1 import auth, backtests, users
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router)
 api_router.include_router(users.router)
+api_router.include_router(backtests.router)
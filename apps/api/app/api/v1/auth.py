@@ -5,12 +5,17 @@ from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
-from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.config import get_settings
-from app.core.deps import get_db
+from app.core.deps import get_current_active_user, get_db, get_refresh_tokens, token_user_id
+from app.core.principal_cache import Principal
+from app.core.refresh_tokens import RefreshTokenStore
+from app.core.responses import FastJSONResponse
+from app.core.security import verify_token
+from app.models.user import User as UserModel
 from app.schemas.user import LoginRequest, RefreshTokenRequest, Token, UserCreate, User
 from app.services.auth import authenticate_user, create_tokens, register_user
+from app.services.user import get_user_by_id
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -18,32 +23,42 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _token_response(tokens: Token) -> FastJSONResponse:
+    """Serialize tokens and set refresh_token as httpOnly cookie."""
+    response = FastJSONResponse(tokens)
+    response.set_cookie(
+        key="refresh_token",
+        value=tokens.refresh_token,
+        httponly=True,
+        secure=settings.ENVIRONMENT == "production",  # Only send over HTTPS in production
+        samesite="lax",
+        max_age=int(timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS).total_seconds()),
+        path="/",
+    )
+    return response
+
+
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
 async def register(
     user_in: UserCreate,
     db: AsyncSession = Depends(get_db),
-):
+) -> UserModel:
     """Register a new user."""
-    # Check if user already exists
-    from app.services.user import get_user_by_email
-
-    existing_user = await get_user_by_email(db, user_in.email)
-    if existing_user:
+    user = await register_user(db, user_in)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-
-    user = await register_user(db, user_in)
     return user
 
 
 @router.post("/login", response_model=Token)
 async def login(
     login_in: LoginRequest,
-    response: Response,
     db: AsyncSession = Depends(get_db),
-):
+    token_store: RefreshTokenStore = Depends(get_refresh_tokens),
+) -> FastJSONResponse:
     """
     Login with email and password.
 
@@ -64,43 +79,29 @@ async def login(
             detail="Inactive user",
         )
 
-    tokens = await create_tokens(user)
-
-    # Set refresh_token as httpOnly cookie
-    response.set_cookie(
-        key="refresh_token",
-        value=tokens.refresh_token,
-        httponly=True,
-        secure=settings.ENVIRONMENT == "production",  # Only send over HTTPS in production
-        samesite="lax",
-        max_age=int(timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS).total_seconds()),
-        path="/",
-    )
+    tokens = await create_tokens(user, await token_store.issue(str(user.id)))
 
     logger.info(f"User logged in: {user.email}")
 
-    return tokens
+    return _token_response(tokens)
 
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
+    request: Request,
     refresh_in: RefreshTokenRequest | None = None,
-    response: Response = None,
     db: AsyncSession = Depends(get_db),
-    request: Request = None,
-):
+    token_store: RefreshTokenStore = Depends(get_refresh_tokens),
+) -> FastJSONResponse:
     """
     Refresh access token using refresh token.
 
     Refresh token can be provided in request body or as httpOnly cookie.
+    Each refresh token is single use: it is rotated for a new one, and
+    presenting it again revokes the whole session.
     """
-    from app.core.security import verify_token
-    from app.services.user import get_user_by_id
-
     # Get refresh token from cookie or request body
-    refresh_token = None
-    if request:
-        refresh_token = request.cookies.get("refresh_token")
+    refresh_token = request.cookies.get("refresh_token")
 
     if refresh_in and refresh_in.refresh_token:
         refresh_token = refresh_in.refresh_token
@@ -117,9 +118,16 @@ async def refresh_token(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
+    user_id = token_user_id(payload)
+
+    # Rotation, reuse detection and revocation checks in one Redis round trip
+    refresh_claims = await token_store.rotate(payload)
+    if refresh_claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
 
-    user_id = payload.get("sub")
-    # Fixed: user_id is string UUID, don't cast to int
     user = await get_user_by_id(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(
@@ -127,36 +135,59 @@ async def refresh_token(
             detail="User not found or inactive",
         )
 
-    tokens = await create_tokens(user)
-
-    # Update refresh_token cookie
-    if response:
-        response.set_cookie(
-            key="refresh_token",
-            value=tokens.refresh_token,
-            httponly=True,
-            secure=settings.ENVIRONMENT == "production",
-            samesite="lax",
-            max_age=int(timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS).total_seconds()),
-            path="/",
-        )
+    tokens = await create_tokens(user, refresh_claims)
 
     logger.info(f"Token refreshed for user: {user.email}")
 
-    return tokens
+    return _token_response(tokens)
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+    request: Request,
+    response: Response,
+    refresh_in: RefreshTokenRequest | None = None,
+    token_store: RefreshTokenStore = Depends(get_refresh_tokens),
+) -> dict[str, str]:
     """
-    Logout user by clearing refresh_token cookie.
+    Logout user by revoking the refresh token session and clearing the cookie.
 
-    Note: In a production system, you should also invalidate the token
-    in Redis or a token blacklist.
+    Other sessions of the same user stay signed in; use /logout/all for those.
     """
+    refresh_token = request.cookies.get("refresh_token")
+    if refresh_in and refresh_in.refresh_token:
+        refresh_token = refresh_in.refresh_token
+
+    payload = verify_token(refresh_token) if refresh_token else None
+    if payload is not None and payload.get("type") == "refresh":
+        await token_store.revoke_family(payload)
+
     response.delete_cookie(
         key="refresh_token",
         path="/",
     )
 
     return {"message": "Successfully logged out"}
+
+
+@router.post("/logout/all")
+async def logout_all(
+    response: Response,
+    current_user: Principal = Depends(get_current_active_user),
+    token_store: RefreshTokenStore = Depends(get_refresh_tokens),
+) -> dict[str, str]:
+    """
+    Log out everywhere by revoking every refresh token of the current user.
+
+    Access tokens already issued remain valid until they expire.
+    """
+    await token_store.revoke_user(current_user.id)
+
+    response.delete_cookie(
+        key="refresh_token",
+        path="/",
+    )
+
+    logger.info(f"User logged out everywhere: {current_user.email}")
+
+    return {"message": "Successfully logged out from all sessions"}
@@ -0,0 +1,252 @@
+"""Backtest endpoints."""
+import json
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import defer
+
+from app.core.deps import (
+    get_backtest_jobs,
+    get_backtest_optimizer,
+    get_current_active_user,
+    get_db,
+    get_indicator_cache,
+    get_job_events,
+    get_ohlcv_store,
+    get_session_maker,
+)
+from app.core.job_events import JobEventBroker
+from app.core.principal_cache import Principal
+from app.core.responses import FastJSONResponse
+from app.models.backtest import Backtest
+from app.schemas.backtest import (
+    BacktestJob,
+    BacktestJobSummary,
+    BacktestRequest,
+    BacktestResult,
+    BacktestSubmitted,
+    OptimizationRequest,
+    OptimizationResult,
+)
+from app.services.backtest import run_backtest
+from app.services.backtest_jobs import ACTIVE_STATUSES, BacktestJobManager, get_backtest
+from app.services.indicator_cache import IndicatorCache
+from app.services.ohlcv_store import OHLCVStore
+from app.services.optimizer import BacktestOptimizer
+
+router = APIRouter(prefix="/backtests", tags=["Backtests"])
+
+
+@router.post("/run", response_model=BacktestResult)
+async def run_backtest_endpoint(
+    request: BacktestRequest,
+    store: OHLCVStore = Depends(get_ohlcv_store),
+    cache: IndicatorCache = Depends(get_indicator_cache),
+    _: Principal = Depends(get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Run a backtest on candles sent in the request body or a stored range.
+
+    Stored ranges are read from the memory-mapped OHLCV store (sliced by
+    timestamp without copying), so long histories cost no request payload,
+    and their indicators come from a cache shared by all users.
+
+    The simulation is vectorized with NumPy and runs in the thread pool, so
+    the event loop stays free while it computes.
+    """
+    try:
+        result = await run_in_threadpool(run_backtest, request, store, cache)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Built from validated models, so skip response_model re-validation
+    return FastJSONResponse(result)
+
+
+@router.post("/optimize", response_model=OptimizationResult)
+async def optimize_backtest(
+    request: OptimizationRequest,
+    store: OHLCVStore = Depends(get_ohlcv_store),
+    cache: IndicatorCache = Depends(get_indicator_cache),
+    optimizer: BacktestOptimizer = Depends(get_backtest_optimizer),
+    _: Principal = Depends(get_current_active_user),
+) -> FastJSONResponse:
+    """
+    Sweep strategy parameters over a grid or random samples and rank them.
+
+    Candles are loaded and each distinct indicator computed once for all
+    candidates; the candidates are then simulated in parallel batches by
+    worker processes reading the data from shared memory. With
+    ``walk_forward``, rows are ranked by out-of-sample results.
+    """
+    try:
+        result = await optimizer.optimize(request, store, cache)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse(result)
+
+
+@router.post("/", response_model=BacktestSubmitted, status_code=status.HTTP_202_ACCEPTED)
+async def submit_backtest(
+    request: BacktestRequest,
+    current_user: Principal = Depends(get_current_active_user),
+    jobs: BacktestJobManager = Depends(get_backtest_jobs),
+) -> BacktestSubmitted:
+    """
+    Queue a backtest and return its ID at once.
+
+    The backtest runs in a worker pool; follow it with
+    GET /backtests/{id}/events and fetch the result from GET /backtests/{id}.
+    """
+    backtest_id = await jobs.submit(current_user.id, request)
+    return BacktestSubmitted(backtest_id=backtest_id, status="QUEUED")
+
+
+@router.get("/", response_model=list[BacktestJobSummary])
+async def list_backtests(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> Sequence[Backtest]:
+    """List the current user's backtests, newest first (without results)."""
+    result = await db.execute(
+        select(Backtest)
+        .options(defer(Backtest.request), defer(Backtest.result))
+        .where(Backtest.user_id == UUID(current_user.id))
+        .order_by(Backtest.created_at.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+@router.get("/{backtest_id}", response_model=BacktestJob)
+async def read_backtest(
+    backtest_id: UUID,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Get a backtest's state, and its result once completed."""
+    backtest = await get_backtest(db, backtest_id, current_user.id)
+    if backtest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backtest not found")
+    return FastJSONResponse(BacktestJob.model_validate(backtest))
+
+
+@router.post("/{backtest_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+async def cancel_backtest(
+    backtest_id: UUID,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    jobs: BacktestJobManager = Depends(get_backtest_jobs),
+) -> dict[str, str]:
+    """Cancel a queued or running backtest (a running one stops at its next stage)."""
+    backtest = await get_backtest(db, backtest_id, current_user.id)
+    if backtest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backtest not found")
+    if not await jobs.cancel(backtest_id):
+        # Report the state it finished in, not the one read before cancelling
+        await db.refresh(backtest)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Backtest already {backtest.status.lower()}",
+        )
+    return {"message": "Backtest cancellation requested"}
+
+
+@router.delete("/{backtest_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_backtest(
+    backtest_id: UUID,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    jobs: BacktestJobManager = Depends(get_backtest_jobs),
+) -> Response:
+    """Delete a backtest, cancelling it first if it hasn't finished."""
+    backtest = await get_backtest(db, backtest_id, current_user.id)
+    if backtest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backtest not found")
+    if backtest.status in ACTIVE_STATUSES:
+        await jobs.cancel(backtest_id)
+    await db.delete(backtest)
+    await db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _sse(event: dict[str, Any]) -> str:
+    """Format a job event as a server-sent event."""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def _final_event(backtest: Backtest) -> dict[str, Any]:
+    """Terminal job event rebuilt from a finished backtest row."""
+    event: dict[str, Any] = {
+        "event": backtest.status.lower(),
+        "status": backtest.status,
+        "progress": backtest.progress,
+    }
+    if backtest.status == "COMPLETED" and backtest.result is not None:
+        event["metrics"] = backtest.result["metrics"]
+    elif backtest.status == "FAILED":
+        event["error"] = backtest.error_message
+    return event
+
+
+@router.get("/{backtest_id}/events")
+async def stream_backtest_events(
+    backtest_id: UUID,
+    current_user: Principal = Depends(get_current_active_user),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+    events: JobEventBroker = Depends(get_job_events),
+    jobs: BacktestJobManager = Depends(get_backtest_jobs),
+) -> StreamingResponse:
+    """
+    Stream a backtest's progress as server-sent events.
+
+    Sends the current state first, then "progress" events (stage and
+    percent) until a final "completed" (with metrics), "failed" or
+    "cancelled" event. Comment lines keep idle connections open; while
+    idle, the row is re-checked so the stream also ends when the job
+    finished unseen (e.g. in another API process) or its process died.
+    """
+
+    async def load() -> Backtest | None:
+        # Own session: the stream can outlive the request's session by minutes
+        async with session_maker() as session:
+            return await get_backtest(session, backtest_id, current_user.id)
+
+    found = await load()
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backtest not found")
+    backtest: Backtest = found
+    if backtest.status in ACTIVE_STATUSES and await jobs.reap_stale(backtest_id):
+        backtest = await load() or backtest
+
+    async def stream() -> AsyncIterator[str]:
+        if backtest.status not in ACTIVE_STATUSES:
+            yield _sse(_final_event(backtest))
+            return
+        job_id = str(backtest_id)
+        if await events.latest(job_id) is None:
+            # Events expired or the job was queued before a restart
+            yield _sse({"event": "state", "status": backtest.status, "progress": backtest.progress})
+        async for event in events.subscribe(job_id):
+            if event is not None:
+                yield _sse(event)
+                continue
+            await jobs.reap_stale(backtest_id)
+            current = await load()
+            if current is None or current.status not in ACTIVE_STATUSES:
+                if current is not None:
+                    yield _sse(_final_event(current))
+                return
+            yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,34 +1,69 @@
 """User endpoints."""
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.deps import get_current_active_user
+from app.core.deps import get_current_active_user, get_current_superuser
 from app.api.v1.auth import router as auth_router
-from app.core.deps import get_db
-from app.models.user import User
-from app.schemas.user import User as UserSchema
+from app.core.deps import get_db, get_session_maker
+from app.core.principal_cache import Principal
+from app.core.responses import FastJSONResponse
+from app.schemas.user import User as UserSchema, UserPage
+from app.services.user import get_users_page
+from app.services.user_export import EXPORT_FORMATS, export_users
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ):
     """Get current user."""
     return current_user
 
 
-@router.get("/", response_model=List[UserSchema])
+@router.get("/", response_model=UserPage)
 async def read_users(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get list of users."""
-    from app.services.user import get_users
+    """
+    Get list of users.
+
+    Pass the returned next_cursor to fetch the following page.
+    """
+    try:
+        rows, next_cursor = await get_users_page(db, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+    # Already validated here, so skip response_model re-validation
+    return FastJSONResponse(
+        UserPage(
+            items=[UserSchema.model_validate(row, from_attributes=True) for row in rows],
+            next_cursor=next_cursor,
+        )
+    )
+
+
+@router.get("/export")
+async def export_users_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    _: Principal = Depends(get_current_superuser),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+):
+    """
+    Export all users as NDJSON or CSV (admin only).
 
-    users = await get_users(db, skip=skip, limit=limit)
-    return users
+    The response is streamed from a server-side cursor with constant memory.
+    """
+    return StreamingResponse(
+        export_users(session_maker, fmt=format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
@@ -0,0 +1,114 @@
+"""In-process caching primitives."""
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache with per-entry expiry.
+
+    Entries expire after the cache-wide ``ttl`` unless a per-entry ``ttl`` or
+    wall-clock ``expires_at`` is given on ``set``. Not thread-safe; meant to
+    be used from the event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Max number of entries before least-recently-used eviction
+            ttl: Default time-to-live in seconds (None = no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[V, float | None]] = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: K) -> V | None:
+        """Return cached value or None if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, deadline = entry
+        if deadline is not None and deadline <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        ttl: float | None = None,
+        expires_at: float | None = None,
+    ) -> None:
+        """
+        Store value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds, overrides the cache default
+            expires_at: Absolute expiry as a Unix timestamp, overrides ttl
+        """
+        now = time.monotonic()
+        if expires_at is not None:
+            deadline: float | None = now + (expires_at - time.time())
+        elif ttl is not None:
+            deadline = now + ttl
+        elif self.ttl is not None:
+            deadline = now + self.ttl
+        else:
+            deadline = None
+
+        if deadline is not None and deadline <= now:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (value, deadline)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: K) -> bool:
+        """Remove key, returning whether it was present."""
+        return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        """Return number of stored entries, including not yet purged expired ones."""
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
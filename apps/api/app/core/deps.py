@@ -1,32 +1,148 @@
 """FastAPI dependencies."""
-from typing import AsyncGenerator
+import contextlib
+from typing import Any, AsyncGenerator
+from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+import redis.asyncio as aioredis
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from app.core.config import get_settings
+from app.core.job_events import JobEventBroker
+from app.core.principal_cache import Principal, PrincipalCache
+from app.core.refresh_tokens import RefreshTokenStore
+from app.core.resources import Resources
 from app.core.security import verify_token
-from app.db.base import async_session_maker
-from app.models.user import User
+from app.db.routing import ReplicaSet
+from app.db.tracing import trace_queries
+from app.services.backtest_jobs import BacktestJobManager
+from app.services.indicator_cache import IndicatorCache
+from app.services.ohlcv_store import OHLCVStore
+from app.services.optimizer import BacktestOptimizer
 from app.services.user import get_user_by_id
 
+settings = get_settings()
 security = HTTPBearer()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session."""
-    async with async_session_maker() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+def get_resources(request: Request) -> Resources:
+    """Get the shared resources of the running application."""
+    return request.app.state.resources
+
+
+def get_redis(resources: Resources = Depends(get_resources)) -> aioredis.Redis | None:
+    """Get the Redis client (None when Redis is unavailable)."""
+    return resources.redis
+
+
+def get_engine(resources: Resources = Depends(get_resources)) -> AsyncEngine:
+    """Get the primary database engine."""
+    return resources.engine
+
+
+def get_replicas(resources: Resources = Depends(get_resources)) -> ReplicaSet:
+    """Get the read replicas."""
+    return resources.replicas
+
+
+def get_session_maker(
+    resources: Resources = Depends(get_resources),
+) -> async_sessionmaker[AsyncSession]:
+    """Get the session factory, for work that outlives the request's session."""
+    return resources.session_maker
+
+
+def get_principal_cache(resources: Resources = Depends(get_resources)) -> PrincipalCache:
+    """Get the principal cache."""
+    return resources.principal_cache
+
+
+def get_refresh_tokens(resources: Resources = Depends(get_resources)) -> RefreshTokenStore:
+    """Get the refresh-token session store."""
+    return resources.refresh_tokens
+
+
+def get_ohlcv_store(resources: Resources = Depends(get_resources)) -> OHLCVStore:
+    """Columnar market data store."""
+    return resources.ohlcv_store
+
+
+def get_indicator_cache(resources: Resources = Depends(get_resources)) -> IndicatorCache:
+    """Shared indicator cache."""
+    return resources.indicator_cache
+
+
+def get_backtest_jobs(resources: Resources = Depends(get_resources)) -> BacktestJobManager:
+    """Backtest job manager."""
+    return resources.backtest_jobs
+
+
+def get_backtest_optimizer(resources: Resources = Depends(get_resources)) -> BacktestOptimizer:
+    """Parameter sweep pool."""
+    return resources.backtest_optimizer
+
+
+def get_job_events(resources: Resources = Depends(get_resources)) -> JobEventBroker:
+    """Job progress event broker."""
+    return resources.job_events
+
+
+async def get_db(
+    request: Request,
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get database session.
+
+    With DB_QUERY_TRACING, statements issued while serving the request are
+    traced and checked against the configured query budget.
+    """
+    tracer: contextlib.AbstractContextManager[Any] = contextlib.nullcontext()
+    if settings.DB_QUERY_TRACING:
+        tracer = trace_queries(
+            name=f"{request.method} {request.url.path}",
+            budget=settings.DB_QUERY_BUDGET,
+            repeat_limit=settings.DB_QUERY_REPEAT_LIMIT,
+            action=settings.DB_QUERY_BUDGET_ACTION,
+        )
+    async with session_maker() as session:
+        with tracer:
+            try:
+                yield session
+            finally:
+                await session.close()
+
+
+def token_user_id(payload: dict[str, Any]) -> UUID:
+    """
+    User ID in the subject of a verified token.
+
+    Raises:
+        HTTPException: 401 if the subject is missing or not a UUID
+    """
+    try:
+        return UUID(str(payload["sub"]))
+    except (KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from None
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> User:
-    """Get current authenticated user."""
+    principal_cache: PrincipalCache = Depends(get_principal_cache),
+    replicas: ReplicaSet = Depends(get_replicas),
+) -> Principal:
+    """
+    Get current authenticated user.
+
+    Served from the principal cache; the database is only queried on a miss.
+    The request's reads go to the primary if the user wrote moments ago.
+    """
     token = credentials.credentials
     payload = verify_token(token)
 
@@ -43,14 +159,13 @@ async def get_current_user(
             detail="Invalid token type",
         )
 
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-        )
+    user_id = token_user_id(payload)
+    await replicas.follow_client(str(user_id))
+
+    principal = await principal_cache.get(str(user_id))
+    if principal is not None:
+        return principal
 
-    # Fixed: user_id is already a string UUID, don't cast to int
     user = await get_user_by_id(db, user_id)
     if user is None:
         raise HTTPException(
@@ -58,12 +173,14 @@ async def get_current_user(
             detail="User not found",
         )
 
-    return user
+    principal = Principal.from_user(user)
+    await principal_cache.set(principal)
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get current active user."""
     if not current_user.is_active:
         raise HTTPException(
@@ -71,3 +188,15 @@ async def get_current_active_user(
             detail="Inactive user",
         )
     return current_user
+
+
+async def get_current_superuser(
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
+    """Get current active superuser."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return current_user
@@ -63,6 +63,18 @@ class RateLimitError(APIError):
         super().__init__(message, status.HTTP_429_TOO_MANY_REQUESTS, details)
 
 
+class ServiceUnavailableError(APIError):
+    """Service temporarily overloaded or unavailable exception."""
+
+    def __init__(
+        self, message: str = "Service temporarily unavailable", retry_after: int | None = None
+    ):
+        details = {}
+        if retry_after is not None:
+            details["retry_after"] = retry_after
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE, details)
+
+
 def format_error_response(
     status_code: int,
     message: str,
@@ -0,0 +1,167 @@
+"""Bounded worker pool for CPU-bound password hashing."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import get_settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.instrumentation import timed
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[T, float, float]:
+    """Run func in a worker and report when it started and how long it ran."""
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time() - started
+
+
+def _warm_worker() -> None:
+    """Import the hashing functions (spawned workers start with a bare interpreter)."""
+    import app.core.security  # noqa: F401
+
+
+class PasswordHashPool:
+    """
+    Run bcrypt hashing and verification off the event loop.
+
+    Work is submitted to a thread or process pool. The number of calls queued
+    or running is capped at ``max_pending``; beyond that, callers are rejected
+    with a 503 instead of piling up behind a saturated pool.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 0, max_pending: int = 64):
+        """
+        Initialize hashing pool.
+
+        Args:
+            mode: "thread" or "process"
+            max_workers: Pool size, 0 for one worker per CPU core
+            max_pending: Max calls queued or running before rejecting new ones
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unsupported hashing executor: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+
+        # Metrics
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "PasswordHashPool":
+        """Create pool configured from application settings."""
+        return cls(
+            mode=settings.PASSWORD_HASH_EXECUTOR,
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+        )
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use."""
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn avoids forking a process that is running an event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="pwhash",
+                )
+            logger.info(f"Password hash pool started: {self.mode} x{self.max_workers}")
+        return self._executor
+
+    async def warm_up(self) -> None:
+        """Start every worker now instead of on the first logins."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, _warm_worker) for _ in range(self.max_workers))
+        )
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run func(*args) in the pool.
+
+        Raises:
+            ServiceUnavailableError: If max_pending calls are already in flight
+        """
+        if self._in_flight >= self.max_pending:
+            self._rejected += 1
+            logger.warning(f"Password hash pool saturated ({self._in_flight} in flight)")
+            raise ServiceUnavailableError(
+                message="Server is busy. Please try again shortly.",
+                retry_after=1,
+            )
+
+        self._in_flight += 1
+        self._submitted += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        submitted = time.time()
+
+        try:
+            loop = asyncio.get_running_loop()
+            with timed("bcrypt"):
+                result, started, run_time = await loop.run_in_executor(
+                    self._get_executor(), _timed_call, func, *args
+                )
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        wait = max(started - submitted, 0.0)
+        self._completed += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        self._total_run += run_time
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool metrics."""
+        completed = self._completed or 1
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._total_wait / completed * 1000, 3),
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+            "avg_run_ms": round(self._total_run / completed * 1000, 3),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info("Password hash pool stopped")
+
+
+hash_pool = PasswordHashPool.from_settings()
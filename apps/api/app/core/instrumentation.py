@@ -0,0 +1,186 @@
+"""Request latency and hot-path instrumentation."""
+import contextlib
+import contextvars
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import MetricsRegistry
+
+settings = get_settings()
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = metrics.histogram(
+    "app_stage_duration_seconds",
+    "Time spent in hot-path stages (token_decode, bcrypt, db, redis)",
+    ("stage",),
+)
+REQUEST_SQL_QUERIES = metrics.histogram(
+    "http_request_sql_queries",
+    "SQL statements executed per request",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_POOL_WAIT_SECONDS = metrics.histogram(
+    "db_pool_wait_seconds",
+    "Connection checkout time per pool (waiting, connecting and pre-ping)",
+    ("pool",),
+)
+DB_POOL_TIMEOUTS = metrics.counter(
+    "db_pool_timeouts",
+    "Checkouts that gave up after pool_timeout",
+    ("pool",),
+)
+DB_POOL_OVERFLOW = metrics.counter(
+    "db_pool_overflow_connections",
+    "Connections opened beyond pool_size",
+    ("pool",),
+)
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """Counters accumulated while serving one request."""
+
+    sql_queries: int = 0
+    sql_seconds: float = 0.0
+
+
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> RequestStats | None:
+    """Stats of the request being served in this context, if any."""
+    return _request_stats.get()
+
+
+class _StageTimer:
+    """Context manager observing elapsed time into STAGE_SECONDS."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, stage: str):
+        self.histogram = STAGE_SECONDS.labels(stage)
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+_NOOP = contextlib.nullcontext()
+
+
+def timed(stage: str) -> contextlib.AbstractContextManager:
+    """
+    Time a block as a hot-path stage.
+
+    Works around awaits too (measures wall time). A shared no-op context is
+    returned when metrics are disabled.
+    """
+    if not metrics.enabled:
+        return _NOOP
+    return _StageTimer(stage)
+
+
+# Attribute holding the start time on the statement's ExecutionContext: it
+# lives and dies with one execution, so a failed statement leaves nothing behind
+_QUERY_START = "_metrics_query_start"
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    if context is not None:
+        setattr(context, _QUERY_START, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    started = getattr(context, _QUERY_START, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    STAGE_SECONDS.labels("db").observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.sql_queries += 1
+        stats.sql_seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on engine (no listeners when metrics are disabled)."""
+    if not metrics.enabled:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(scope: Scope) -> str:
+    """Route path template (e.g. /api/v1/users/{id}) to keep label cardinality bounded."""
+    template: str | None = getattr(scope.get("route"), "path_format", None)
+    if not template:
+        return "unmatched"
+    # Routes of included routers may report a template relative to the
+    # include prefix; take the prefix from the leading segments of the path
+    segments = scope["path"].split("/")
+    prefix = "/".join(segments[: max(len(segments) - template.count("/"), 1)])
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """Record per-route latency and SQL counts (pure ASGI)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = _route_template(scope)
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(elapsed)
+            REQUEST_SQL_QUERIES.labels(route).observe(stats.sql_queries)
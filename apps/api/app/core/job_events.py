@@ -0,0 +1,154 @@
+"""Job progress events over Redis pub/sub or an in-memory broker."""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator
+
+import redis.asyncio as aioredis
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_EVENTS = frozenset({"completed", "failed", "cancelled"})
+
+
+class JobEventBroker:
+    """
+    Publish job events and stream them to subscribers.
+
+    With Redis bound, events go through pub/sub, so a client streaming from
+    one API process sees jobs running in another. Without it (local runs,
+    tests) events are fanned out in memory to subscribers of this process.
+
+    The latest event of every job is kept (a Redis key with a TTL, or a
+    bounded in-memory cache) and replayed on subscribe, so a client that
+    connects late or between events still gets the current state.
+    """
+
+    def __init__(self, key_prefix: str = "jobs:", retention_seconds: int = 3600):
+        """
+        Initialize broker.
+
+        Args:
+            key_prefix: Redis channel and key prefix
+            retention_seconds: How long the latest event of a job is kept
+        """
+        self.key_prefix = key_prefix
+        self.retention_seconds = retention_seconds
+        self.redis: aioredis.Redis | None = None
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._latest: TTLCache[str, dict[str, Any]] = TTLCache(
+            maxsize=10_000, ttl=retention_seconds
+        )
+
+        # Metrics
+        self.published = 0
+        self.redis_errors = 0
+
+    def bind_redis(self, redis_client: aioredis.Redis | None) -> None:
+        """Use Redis pub/sub (None = in-memory only)."""
+        self.redis = redis_client
+
+    def _channel(self, job_id: str) -> str:
+        return f"{self.key_prefix}{job_id}"
+
+    async def publish(self, job_id: str, event: dict[str, Any]) -> None:
+        """Publish an event ({"event": name, ...}) for a job."""
+        self.published += 1
+        self._latest.set(job_id, event)
+        if self.redis is not None:
+            payload = json.dumps(event, default=str)
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.set(f"{self._channel(job_id)}:latest", payload, ex=self.retention_seconds)
+                    pipe.publish(self._channel(job_id), payload)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Failed to publish job event to Redis: {e}")
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+    async def latest(self, job_id: str) -> dict[str, Any] | None:
+        """Most recent event of a job, if still retained."""
+        if self.redis is not None:
+            try:
+                payload = await self.redis.get(f"{self._channel(job_id)}:latest")
+                if payload is not None:
+                    event: dict[str, Any] = json.loads(payload)
+                    return event
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Failed to read job event from Redis: {e}")
+        return self._latest.get(job_id)
+
+    async def subscribe(
+        self, job_id: str, heartbeat: float = 15.0
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        Yield a job's events, starting with the latest one, until a terminal event.
+
+        Yields None every ``heartbeat`` seconds without events, so callers can
+        keep idle connections alive.
+        """
+        if self.redis is not None:
+            source = self._redis_events(self.redis, job_id, heartbeat)
+        else:
+            source = self._memory_events(job_id, heartbeat)
+        async for event in source:
+            yield event
+            if event is not None and event.get("event") in TERMINAL_EVENTS:
+                return
+
+    async def _memory_events(
+        self, job_id: str, heartbeat: float
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            latest = self._latest.get(job_id)
+            if latest is not None:
+                yield latest
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except TimeoutError:
+                    yield None
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    async def _redis_events(
+        self, redis_client: aioredis.Redis, job_id: str, heartbeat: float
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        pubsub = redis_client.pubsub()
+        try:
+            # Subscribe before reading the latest event so nothing falls in between
+            await pubsub.subscribe(self._channel(job_id))
+            latest = await self.latest(job_id)
+            if latest is not None:
+                yield latest
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=heartbeat
+                )
+                yield json.loads(message["data"]) if message else None
+        finally:
+            await pubsub.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        """Return broker metrics."""
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "published": self.published,
+            "local_subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "redis_errors": self.redis_errors,
+        }
+
+
+job_events = JobEventBroker()
@@ -0,0 +1,141 @@
+"""JWT signing key ring."""
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    """A parsed key pair (verify-only when the private half is absent)."""
+
+    kid: str
+    algorithm: str
+    private: Key | None
+    public: Key
+
+    def public_jwk(self) -> dict[str, Any]:
+        """Public key as a JWK for the JWKS document."""
+        return {**self.public.to_dict(), "kid": self.kid, "use": "sig", "alg": self.algorithm}
+
+
+class KeyRing:
+    """
+    Keys used to sign and verify JWTs.
+
+    Keys are parsed once into jose key objects, so signing and verification
+    never re-read PEMs or secrets. Tokens are signed with the active key and
+    carry its ``kid`` header; retiring keys stay in the ring for
+    verification until tokens signed with them have expired.
+
+    HS* algorithms use a single symmetric key built from JWT_SECRET_KEY and
+    publish an empty JWKS.
+    """
+
+    def __init__(self, algorithm: str, keys: list[SigningKey], active_kid: str):
+        """
+        Initialize key ring.
+
+        Args:
+            algorithm: JWS algorithm for every key in the ring
+            keys: Signing and verify-only keys
+            active_kid: Key id used for signing
+
+        Raises:
+            ValueError: If the active key is missing or has no private half
+        """
+        self.algorithm = algorithm
+        self.keys = {key.kid: key for key in keys}
+        active = self.keys.get(active_kid)
+        if active is None or active.private is None:
+            raise ValueError(f"Active JWT key {active_kid!r} not found or not a private key")
+        self.active = active
+        self.symmetric = algorithm.startswith("HS")
+        self._jwks = {
+            "keys": [] if self.symmetric else [key.public_jwk() for key in self.keys.values()]
+        }
+
+    @classmethod
+    def symmetric_key(cls, secret: str, algorithm: str) -> "KeyRing":
+        """Ring with one HMAC key."""
+        key = jwk.construct(secret, algorithm)
+        return cls(algorithm, [SigningKey("default", algorithm, key, key)], "default")
+
+    @classmethod
+    def from_directory(cls, path: str | Path, algorithm: str, active_kid: str = "") -> "KeyRing":
+        """
+        Load every ``<kid>.pem`` in a directory.
+
+        Private keys can sign; public-only PEMs are kept for verification.
+        Without an explicit active kid, the last private key by name is used
+        (scripts/generate_jwt_key.py names keys so that this is the newest).
+        """
+        keys = []
+        for pem_path in sorted(Path(path).glob("*.pem")):
+            pem = pem_path.read_text()
+            kid = pem_path.name.split(".", 1)[0]
+            key = jwk.construct(pem, algorithm)
+            if "PRIVATE KEY" in pem:
+                keys.append(SigningKey(kid, algorithm, key, key.public_key()))
+            else:
+                keys.append(SigningKey(kid, algorithm, None, key))
+
+        if not active_kid:
+            private_kids = [key.kid for key in keys if key.private is not None]
+            if not private_kids:
+                raise ValueError(f"No private JWT keys found in {path}")
+            active_kid = private_kids[-1]
+        return cls(algorithm, keys, active_kid)
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        """Build key ring from application settings."""
+        if settings.JWT_ALGORITHM.startswith("HS"):
+            return cls.symmetric_key(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+        if not settings.JWT_KEYS_DIR:
+            raise ValueError(f"JWT_KEYS_DIR must be set for {settings.JWT_ALGORITHM}")
+        ring = cls.from_directory(
+            settings.JWT_KEYS_DIR, settings.JWT_ALGORITHM, settings.JWT_ACTIVE_KID
+        )
+        logger.info(
+            f"Loaded {len(ring.keys)} JWT key(s) from {settings.JWT_KEYS_DIR}, "
+            f"signing with {ring.active.kid}"
+        )
+        return ring
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        """Sign claims with the active key."""
+        headers = None if self.symmetric else {"kid": self.active.kid}
+        return jwt.encode(claims, self.active.private, algorithm=self.algorithm, headers=headers)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verify token with the key named by its kid header.
+
+        Raises:
+            JWTError: If the token is malformed, expired, or signed by an
+                unknown key
+        """
+        if self.symmetric:
+            key = self.active
+        else:
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = self.keys.get(kid) if kid else self.active
+            if key is None:
+                raise JWTError(f"Unknown signing key: {kid}")
+        return jwt.decode(token, key.public, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict[str, Any]:
+        """Public keys as a JWK Set."""
+        return self._jwks
+
+
+key_ring = KeyRing.from_settings()
@@ -0,0 +1,179 @@
+"""Lightweight metric primitives."""
+import bisect
+from typing import Any
+
+# Latency buckets in seconds (upper bounds), Prometheus-style
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds (an implicit +Inf bucket is added)
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return (upper bound, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimate quantile as the upper bound of the bucket containing it."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return summary for JSON stats."""
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase counter."""
+        self.value += amount
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """Render a {name="value",...} label set."""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricFamily:
+    """A named metric with one child per label combination."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize metric family.
+
+        Args:
+            name: Prometheus metric name
+            help_text: HELP line
+            kind: "histogram" or "counter"
+            label_names: Label names, values are given to labels()
+            buckets: Histogram bucket upper bounds
+        """
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = label_names
+        self.buckets = buckets
+        self.children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *values: str) -> Any:
+        """Return the Histogram or Counter for these label values."""
+        child = self.children.get(values)
+        if child is None:
+            child = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+            self.children[values] = child
+        return child
+
+    def render(self) -> list[str]:
+        """Render in Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self.children.items():
+            if self.kind == "counter":
+                labels = _format_labels(self.label_names, values)
+                lines.append(f"{self.name}_total{labels} {child.value}")
+                continue
+            for bound, total in child.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.label_names, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {total}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {child.sum}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-local metric registry.
+
+    Each worker process keeps its own registry; scrape every worker (or sum
+    across them) when running several.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.families: list[MetricFamily] = []
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> MetricFamily:
+        """Register a histogram family."""
+        family = MetricFamily(name, help_text, "histogram", label_names, buckets)
+        self.families.append(family)
+        return family
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> MetricFamily:
+        """Register a counter family (exposed with a _total suffix)."""
+        family = MetricFamily(name, help_text, "counter", label_names)
+        self.families.append(family)
+        return family
+
+    def render(self) -> str:
+        """Render every family in Prometheus text exposition format."""
+        lines = []
+        for family in self.families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,234 @@
+"""Password policy validation."""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SPECIAL_CHARACTERS = frozenset('!@#$%^&*(),.?":{}|<>')
+
+# Always rejected, with or without an on-disk blocklist
+COMMON_PASSWORDS = frozenset(
+    {
+        "password", "12345678", "qwerty", "abc123", "password1",
+        "welcome", "monkey", "dragon", "master", "hello",
+    }
+)
+
+# Blocklist file: magic, big-endian uint64 entry count, a fan-out table giving
+# the end index of each 16-bit digest prefix, then the sorted 8-byte digests
+BLOCKLIST_MAGIC = b"GR8PWBL1"
+BLOCKLIST_HEADER = struct.Struct(">8sQ")
+FANOUT_SIZE = 1 << 16
+FANOUT = struct.Struct(f">{FANOUT_SIZE}I")
+FANOUT_ENTRY = struct.Struct(">I")
+DIGEST_SIZE = 8
+DIGESTS_OFFSET = BLOCKLIST_HEADER.size + FANOUT.size
+
+
+def password_digest(password: str) -> bytes:
+    """Case-insensitive 64-bit digest used as the blocklist key."""
+    return hashlib.blake2b(password.lower().encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+def write_blocklist(passwords: Iterable[str], path: str | Path) -> int:
+    """
+    Write a sorted digest blocklist file.
+
+    Args:
+        passwords: Passwords to block (compared case-insensitively)
+        path: Output file
+
+    Returns:
+        Number of distinct entries written
+    """
+    digests = sorted({password_digest(p) for p in passwords if p})
+    fanout = [0] * FANOUT_SIZE
+    for digest in digests:
+        fanout[int.from_bytes(digest[:2], "big")] += 1
+    for prefix in range(1, FANOUT_SIZE):
+        fanout[prefix] += fanout[prefix - 1]
+
+    tmp = Path(f"{path}.tmp")
+    with tmp.open("wb") as f:
+        f.write(BLOCKLIST_HEADER.pack(BLOCKLIST_MAGIC, len(digests)))
+        f.write(FANOUT.pack(*fanout))
+        f.write(b"".join(digests))
+    os.replace(tmp, path)
+    return len(digests)
+
+
+class PasswordBlocklist:
+    """
+    Memory-mapped sorted index of password digests.
+
+    A fan-out table narrows each lookup to the digests sharing its 16-bit
+    prefix (about 15 for a million entries), which are then binary-searched.
+    The file lives in the shared page cache at 8 bytes per entry plus 256 KB,
+    and nothing is loaded up front.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Open blocklist file.
+
+        Args:
+            path: File written by write_blocklist
+
+        Raises:
+            ValueError: If the file is not a valid blocklist
+        """
+        self.path = str(path)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = BLOCKLIST_HEADER.unpack_from(self._mmap, 0)
+        if magic != BLOCKLIST_MAGIC or len(self._mmap) != DIGESTS_OFFSET + count * DIGEST_SIZE:
+            self._mmap.close()
+            raise ValueError(f"Invalid password blocklist file: {path}")
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, password: str) -> bool:
+        digest = password_digest(password)
+        data = self._mmap
+        prefix = int.from_bytes(digest[:2], "big")
+        fanout_at = BLOCKLIST_HEADER.size + prefix * FANOUT_ENTRY.size
+        (hi,) = FANOUT_ENTRY.unpack_from(data, fanout_at)
+        lo = FANOUT_ENTRY.unpack_from(data, fanout_at - FANOUT_ENTRY.size)[0] if prefix else 0
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = DIGESTS_OFFSET + mid * DIGEST_SIZE
+            entry = data[start:start + DIGEST_SIZE]
+            if entry < digest:
+                lo = mid + 1
+            elif entry > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+
+class PasswordPolicy:
+    """
+    Password rules built once from settings.
+
+    Character classes are checked in a single pass over the password, then
+    the password is looked up in the built-in common list and the optional
+    on-disk blocklist.
+    """
+
+    def __init__(
+        self,
+        min_length: int = 8,
+        require_upper: bool = True,
+        require_lower: bool = True,
+        require_digit: bool = True,
+        require_special: bool = True,
+        blocklist: PasswordBlocklist | None = None,
+    ):
+        """
+        Initialize policy.
+
+        Args:
+            min_length: Minimum password length
+            require_upper: Require an uppercase letter
+            require_lower: Require a lowercase letter
+            require_digit: Require a digit
+            require_special: Require one of SPECIAL_CHARACTERS
+            blocklist: Breached/common password blocklist
+        """
+        self.min_length = min_length
+        self.require_upper = require_upper
+        self.require_lower = require_lower
+        self.require_digit = require_digit
+        self.require_special = require_special
+        self.blocklist = blocklist
+
+    @classmethod
+    def from_settings(cls) -> "PasswordPolicy":
+        """Build policy from application settings."""
+        blocklist = None
+        if settings.PASSWORD_BLOCKLIST_PATH:
+            try:
+                blocklist = PasswordBlocklist(settings.PASSWORD_BLOCKLIST_PATH)
+                logger.info(f"Loaded password blocklist with {len(blocklist)} entries")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Password blocklist unavailable, using built-in list: {e}")
+        return cls(
+            min_length=settings.PASSWORD_MIN_LENGTH,
+            require_upper=settings.PASSWORD_REQUIRE_UPPERCASE,
+            require_lower=settings.PASSWORD_REQUIRE_LOWERCASE,
+            require_digit=settings.PASSWORD_REQUIRE_DIGIT,
+            require_special=settings.PASSWORD_REQUIRE_SPECIAL,
+            blocklist=blocklist,
+        )
+
+    def is_common(self, password: str) -> bool:
+        """Whether password is in the common list or the blocklist."""
+        if password.lower() in COMMON_PASSWORDS:
+            return True
+        return self.blocklist is not None and password in self.blocklist
+
+    def validate(self, password: str) -> str:
+        """
+        Check password against the policy.
+
+        Args:
+            password: Plain password
+
+        Returns:
+            The password, unchanged
+
+        Raises:
+            ValueError: With a user-facing message if a rule fails
+        """
+        if len(password) < self.min_length:
+            raise ValueError(f"Password must be at least {self.min_length} characters long")
+
+        has_upper = has_lower = has_digit = has_special = False
+        for c in password:
+            if c.isupper():
+                has_upper = True
+            elif c.islower():
+                has_lower = True
+            elif c.isdigit():
+                has_digit = True
+            elif c in SPECIAL_CHARACTERS:
+                has_special = True
+
+        errors = []
+        if self.require_upper and not has_upper:
+            errors.append("one uppercase letter")
+        if self.require_lower and not has_lower:
+            errors.append("one lowercase letter")
+        if self.require_digit and not has_digit:
+            errors.append("one digit")
+        if self.require_special and not has_special:
+            errors.append("one special character")
+
+        if errors:
+            raise ValueError(
+                f"Password must contain {', '.join(errors)}. "
+                f"Example: MySecureP@ssw0rd"
+            )
+
+        if self.is_common(password):
+            raise ValueError("This password is too common. Please choose a stronger password.")
+
+        return password
+
+
+password_policy = PasswordPolicy.from_settings()
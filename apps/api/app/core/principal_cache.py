@@ -0,0 +1,209 @@
+"""Two-tier cache of authenticated principals."""
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+import redis.asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.instrumentation import timed
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Immutable snapshot of the authenticated user (no credentials)."""
+
+    id: str
+    email: str
+    is_active: bool
+    is_superuser: bool
+    full_name: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Build snapshot from ORM user."""
+        return cls(
+            id=str(user.id),
+            email=user.email,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            full_name=user.full_name,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def to_json(self) -> str:
+        """Serialize for the Redis tier."""
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        data["updated_at"] = self.updated_at.isoformat()
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "Principal":
+        """Deserialize from the Redis tier."""
+        data = json.loads(raw)
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        data["updated_at"] = datetime.fromisoformat(data["updated_at"])
+        return cls(**data)
+
+
+class PrincipalCache:
+    """
+    Principal lookup cache: in-process TTL/LRU in front of a shared Redis tier.
+
+    The local tier keeps a short TTL because it is only invalidated in the
+    worker that committed the change; the Redis tier is invalidated for all
+    workers.
+    """
+
+    key_prefix = "principal:"
+
+    def __init__(self, local_maxsize: int, local_ttl: float, redis_ttl: int):
+        """
+        Initialize principal cache.
+
+        Args:
+            local_maxsize: Max principals held per worker
+            local_ttl: Local tier time-to-live in seconds
+            redis_ttl: Redis tier time-to-live in seconds
+        """
+        self.local: TTLCache[str, Principal] = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        self.redis: aioredis.Redis | None = None
+
+        # Metrics
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.invalidations = 0
+
+        self._pending: set[asyncio.Task] = set()
+
+    def bind_redis(self, redis_client: aioredis.Redis | None) -> None:
+        """Attach (or detach) the shared Redis tier."""
+        self.redis = redis_client
+
+    async def get(self, user_id: str) -> Principal | None:
+        """Return cached principal from local or Redis tier."""
+        principal = self.local.get(user_id)
+        if principal is not None:
+            return principal
+
+        if self.redis is None:
+            return None
+
+        try:
+            with timed("redis"):
+                raw = await self.redis.get(self.key_prefix + user_id)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis get failed: {e}")
+            return None
+
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        principal = Principal.from_json(raw)
+        self.local.set(user_id, principal)
+        return principal
+
+    async def set(self, principal: Principal) -> None:
+        """Store principal in both tiers."""
+        self.local.set(principal.id, principal)
+        if self.redis is None:
+            return
+        try:
+            with timed("redis"):
+                await self.redis.set(
+                    self.key_prefix + principal.id, principal.to_json(), ex=self.redis_ttl
+                )
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis set failed: {e}")
+
+    async def invalidate(self, *user_ids: str) -> None:
+        """Drop principals from both tiers."""
+        for user_id in user_ids:
+            self.local.delete(user_id)
+        self.invalidations += len(user_ids)
+        if self.redis is None or not user_ids:
+            return
+        try:
+            await self.redis.delete(*(self.key_prefix + user_id for user_id in user_ids))
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis invalidate failed: {e}")
+
+    def invalidate_soon(self, *user_ids: str) -> None:
+        """Invalidate from sync code: local tier now, Redis tier in a task."""
+        for user_id in user_ids:
+            self.local.delete(user_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.invalidations += len(user_ids)
+            return
+        task = loop.create_task(self.invalidate(*user_ids))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache metrics."""
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "enabled": self.redis is not None,
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors,
+            },
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    local_maxsize=settings.PRINCIPAL_CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+    redis_ttl=settings.PRINCIPAL_CACHE_REDIS_TTL,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context: Any) -> None:
+    """Remember users updated or deleted in this transaction."""
+    changed = {
+        str(obj.id)
+        for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if changed:
+        session.info.setdefault("principal_invalidations", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    """Invalidate cached principals once changes are committed."""
+    changed = session.info.pop("principal_invalidations", None)
+    if changed:
+        principal_cache.invalidate_soon(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    """Forget collected users when the transaction is rolled back."""
+    session.info.pop("principal_invalidations", None)
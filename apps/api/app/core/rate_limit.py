@@ -1,127 +1,408 @@
 """Rate limiting middleware using Redis."""
 import logging
-from typing import Callable
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
 
-from fastapi import Request, Response, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from redis.commands.core import AsyncScript
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.exceptions import RateLimitError
+from app.core.cache import TTLCache
+from app.core.exceptions import format_error_response
 from app.core.config import get_settings
+from app.core.instrumentation import timed
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Generic cell rate algorithm (GCRA). Stores one value per key: the
+# theoretical arrival time (TAT) in ms. Requests are spread evenly at
+# period/limit with a burst of up to `limit`, so there is no window to reset
+# and the decision, remaining quota and retry-after come from a single call.
+#
+# The script leases up to `want` requests at once: it grants as many as are
+# available (possibly fewer than asked), so workers can take a batch and
+# spend it locally. With want = 1 it is a plain per-request GCRA check.
+#
+# KEYS[1] = bucket key
+# ARGV    = limit, period_ms, want
+# Returns   {granted, remaining, retry_after_ms, reset_after_ms}
+GCRA_LEASE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware for API endpoints."""
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
 
-    def __init__(self, app, redis_client, default_limit: int = 100, window: int = 60):
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+  tat = now
+end
+
+local available = math.floor((period - (tat - now)) / interval)
+local granted = math.min(want, available)
+if granted <= 0 then
+  return {0, 0, math.ceil(tat + interval - period - now), math.ceil(tat - now)}
+end
+
+local new_tat = tat + interval * granted
+local reset_after = new_tat - now
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(reset_after))
+return {granted, available - granted, 0, math.ceil(reset_after)}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # seconds until the request would be allowed
+    reset_after: int  # seconds until the full quota is available again
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens/second."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> tuple[bool, float]:
+        """Take one token. Returns (allowed, seconds until next token)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class Lease:
+    """Quota leased from Redis and spent locally until exhausted or expired."""
+
+    __slots__ = ("tokens", "expires", "remaining", "reset_after")
+
+    def __init__(self, tokens: int, expires: float, remaining: int, reset_after: int):
+        self.tokens = tokens
+        self.expires = expires
+        self.remaining = remaining  # Redis-side remaining when leased
+        self.reset_after = reset_after
+
+
+class HierarchicalRateLimiter:
+    """
+    Per-worker token tier in front of the shared Redis GCRA.
+
+    Each worker leases a batch of requests from Redis and answers from it
+    locally, so most decisions skip Redis. Leased tokens are already debited
+    in Redis, so the global limit is never exceeded; unspent tokens expire
+    with the lease, which can make the limit slightly stricter than
+    configured. ``lease_fraction`` trades that accuracy for fewer round
+    trips: 0 consults Redis on every request.
+
+    When Redis is unreachable, decisions fall back to local token buckets
+    sized ``limit / local_workers`` (``failure_mode="local"``), or requests
+    are let through (``failure_mode="open"``).
+    """
+
+    def __init__(
+        self,
+        lease_fraction: float = 0.1,
+        lease_ttl: float = 1.0,
+        local_workers: int = 1,
+        failure_mode: str = "local",
+        max_keys: int = 100_000,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            lease_fraction: Fraction of a bucket's limit leased per Redis call
+            lease_ttl: Seconds a lease may be spent before it is dropped
+            local_workers: Expected worker count, splits the limit in local-only mode
+            failure_mode: "local" or "open" when Redis is unavailable
+            max_keys: Max leases/buckets tracked per worker
+        """
+        if failure_mode not in ("local", "open"):
+            raise ValueError(f"Unsupported rate limit failure mode: {failure_mode}")
+        self.lease_fraction = lease_fraction
+        self.lease_ttl = lease_ttl
+        self.local_workers = max(local_workers, 1)
+        self.failure_mode = failure_mode
+        self._leases: TTLCache[str, Lease] = TTLCache(maxsize=max_keys)
+        self._buckets: TTLCache[str, TokenBucket] = TTLCache(maxsize=max_keys)
+        self._script: AsyncScript | None = None
+        self._script_client = None
+
+        # Metrics
+        self.local_decisions = 0
+        self.redis_calls = 0
+        self.redis_errors = 0
+        self.degraded_decisions = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls) -> "HierarchicalRateLimiter":
+        """Create limiter configured from application settings."""
+        return cls(
+            lease_fraction=settings.RATE_LIMIT_LEASE_FRACTION,
+            lease_ttl=settings.RATE_LIMIT_LEASE_TTL,
+            local_workers=settings.RATE_LIMIT_LOCAL_WORKERS,
+            failure_mode=settings.RATE_LIMIT_FAILURE_MODE,
+        )
+
+    def _get_script(self, redis_client) -> AsyncScript:
+        """Register the GCRA script once per Redis client."""
+        if self._script is None or self._script_client is not redis_client:
+            self._script = redis_client.register_script(GCRA_LEASE_SCRIPT)
+            self._script_client = redis_client
+        return self._script
+
+    async def check(
+        self, redis_client, key: str, limit: int, window: int
+    ) -> RateLimitResult | None:
+        """
+        Decide whether one request for key is allowed.
+
+        Returns:
+            RateLimitResult, or None to let the request through unchecked
+        """
+        now = time.monotonic()
+
+        lease = self._leases.get(key)
+        if lease is not None and lease.tokens > 0 and lease.expires > now:
+            lease.tokens -= 1
+            self.local_decisions += 1
+            return RateLimitResult(
+                allowed=True,
+                limit=limit,
+                remaining=lease.remaining + lease.tokens,
+                retry_after=0,
+                reset_after=lease.reset_after,
+            )
+
+        if redis_client is not None:
+            want = max(1, int(limit * self.lease_fraction))
+            try:
+                script = self._get_script(redis_client)
+                self.redis_calls += 1
+                with timed("redis"):
+                    granted, remaining, retry_after_ms, reset_after_ms = await script(
+                        keys=[key], args=[limit, window * 1000, want]
+                    )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.error(f"Redis rate limit check failed: {e}")
+            else:
+                granted = int(granted)
+                result = RateLimitResult(
+                    allowed=granted > 0,
+                    limit=limit,
+                    remaining=int(remaining) + max(granted - 1, 0),
+                    retry_after=math.ceil(int(retry_after_ms) / 1000),
+                    reset_after=math.ceil(int(reset_after_ms) / 1000),
+                )
+                if granted > 1:
+                    lease = Lease(
+                        tokens=granted - 1,
+                        expires=now + self.lease_ttl,
+                        remaining=int(remaining),
+                        reset_after=result.reset_after,
+                    )
+                    self._leases.set(key, lease, ttl=self.lease_ttl)
+                if not result.allowed:
+                    self.rejected += 1
+                return result
+
+        if self.failure_mode == "open":
+            return None
+        return self._check_local(key, limit, window, now)
+
+    def _check_local(self, key: str, limit: int, window: int, now: float) -> RateLimitResult:
+        """Degraded mode: decide from this worker's share of the limit."""
+        self.degraded_decisions += 1
+        capacity = max(1, math.ceil(limit / self.local_workers))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(capacity, capacity / window, now)
+            self._buckets.set(key, bucket, ttl=window)
+
+        allowed, wait = bucket.take(now)
+        if not allowed:
+            self.rejected += 1
+        return RateLimitResult(
+            allowed=allowed,
+            limit=limit,
+            remaining=int(bucket.tokens),
+            retry_after=math.ceil(wait),
+            reset_after=math.ceil((capacity - bucket.tokens) / bucket.rate),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return limiter metrics."""
+        return {
+            "lease_fraction": self.lease_fraction,
+            "failure_mode": self.failure_mode,
+            "local_decisions": self.local_decisions,
+            "redis_calls": self.redis_calls,
+            "redis_errors": self.redis_errors,
+            "degraded_decisions": self.degraded_decisions,
+            "rejected": self.rejected,
+            "leases": len(self._leases),
+            "local_buckets": len(self._buckets),
+        }
+
+
+rate_limiter = HierarchicalRateLimiter.from_settings()
+
+
+def _compile_rules(rules: dict[str, tuple[int, int]]) -> re.Pattern[str]:
+    """
+    Compile path rules into one anchored alternation.
+
+    Each rule becomes a named group (``r0``, ``r1``, ...) so a single
+    ``fullmatch`` tells which rule applies. ``*`` matches one path segment
+    and a trailing slash is optional.
+    """
+    parts = []
+    for i, pattern in enumerate(rules):
+        body = re.escape(pattern.rstrip("/")).replace(r"\*", "[^/]+")
+        parts.append(f"(?P<r{i}>{body}/?)")
+    return re.compile("|".join(parts) or "(?!)")
+
+
+class RateLimitMiddleware:
+    """Rate limiting middleware for API endpoints (pure ASGI)."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_limit: int = 100,
+        window: int = 60,
+        endpoint_limits: dict[str, tuple[int, int]] | None = None,
+        limiter: HierarchicalRateLimiter | None = None,
+    ):
         """
         Initialize rate limiter.
 
+        The Redis client is read from ``app.state.resources`` on each
+        request, so the middleware can be installed before the lifespan
+        connects.
+
         Args:
-            app: FastAPI application
-            redis_client: Redis client instance
+            app: ASGI application
             default_limit: Max requests per window (default: 100)
             window: Time window in seconds (default: 60)
+            endpoint_limits: Path pattern -> (limit, window) overrides
+            limiter: Limiter deciding each request (default: shared rate_limiter)
         """
-        super().__init__(app)
-        self.redis = redis_client
+        self.app = app
         self.default_limit = default_limit
         self.window = window
+        self.limiter = limiter or rate_limiter
 
         # Rate limits for specific endpoints
-        self.endpoint_limits = {
-            "/api/v1/auth/login": (5, 60),  # 5 requests per minute
-            "/api/v1/auth/register": (3, 300),  # 3 requests per 5 minutes
-            "/api/v1/auth/refresh": (10, 60),  # 10 requests per minute
+        prefix = settings.API_V1_PREFIX
+        self.endpoint_limits = endpoint_limits or {
+            f"{prefix}/auth/login": (5, 60),  # 5 requests per minute
+            f"{prefix}/auth/register": (3, 300),  # 3 requests per 5 minutes
+            f"{prefix}/auth/refresh": (10, 60),  # 10 requests per minute
+        }
+        self._rule_regex = _compile_rules(self.endpoint_limits)
+        self._rules = {
+            f"r{i}": (pattern, *limits)
+            for i, (pattern, limits) in enumerate(self.endpoint_limits.items())
         }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and apply rate limiting."""
-        # Skip rate limiting in development mode
-        if settings.ENVIRONMENT == "development":
-            return await call_next(request)
+        # Skip rate limiting for non-HTTP traffic and in development mode
+        if scope["type"] != "http" or settings.ENVIRONMENT == "development":
+            await self.app(scope, receive, send)
+            return
+
+        redis_client = scope["app"].state.resources.redis
 
         # Get client identifier (IP address or user ID if authenticated)
-        client_id = await self._get_client_id(request)
+        client_id = self._get_client_id(scope)
 
         # Get rate limit for this endpoint
-        path = request.url.path
-        limit, window = self.endpoint_limits.get(path, (self.default_limit, self.window))
+        path = scope["path"]
+        bucket, limit, window = self._match(path)
 
-        # Check rate limit
-        try:
-            allowed, retry_after = await self._check_rate_limit(client_id, path, limit, window)
+        result = await self._check_rate_limit(redis_client, client_id, bucket, limit, window)
 
-            if not allowed:
-                logger.warning(
-                    f"Rate limit exceeded for client {client_id} on {path}",
-                    extra={"client_id": client_id, "path": path},
-                )
-                raise RateLimitError(
-                    message="Rate limit exceeded. Please try again later.",
-                    retry_after=retry_after,
-                )
+        if result is None:
+            # Redis unavailable and limiter configured to fail open
+            await self.app(scope, receive, send)
+            return
 
-            # Add rate limit headers to response
-            response = await call_next(request)
-            response.headers["X-RateLimit-Limit"] = str(limit)
-            response.headers["X-RateLimit-Remaining"] = str(limit - 1)  # Simplified
-            response.headers["X-RateLimit-Window"] = str(window)
+        rate_headers = [
+            (b"x-ratelimit-limit", str(limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+            (b"x-ratelimit-reset", str(result.reset_after).encode()),
+            (b"x-ratelimit-window", str(window).encode()),
+        ]
 
-            return response
+        if not result.allowed:
+            logger.warning(
+                f"Rate limit exceeded for client {client_id} on {path}",
+                extra={"client_id": client_id, "path": path},
+            )
+            response = format_error_response(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Rate limit exceeded. Please try again later.",
+                {"retry_after": result.retry_after},
+            )
+            response.raw_headers.extend(rate_headers)
+            response.raw_headers.append((b"retry-after", str(result.retry_after).encode()))
+            await response(scope, receive, send)
+            return
 
-        except RateLimitError:
-            raise
-        except Exception as e:
-            logger.error(f"Rate limit error: {e}")
-            # Fail open - allow request if rate limiting fails
-            return await call_next(request)
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *rate_headers]
+            await send(message)
 
-    async def _get_client_id(self, request: Request) -> str:
-        """Get client identifier for rate limiting."""
-        # Try to get user ID from token first
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            # For authenticated users, we'd decode the token
-            # For now, use IP address
-            pass
+        await self.app(scope, receive, send_with_headers)
 
-        # Use IP address as fallback
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
+    def _match(self, path: str) -> tuple[str, int, int]:
+        """Return (bucket, limit, window) for a request path."""
+        match = self._rule_regex.fullmatch(path)
+        if match is None:
+            return path, self.default_limit, self.window
+        return self._rules[match.lastgroup]
 
-        return request.client.host if request.client else "unknown"
+    def _get_client_id(self, scope: Scope) -> str:
+        """Get client identifier for rate limiting."""
+        # Use the first X-Forwarded-For hop, then the peer address
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+
+        client = scope.get("client")
+        return client[0] if client else "unknown"
 
     async def _check_rate_limit(
-        self, client_id: str, path: str, limit: int, window: int
-    ) -> tuple[bool, int | None]:
+        self, redis_client, client_id: str, bucket: str, limit: int, window: int
+    ) -> RateLimitResult | None:
         """
         Check if request is within rate limit.
 
         Returns:
-            (allowed: bool, retry_after: int | None)
+            RateLimitResult, or None if the request should pass unchecked
         """
-        key = f"rate_limit:{client_id}:{path}"
-
-        try:
-            # Use Redis pipeline for atomic operation
-            pipe = self.redis.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, window)
-            results = await pipe.execute()
-
-            current = results[0]
-
-            if current > limit:
-                ttl = await self.redis.ttl(key)
-                return False, ttl
-
-            return True, None
-
-        except Exception as e:
-            logger.error(f"Redis rate limit check failed: {e}")
-            # Fail open - allow request
-            return True, None
+        key = f"rate_limit:{client_id}:{bucket}"
+        return await self.limiter.check(redis_client, key, limit, window)
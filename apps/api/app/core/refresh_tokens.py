@@ -0,0 +1,217 @@
+"""Redis-backed refresh-token sessions with rotation and revocation."""
+import logging
+import secrets
+from typing import Any
+
+import redis.asyncio as aioredis
+from redis.commands.core import AsyncScript
+
+from app.core.config import get_settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.instrumentation import timed
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Rotate a refresh token in one round trip.
+#
+# KEYS[1] family hash (current jti), KEYS[2] user generation counter
+# ARGV: presented jti, new jti, generation claim, family TTL (ms)
+#
+# Returns 1 rotated, 0 unknown/expired family, -1 reuse (family revoked),
+# -2 generation revoked by "log out everywhere"
+ROTATE_SCRIPT = """
+local generation = tonumber(redis.call('GET', KEYS[2]) or '0')
+if tonumber(ARGV[3]) < generation then
+    redis.call('DEL', KEYS[1])
+    return -2
+end
+
+local current = redis.call('HGET', KEYS[1], 'jti')
+if not current then
+    return 0
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return -1
+end
+
+redis.call('HSET', KEYS[1], 'jti', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+ROTATED, UNKNOWN, REUSED, GENERATION_REVOKED = 1, 0, -1, -2
+
+
+class RefreshTokenStore:
+    """
+    Track refresh-token families in Redis.
+
+    Each login starts a family whose hash holds the one valid ``jti``.
+    Refreshing swaps in a new ``jti``; presenting an already-rotated token
+    revokes the whole family (reuse detection). Every token also carries
+    the user's generation number, and "log out everywhere" is a single
+    INCR that invalidates all older generations. Generation counters never
+    expire, so the number only ever grows.
+
+    Outside production, when Redis is missing or failing, tokens are issued
+    with the same claims but not tracked, and any validly signed refresh
+    token is accepted. In production the store fails closed with a 503.
+    """
+
+    def __init__(self, ttl_seconds: int, key_prefix: str = "refresh:"):
+        """
+        Initialize store.
+
+        Args:
+            ttl_seconds: Family lifetime, renewed on each rotation
+            key_prefix: Redis key prefix
+        """
+        self.ttl_ms = ttl_seconds * 1000
+        self.key_prefix = key_prefix
+        self.redis: aioredis.Redis | None = None
+        self._script: AsyncScript | None = None
+
+        # Metrics
+        self.issued = 0
+        self.rotated = 0
+        self.rejected = 0
+        self.reuse_detected = 0
+        self.redis_errors = 0
+
+    def bind_redis(self, redis_client: aioredis.Redis | None) -> None:
+        """Attach (or detach) Redis."""
+        self.redis = redis_client
+        self._script = redis_client.register_script(ROTATE_SCRIPT) if redis_client else None
+
+    def _family_key(self, family: str) -> str:
+        return f"{self.key_prefix}family:{family}"
+
+    def _generation_key(self, user_id: str) -> str:
+        return f"{self.key_prefix}gen:{user_id}"
+
+    def _require_redis(self) -> aioredis.Redis | None:
+        """Return Redis, or None when tracking is off (outside production)."""
+        if self.redis is None and settings.ENVIRONMENT == "production":
+            raise ServiceUnavailableError("Session store unavailable")
+        return self.redis
+
+    def _handle_error(self, e: Exception) -> None:
+        """Record a Redis failure; fail closed in production."""
+        self.redis_errors += 1
+        logger.error(f"Refresh token store error: {e}")
+        if settings.ENVIRONMENT == "production":
+            raise ServiceUnavailableError("Session store unavailable") from e
+
+    async def issue(self, user_id: str) -> dict[str, Any]:
+        """
+        Start a new token family for user.
+
+        Returns:
+            Claims to embed in the refresh token (jti, fam, gen)
+
+        Raises:
+            ServiceUnavailableError: If Redis is unreachable in production
+        """
+        family = secrets.token_urlsafe(16)
+        claims: dict[str, Any] = {"jti": secrets.token_urlsafe(16), "fam": family, "gen": 0}
+        redis_client = self._require_redis()
+        if redis_client is not None:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(self._generation_key(user_id))
+                    pipe.hset(self._family_key(family), "jti", claims["jti"])
+                    pipe.pexpire(self._family_key(family), self.ttl_ms)
+                    with timed("redis"):
+                        generation, _, _ = await pipe.execute()
+                claims["gen"] = int(generation or 0)
+            except Exception as e:
+                self._handle_error(e)
+        self.issued += 1
+        return claims
+
+    async def rotate(self, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Consume a verified refresh-token payload and issue its successor.
+
+        Args:
+            payload: Decoded refresh token
+
+        Returns:
+            Claims for the replacement token, or None if the token is revoked,
+            expired from the store, or was already used
+
+        Raises:
+            ServiceUnavailableError: If Redis is unreachable in production
+        """
+        family = payload.get("fam")
+        if family is None:
+            self.rejected += 1
+            return None
+        claims = {"jti": secrets.token_urlsafe(16), "fam": family, "gen": payload.get("gen", 0)}
+
+        script = self._script if self._require_redis() is not None else None
+        if script is not None:
+            try:
+                with timed("redis"):
+                    status = await script(
+                        keys=[self._family_key(family), self._generation_key(payload["sub"])],
+                        args=[payload.get("jti", ""), claims["jti"], claims["gen"], self.ttl_ms],
+                    )
+            except Exception as e:
+                self._handle_error(e)
+                status = ROTATED
+
+            if status != ROTATED:
+                self.rejected += 1
+                if status == REUSED:
+                    self.reuse_detected += 1
+                    logger.warning(
+                        f"Refresh token reuse detected for user {payload['sub']}, "
+                        f"revoked family {family}"
+                    )
+                return None
+
+        self.rotated += 1
+        return claims
+
+    async def revoke_family(self, payload: dict[str, Any]) -> None:
+        """Revoke the family of a refresh token (single-session logout)."""
+        family = payload.get("fam")
+        if family is None or self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._family_key(family))
+        except Exception as e:
+            self._handle_error(e)
+
+    async def revoke_user(self, user_id: str) -> None:
+        """
+        Invalidate every refresh token issued to user so far.
+
+        Access tokens already issued stay valid until they expire.
+        """
+        redis_client = self._require_redis()
+        if redis_client is None:
+            return
+        try:
+            # No TTL: if the counter reset to 0, a later bump would only reach
+            # a generation that tokens already carry
+            await redis_client.incr(self._generation_key(user_id))
+        except Exception as e:
+            self._handle_error(e)
+
+    def stats(self) -> dict[str, Any]:
+        """Return store metrics."""
+        return {
+            "tracking": self.redis is not None,
+            "issued": self.issued,
+            "rotated": self.rotated,
+            "rejected": self.rejected,
+            "reuse_detected": self.reuse_detected,
+            "redis_errors": self.redis_errors,
+        }
+
+
+refresh_tokens = RefreshTokenStore(ttl_seconds=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
@@ -0,0 +1,275 @@
+"""Shared resources owned by the application lifespan."""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any
+
+import redis.asyncio as aioredis
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from app.core.config import get_settings
+from app.core.hashing import PasswordHashPool, hash_pool
+from app.core.job_events import JobEventBroker, job_events
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.core.rate_limit import GCRA_LEASE_SCRIPT, HierarchicalRateLimiter, rate_limiter
+from app.core.refresh_tokens import ROTATE_SCRIPT, RefreshTokenStore, refresh_tokens
+from app.core.security import VerifiedTokenCache, dummy_hashes, token_cache
+from app.db.base import async_session_maker, engine, pool_stats, replicas
+from app.db.routing import ReplicaSet
+from app.services.backtest_jobs import BacktestJobManager, backtest_jobs
+from app.services.indicator_cache import IndicatorCache, indicator_cache
+from app.services.ohlcv_store import OHLCVStore, ohlcv_store
+from app.services.optimizer import BacktestOptimizer, backtest_optimizer
+from app.services.user import get_user_by_email, get_user_by_id
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class Resources:
+    """
+    Connections, pools and caches shared by every request.
+
+    One instance lives on ``app.state.resources`` and is reached through the
+    dependencies in app.core.deps (get_redis, get_engine, ...), so handlers
+    never touch module globals and tests can swap any of them with
+    ``app.dependency_overrides``.
+
+    ``start()`` connects and warms everything up before the first request:
+    database pools are filled and each connection runs the hot user queries
+    once (priming SQLAlchemy's compiled cache and asyncpg's prepared
+    statements), Lua scripts are loaded into Redis and hashing workers are
+    spawned. ``close()`` waits for checked-out connections to come back
+    before disposing pools.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        replicas: ReplicaSet,
+        session_maker: async_sessionmaker[AsyncSession],
+        hash_pool: PasswordHashPool,
+        principal_cache: PrincipalCache,
+        refresh_tokens: RefreshTokenStore,
+        token_cache: VerifiedTokenCache,
+        rate_limiter: HierarchicalRateLimiter,
+        ohlcv_store: OHLCVStore,
+        indicator_cache: IndicatorCache,
+        job_events: JobEventBroker,
+        backtest_jobs: BacktestJobManager,
+        backtest_optimizer: BacktestOptimizer,
+    ):
+        """
+        Initialize resources (nothing is connected until start()).
+
+        Args:
+            engine: Primary database engine
+            replicas: Read replicas
+            session_maker: Session factory routing between primary and replicas
+            hash_pool: Password hashing pool
+            principal_cache: Authenticated principal cache
+            refresh_tokens: Refresh-token session store
+            token_cache: Verified access-token cache
+            rate_limiter: Request rate limiter
+            ohlcv_store: Columnar market data store
+            indicator_cache: Shared indicator cache
+            job_events: Job progress event broker
+            backtest_jobs: Backtest job manager
+            backtest_optimizer: Parameter sweep pool
+        """
+        self.engine = engine
+        self.replicas = replicas
+        self.session_maker = session_maker
+        self.hash_pool = hash_pool
+        self.principal_cache = principal_cache
+        self.refresh_tokens = refresh_tokens
+        self.token_cache = token_cache
+        self.rate_limiter = rate_limiter
+        self.ohlcv_store = ohlcv_store
+        self.indicator_cache = indicator_cache
+        self.job_events = job_events
+        self.backtest_jobs = backtest_jobs
+        self.backtest_optimizer = backtest_optimizer
+        self.redis: aioredis.Redis | None = None
+        self.ready = False
+
+    @classmethod
+    def from_settings(cls) -> "Resources":
+        """Collect the application's shared resources."""
+        return cls(
+            engine=engine,
+            replicas=replicas,
+            session_maker=async_session_maker,
+            hash_pool=hash_pool,
+            principal_cache=principal_cache,
+            refresh_tokens=refresh_tokens,
+            token_cache=token_cache,
+            rate_limiter=rate_limiter,
+            ohlcv_store=ohlcv_store,
+            indicator_cache=indicator_cache,
+            job_events=job_events,
+            backtest_jobs=backtest_jobs,
+            backtest_optimizer=backtest_optimizer,
+        )
+
+    def bind_redis(self, redis_client: aioredis.Redis | None) -> None:
+        """Attach (or detach) Redis for every Redis-backed component."""
+        self.redis = redis_client
+        self.principal_cache.bind_redis(redis_client)
+        self.refresh_tokens.bind_redis(redis_client)
+        self.job_events.bind_redis(redis_client)
+        self.replicas.bind_redis(redis_client)
+
+    async def start(self) -> None:
+        """Connect and warm up; called once by the lifespan before serving."""
+        started = time.perf_counter()
+        await self._connect_redis()
+
+        # Start replica health checks (no-op without replicas)
+        await self.replicas.start()
+
+        if settings.WARMUP_ON_STARTUP:
+            await asyncio.gather(
+                self._warm_engine(self.engine),
+                *(self._warm_engine(replica.engine) for replica in self.replicas.replicas),
+                self.hash_pool.warm_up(),
+            )
+
+        # Fail backtests left active by a process that crashed or was killed
+        await self.backtest_jobs.start()
+
+        # Precompute the timing-equalization hash so the first failed login
+        # doesn't pay for an extra bcrypt round
+        await dummy_hashes.get_or_create()
+
+        self.ready = True
+        logger.info(f"Resources ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def _connect_redis(self) -> None:
+        """Connect to Redis and preload Lua scripts (stays unbound on failure)."""
+        try:
+            redis_client = await aioredis.from_url(
+                settings.REDIS_URL,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+            await redis_client.ping()
+            logger.info("Connected to Redis")
+        except Exception as e:
+            logger.warning(f"Failed to connect to Redis: {e}")
+            return
+
+        self.bind_redis(redis_client)
+        try:
+            # First EVALSHA would otherwise miss and resend the script
+            await asyncio.gather(
+                redis_client.script_load(GCRA_LEASE_SCRIPT),
+                redis_client.script_load(ROTATE_SCRIPT),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to preload Redis scripts: {e}")
+
+    async def _warm_engine(self, db_engine: AsyncEngine) -> None:
+        """Fill the pool and run the hot queries once on every connection."""
+        name = db_engine.url.render_as_string(hide_password=True)
+        size = db_engine.pool.size() if hasattr(db_engine.pool, "size") else 1
+        connections = []
+        try:
+            # Held open together, so the pool has to create each one
+            results = await asyncio.gather(
+                *(db_engine.connect() for _ in range(size)), return_exceptions=True
+            )
+            connections = [result for result in results if isinstance(result, AsyncConnection)]
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+            await asyncio.gather(*(self._prime(connection) for connection in connections))
+            logger.info(f"Warmed {len(connections)} connection(s) to {name}")
+        except Exception as e:
+            logger.warning(f"Database warm-up failed for {name}: {e}")
+        finally:
+            for connection in connections:
+                await connection.close()
+
+    @staticmethod
+    async def _prime(connection: AsyncConnection) -> None:
+        """Run the per-request lookups so their statements are cached."""
+        async with AsyncSession(bind=connection) as session:
+            await get_user_by_id(session, uuid.UUID(int=0))
+            await get_user_by_email(session, "")
+
+    async def close(self, timeout: float | None = None) -> None:
+        """
+        Drain and release everything.
+
+        Args:
+            timeout: Seconds to wait for checked-out database connections
+                (streaming exports, background work) before disposing
+                (default: SHUTDOWN_DRAIN_TIMEOUT)
+        """
+        self.ready = False
+        if timeout is None:
+            timeout = settings.SHUTDOWN_DRAIN_TIMEOUT
+        deadline = time.monotonic() + timeout
+
+        # Backtest jobs store their final state, so stop them while the
+        # database and Redis are still up
+        await self.backtest_jobs.close(timeout=timeout)
+
+        engines = [self.engine, *(replica.engine for replica in self.replicas.replicas)]
+        for db_engine in engines:
+            await self._drain(db_engine, deadline)
+
+        await self.replicas.stop()
+        await self.engine.dispose()
+
+        redis_client = self.redis
+        self.bind_redis(None)
+        if redis_client is not None:
+            await redis_client.aclose()
+            logger.info("Closed Redis connection")
+
+        self.hash_pool.shutdown()
+        self.backtest_optimizer.shutdown()
+
+    @staticmethod
+    async def _drain(db_engine: AsyncEngine, deadline: float) -> None:
+        """Wait until no connections are checked out or the deadline passes."""
+        checkedout = getattr(db_engine.pool, "checkedout", None)
+        if checkedout is None:
+            return
+        while checkedout() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if checkedout():
+            logger.warning(
+                f"Closing {db_engine.url.render_as_string(hide_password=True)} "
+                f"with {checkedout()} connection(s) still in use"
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Return component metrics."""
+        return {
+            "ready": self.ready,
+            "password_hashing": self.hash_pool.stats(),
+            "principal_cache": self.principal_cache.stats(),
+            "token_cache": self.token_cache.stats(),
+            "refresh_tokens": self.refresh_tokens.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "ohlcv_store": self.ohlcv_store.stats(),
+            "indicator_cache": self.indicator_cache.stats(),
+            "job_events": self.job_events.stats(),
+            "backtest_jobs": self.backtest_jobs.stats(),
+            "backtest_optimizer": self.backtest_optimizer.stats(),
+            "db_pool": pool_stats(self.engine),
+            "read_your_writes": self.replicas.pin_stats(),
+            "db_replicas": [
+                {**health, "pool": pool_stats(replica.engine)}
+                for health, replica in zip(self.replicas.stats(), self.replicas.replicas)
+            ],
+        }
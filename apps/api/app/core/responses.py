@@ -0,0 +1,44 @@
+"""Fast JSON response classes."""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - optional speedup
+    HAS_ORJSON = False
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to compact JSON bytes.
+
+    Pydantic models go through their compiled serializer; anything else uses
+    orjson when installed, falling back to the stdlib encoder.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if HAS_ORJSON:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson / pydantic-core instead of stdlib json.
+
+    Used as the app's default response class. Endpoints that already hold a
+    validated schema object can also return ``FastJSONResponse(model)``
+    directly, which skips FastAPI's ``response_model`` re-validation and
+    serializes the model straight to bytes. The route's ``response_model``
+    still documents the shape in OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
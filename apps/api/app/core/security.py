@@ -1,17 +1,67 @@
 """Security utilities for authentication and authorization."""
+import hashlib
+import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable
 
-from jose import JWTError, jwt
+from jose import JWTError
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
+from app.core.hashing import hash_pool
+from app.core.instrumentation import timed
+from app.core.jwt_keys import key_ring
 
 settings = get_settings()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def _hash_with_config(config: str, secret: str) -> str:
+    """Hash secret with a CryptContext rebuilt from its config (picklable for process pools)."""
+    return CryptContext.from_string(config).hash(secret)
+
+
+class DummyHashCache:
+    """
+    Dummy password hashes used to equalize login timing for unknown emails.
+
+    One hash is kept per CryptContext configuration, so a failed lookup costs
+    exactly one verify at the current cost factor. Changing the context
+    (e.g. raising bcrypt rounds) yields a new key and the hash is rotated on
+    next use.
+    """
+
+    def __init__(self, context: CryptContext):
+        self._context = context
+        self._hashes: dict[str, str] = {}
+
+    def _key(self) -> str:
+        """Identify the active context configuration."""
+        return self._context.to_string()
+
+    def get(self) -> str | None:
+        """Return dummy hash for the current configuration, if computed."""
+        return self._hashes.get(self._key())
+
+    def set(self, key: str, dummy_hash: str) -> None:
+        """Store dummy hash for a configuration, dropping stale ones."""
+        self._hashes = {key: dummy_hash}
+
+    async def get_or_create(self) -> str:
+        """Return dummy hash, hashing a random secret in the pool on miss."""
+        key = self._key()
+        dummy_hash = self._hashes.get(key)
+        if dummy_hash is None:
+            dummy_hash = await hash_pool.run(_hash_with_config, key, secrets.token_urlsafe(32))
+            self.set(key, dummy_hash)
+        return dummy_hash
+
+
+dummy_hashes = DummyHashCache(pwd_context)
+
+
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token."""
     if expires_delta:
@@ -21,26 +71,113 @@ def create_access_token(subject: str | Any, expires_delta: timedelta | None = No
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode = {"sub": str(subject), "exp": expire, "type": "access"}
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
-def create_refresh_token(subject: str | Any) -> str:
-    """Create JWT refresh token."""
+def create_refresh_token(subject: str | Any, claims: dict[str, Any] | None = None) -> str:
+    """Create JWT refresh token, with session claims (jti, fam, gen) if given."""
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode = {"sub": str(subject), "exp": expire, "type": "refresh"}
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    to_encode = {**(claims or {}), "sub": str(subject), "exp": expire, "type": "refresh"}
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
+RevocationCheck = Callable[[dict[str, Any]], bool]
+
+
+class VerifiedTokenCache:
+    """
+    Cache of verified access-token payloads.
+
+    Keyed by a digest of the raw token so the token itself is never stored.
+    Each entry expires at the token's ``exp`` claim, so a hit is always a
+    token that would still pass signature and expiry checks. Revocation
+    checks run on every lookup, hit or miss.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialize token cache.
+
+        Args:
+            maxsize: Max cached tokens (0 disables caching)
+        """
+        self._cache: TTLCache[bytes, dict[str, Any]] = TTLCache(maxsize=maxsize)
+        self._revocation_checks: list[RevocationCheck] = []
+        self.revoked = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether payloads are cached."""
+        return self._cache.maxsize > 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """Return cache key for a raw token."""
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Return cached payload for token, if present and not expired."""
+        if not self.enabled:
+            return None
+        return self._cache.get(self.digest(token))
+
+    def set(self, token: str, payload: dict[str, Any]) -> None:
+        """Cache payload until the token's exp."""
+        exp = payload.get("exp")
+        if not self.enabled or exp is None:
+            return
+        self._cache.set(self.digest(token), payload, expires_at=float(exp))
+
+    def evict(self, token: str) -> None:
+        """Drop token from the cache."""
+        self._cache.delete(self.digest(token))
+
+    def add_revocation_check(self, check: RevocationCheck) -> None:
+        """Register a predicate that returns True for revoked payloads."""
+        self._revocation_checks.append(check)
+
+    def is_revoked(self, payload: dict[str, Any]) -> bool:
+        """Run revocation checks against a verified payload."""
+        for check in self._revocation_checks:
+            if check(payload):
+                self.revoked += 1
+                return True
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache metrics."""
+        return {**self._cache.stats(), "revoked": self.revoked}
+
+
+token_cache = VerifiedTokenCache(maxsize=settings.TOKEN_CACHE_MAXSIZE)
+
+
 def verify_token(token: str) -> dict[str, Any] | None:
-    """Verify JWT token and return payload."""
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError:
+    """
+    Verify JWT token and return payload.
+
+    Access tokens are cached after the first successful decode, so repeat
+    presentations skip signature verification and claim parsing.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            with timed("token_decode"):
+                payload = key_ring.decode(token)
+        except JWTError:
+            return None
+        # Refresh tokens are presented once, caching them only evicts access tokens
+        if payload.get("type") == "access":
+            token_cache.set(token, payload)
+
+    if token_cache.is_revoked(payload):
         return None
 
+    # Callers get a copy so the cached payload can't be mutated
+    return dict(payload)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -50,3 +187,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await hash_pool.run(get_password_hash, password)
@@ -1,20 +1,82 @@
 """Database base and utilities."""
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import Any
+
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import get_settings
+from app.core.instrumentation import instrument_engine
+from app.db.pool import InstrumentedAsyncPool
+from app.db.routing import ReplicaSet, routing_session_class
+from app.db.tracing import install_query_tracer
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Build create_async_engine kwargs for a database URL from settings."""
+    options: dict[str, Any] = {"echo": settings.DEBUG, "future": True}
+    backend = make_url(url).get_backend_name()
+
+    # SQLite (tests, local stand-ins) keeps SQLAlchemy's default pool
+    if backend == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if make_url(url).get_driver_name() == "asyncpg":
+        connect_args: dict[str, Any] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_STATEMENT_CACHE_SIZE == 0:
+            # Also disable asyncpg's own cache (required behind PgBouncer)
+            connect_args["statement_cache_size"] = 0
+        options["connect_args"] = connect_args
+    return options
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """Return connection pool telemetry for an engine."""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedAsyncPool):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+replicas = ReplicaSet(
+    [create_async_engine(url, **engine_options(url)) for url in settings.replica_urls_list],
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    pin_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
 )
 
+for pool_name, db_engine in (
+    ("primary", engine),
+    *((replica.name, replica.engine) for replica in replicas.replicas),
+):
+    instrument_engine(db_engine.sync_engine)
+    install_query_tracer(db_engine.sync_engine)
+    if isinstance(db_engine.pool, InstrumentedAsyncPool):
+        db_engine.pool.set_name(pool_name)
+
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=routing_session_class(engine, replicas),
     expire_on_commit=False,
 )
 
@@ -33,4 +95,4 @@ async def init_db() -> None:
     Use `alembic upgrade head` to create/modify tables in production.
     """
     # Import all models here to ensure they are registered with Base.metadata
-    from app.models import user  # noqa: F401
+    from app.models import backtest, ohlcv, user  # noqa: F401
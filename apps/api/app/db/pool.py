@@ -0,0 +1,91 @@
+"""Instrumented connection pool."""
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection
+
+from app.core.instrumentation import DB_POOL_OVERFLOW, DB_POOL_TIMEOUTS, DB_POOL_WAIT_SECONDS
+
+
+class PoolMetrics:
+    """
+    Checkout telemetry for one connection pool.
+
+    Wait time, timeouts and overflow are children of the Prometheus
+    registry families, labelled with the pool name, so they are exposed on
+    /metrics as well as in the JSON stats.
+    """
+
+    def __init__(self, name: str = "primary"):
+        self.name = name
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = DB_POOL_TIMEOUTS.labels(name)
+        self.overflow_events = DB_POOL_OVERFLOW.labels(name)
+        self.wait = DB_POOL_WAIT_SECONDS.labels(name)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return metrics for JSON stats."""
+        return {
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "timeouts": int(self.timeouts.value),
+            "overflow_events": int(self.overflow_events.value),
+            "wait_seconds": self.wait.snapshot(),
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout wait time and overflow.
+
+    Wait time covers the whole checkout: waiting for a free connection,
+    opening a new one when the pool grows, and the pre-ping if enabled.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def set_name(self, name: str) -> None:
+        """Label this pool's metrics (call before the first checkout)."""
+        self.metrics = PoolMetrics(name)
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts.inc()
+            raise
+        finally:
+            self.metrics.wait.observe(time.perf_counter() - start)
+        self.metrics.checkouts += 1
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        if opened and self._overflow > 0:
+            self.metrics.overflow_events.inc()
+        return opened
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        self.metrics.checkins += 1
+        super()._do_return_conn(record)
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        # Keep counters across pool recreation (e.g. after engine.dispose())
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> dict[str, Any]:
+        """Return current pool state and telemetry."""
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **self.metrics.snapshot(),
+        }
@@ -0,0 +1,345 @@
+"""Read-replica routing for ORM sessions."""
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import redis.asyncio as aioredis
+from sqlalchemy import event, make_url, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import CompoundSelect, Select
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Seconds of replication delay; 0 when the replica has replayed everything it
+# received (an idle primary would otherwise look like growing lag)
+PG_REPLICATION_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+# Monotonic deadline until which reads in this context go to the primary
+_primary_pinned_until: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "primary_pinned_until", default=0.0
+)
+
+
+def pin_primary(seconds: float) -> None:
+    """Route reads in the current context to the primary for a while."""
+    _primary_pinned_until.set(max(_primary_pinned_until.get(), time.monotonic() + seconds))
+
+
+def primary_pinned() -> bool:
+    """Whether reads in the current context must use the primary."""
+    return _primary_pinned_until.get() > time.monotonic()
+
+
+@dataclass(slots=True)
+class _RequestWrites:
+    """Client a request is served for and whether it committed a write."""
+
+    client: str | None = None
+    wrote: bool = False
+
+
+# Set per HTTP request by ReadYourWritesMiddleware; mutated, never re-set, so
+# copied contexts (threadpool endpoints, spawned tasks) share it
+_request_writes: contextvars.ContextVar[_RequestWrites | None] = contextvars.ContextVar(
+    "request_writes", default=None
+)
+
+
+class Replica:
+    """A read replica engine and its last observed health."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.healthy = False
+        self.lag: float | None = None
+        self.last_error: str | None = None
+        self.reads = 0
+
+
+class ReplicaSet:
+    """
+    Read replicas with periodic health and replication-lag checks.
+
+    A replica serves reads only after a successful check showing lag within
+    ``max_lag``; until the first check (or when every replica is unhealthy)
+    reads fall back to the primary.
+
+    Read-your-writes also holds across requests: after a client (the
+    authenticated user) commits a write, its reads stay on the primary for
+    ``pin_seconds``, in every API process. The pin is a Redis key expiring
+    after ``pin_seconds``, checked with PTTL so process clocks don't matter;
+    without Redis it only holds within this process.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        max_lag: float = 5.0,
+        check_interval: float = 10.0,
+        pin_seconds: float = 5.0,
+        key_prefix: str = "primary_pin:",
+    ):
+        """
+        Initialize replica set.
+
+        Args:
+            engines: Replica engines
+            max_lag: Max replication lag in seconds before a replica is skipped
+            check_interval: Seconds between health checks
+            pin_seconds: How long a client's reads stick to the primary after a commit
+            key_prefix: Redis key prefix of client pins
+        """
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = pin_seconds
+        self.key_prefix = key_prefix
+        self.redis: aioredis.Redis | None = None
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._task: asyncio.Task | None = None
+        # Client -> monotonic deadline, used when Redis is unavailable
+        self._local_pins: dict[str, float] = {}
+        self.pins = 0
+        self.pinned_requests = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def bind_redis(self, redis_client: aioredis.Redis | None) -> None:
+        """Attach (or detach) Redis for pins shared across processes."""
+        self.redis = redis_client
+
+    async def pin_client(self, client: str) -> None:
+        """Send a client's reads to the primary for pin_seconds."""
+        now = time.monotonic()
+        if len(self._local_pins) >= 10000:
+            self._local_pins = {c: t for c, t in self._local_pins.items() if t > now}
+        self._local_pins[client] = now + self.pin_seconds
+        self.pins += 1
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    self.key_prefix + client, 1, px=max(1, round(self.pin_seconds * 1000))
+                )
+            except Exception as e:
+                logger.warning(f"Could not store primary pin of {client}: {e}")
+
+    async def client_pin(self, client: str) -> float:
+        """Seconds a client's reads remain pinned to the primary (0 if not pinned)."""
+        if self.redis is not None:
+            try:
+                return max(await self.redis.pttl(self.key_prefix + client), 0) / 1000
+            except Exception as e:
+                logger.warning(f"Could not read primary pin of {client}: {e}")
+        return max(self._local_pins.get(client, 0.0) - time.monotonic(), 0.0)
+
+    async def follow_client(self, client: str) -> None:
+        """
+        Serve the current request for a client.
+
+        Applies the client's pin to this request, and lets a write committed
+        by the request pin the client's following requests.
+        """
+        state = _request_writes.get()
+        if state is not None:
+            state.client = client
+        if not self.replicas or not self.pin_seconds:
+            return
+        remaining = await self.client_pin(client)
+        if remaining > 0:
+            self.pinned_requests += 1
+            pin_primary(remaining)
+
+    def choose(self) -> Replica | None:
+        """Return the next healthy replica (round robin), or None."""
+        if self._cycle is None:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                replica.reads += 1
+                return replica
+        return None
+
+    async def check(self) -> None:
+        """Probe every replica and update its health."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    if make_url(replica.engine.url).get_backend_name() == "postgresql":
+                        lag = await conn.scalar(PG_REPLICATION_LAG_SQL)
+                    else:
+                        # Non-Postgres stand-ins (e.g. SQLite in tests) have no lag
+                        lag = await conn.scalar(text("SELECT 0"))
+                replica.lag = float(lag or 0)
+                replica.last_error = None
+            except Exception as e:
+                replica.lag = None
+                replica.last_error = str(e)
+
+            healthy = replica.lag is not None and replica.lag <= self.max_lag
+            if healthy != replica.healthy:
+                state = "healthy" if healthy else "unhealthy"
+                logger.warning(
+                    f"Replica {replica.name} is {state} "
+                    f"(lag={replica.lag}, error={replica.last_error})"
+                )
+            replica.healthy = healthy
+
+    async def _run(self) -> None:
+        """Health check loop."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Replica health check failed: {e}")
+
+    async def start(self) -> None:
+        """Run an initial check and start periodic checks."""
+        if not self.replicas:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop health checks and dispose replica engines."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return per-replica health."""
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag,
+                "reads": replica.reads,
+                "error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+    def pin_stats(self) -> dict[str, Any]:
+        """Return read-your-writes pin metrics."""
+        return {
+            "pins": self.pins,
+            "pinned_requests": self.pinned_requests,
+            "shared": self.redis is not None,
+        }
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a replica and everything else to the primary.
+
+    Reads stay on the primary when the session has already written, when
+    ``session.info["use_primary"]`` is set, or while the context is pinned:
+    after a commit in the same request, or after an earlier request of the
+    same client committed (see ReplicaSet.follow_client).
+    """
+
+    primary: AsyncEngine
+    replicas: ReplicaSet
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        if (
+            self._flushing
+            or not isinstance(clause, (Select, CompoundSelect))
+            or clause._for_update_arg is not None
+        ):
+            if clause is not None or self._flushing:
+                self.info["routing_wrote"] = True
+            return self.primary.sync_engine
+
+        if self.info.get("routing_wrote") or self.info.get("use_primary") or primary_pinned():
+            return self.primary.sync_engine
+
+        replica = self.replicas.choose()
+        if replica is None:
+            return self.primary.sync_engine
+        return replica.engine.sync_engine
+
+
+def routing_session_class(primary: AsyncEngine, replicas: ReplicaSet) -> type[Session]:
+    """Build a RoutingSession subclass bound to the given engines."""
+    return type("RoutingSession", (RoutingSession,), {"primary": primary, "replicas": replicas})
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_after_write(session: RoutingSession) -> None:
+    """Keep this context's reads on the primary until replicas catch up."""
+    if session.info.get("routing_wrote"):
+        pin_primary(session.replicas.pin_seconds)
+        state = _request_writes.get()
+        if state is not None:
+            state.wrote = True
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin a client's reads to the primary after a request of theirs wrote (pure ASGI).
+
+    The pin is stored before the response starts, so a request the client
+    sends after seeing the response already reads from the primary.
+    """
+
+    def __init__(self, app: ASGIApp, replicas: ReplicaSet | None = None):
+        """
+        Initialize middleware.
+
+        Args:
+            app: ASGI application
+            replicas: Replica set (default: read from ``app.state.resources``
+                on each request, so it can be installed before the lifespan runs)
+        """
+        self.app = app
+        self.replicas = replicas
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        replicas = self.replicas
+        if replicas is None:
+            replicas = scope["app"].state.resources.replicas
+        if not replicas or not replicas.pin_seconds:
+            await self.app(scope, receive, send)
+            return
+
+        state = _RequestWrites()
+
+        async def send_pinned(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.wrote and state.client:
+                state.wrote = False
+                await replicas.pin_client(state.client)
+            await send(message)
+
+        token = _request_writes.set(state)
+        try:
+            await self.app(scope, receive, send_pinned)
+        finally:
+            _request_writes.reset(token)
@@ -0,0 +1,168 @@
+"""Per-request SQL query tracing with budgets."""
+import contextlib
+import contextvars
+import logging
+import time
+from collections import Counter
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceededError(Exception):
+    """A traced block issued more (or more repeated) statements than allowed."""
+
+
+class QueryTrace:
+    """Statements executed while a trace is active."""
+
+    def __init__(self, name: str = "", budget: int = 0, repeat_limit: int = 0):
+        """
+        Initialize trace.
+
+        Args:
+            name: Label for log messages (e.g. "POST /api/v1/auth/register")
+            budget: Max statements (0 = unlimited)
+            repeat_limit: Max executions of any single statement (0 = unlimited)
+        """
+        self.name = name
+        self.budget = budget
+        self.repeat_limit = repeat_limit
+        self.statements: Counter[str] = Counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.slow: list[tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Record one executed statement."""
+        self.statements[statement] += 1
+        self.count += 1
+        self.seconds += seconds
+        if settings.DB_SLOW_QUERY_MS and seconds * 1000 >= settings.DB_SLOW_QUERY_MS:
+            self.slow.append((statement, seconds))
+
+    def duplicates(self) -> dict[str, int]:
+        """Statements executed more than once (N+1 candidates)."""
+        return {statement: n for statement, n in self.statements.items() if n > 1}
+
+    def violations(self) -> list[str]:
+        """Describe exceeded budgets, empty when within budget."""
+        problems = []
+        if self.budget and self.count > self.budget:
+            problems.append(f"{self.count} statements (budget {self.budget})")
+        if self.repeat_limit:
+            for statement, n in self.duplicates().items():
+                if n > self.repeat_limit:
+                    problems.append(
+                        f"statement repeated {n}x (limit {self.repeat_limit}): "
+                        f"{_shorten(statement)}"
+                    )
+        return problems
+
+    def summary(self) -> dict[str, Any]:
+        """Return trace totals."""
+        return {
+            "statements": self.count,
+            "duplicates": sum(n - 1 for n in self.duplicates().values()),
+            "seconds": round(self.seconds, 6),
+            "slow": len(self.slow),
+        }
+
+
+# Traces active in this context, innermost last
+_active_traces: contextvars.ContextVar[tuple[QueryTrace, ...]] = contextvars.ContextVar(
+    "active_query_traces", default=()
+)
+
+
+def _shorten(statement: str, limit: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+@contextlib.contextmanager
+def trace_queries(
+    name: str = "",
+    budget: int = 0,
+    repeat_limit: int = 0,
+    action: str = "raise",
+) -> Iterator[QueryTrace]:
+    """
+    Trace statements executed in this context (including awaited calls).
+
+    Usable in tests to pin query counts:
+
+        with trace_queries(budget=2) as trace:
+            await client.post("/api/v1/auth/register", json=...)
+
+    Args:
+        name: Label for log messages
+        budget: Max statements (0 = unlimited)
+        repeat_limit: Max executions of any single statement (0 = unlimited)
+        action: "raise" QueryBudgetExceededError or "log" a warning on violation
+
+    Raises:
+        QueryBudgetExceededError: On exit, if a budget was exceeded and action is "raise"
+    """
+    trace = QueryTrace(name, budget, repeat_limit)
+    token = _active_traces.set((*_active_traces.get(), trace))
+    try:
+        yield trace
+    finally:
+        _active_traces.reset(token)
+
+    for statement, seconds in trace.slow:
+        logger.warning(f"Slow query ({seconds * 1000:.0f} ms) in {name}: {_shorten(statement)}")
+
+    problems = trace.violations()
+    if problems:
+        message = f"Query budget exceeded in {name or 'traced block'}: {'; '.join(problems)}"
+        if action == "raise":
+            raise QueryBudgetExceededError(message)
+        logger.warning(message)
+
+
+# Start time of a traced statement, kept on its ExecutionContext (per execution)
+_TRACE_START = "_trace_query_start"
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    if context is not None and _active_traces.get():
+        setattr(context, _TRACE_START, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    traces = _active_traces.get()
+    started = getattr(context, _TRACE_START, None)
+    if not traces or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for trace in traces:
+        trace.record(statement, elapsed)
+
+
+def install_query_tracer(engine: Engine) -> None:
+    """Feed statements executed on engine into active traces."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -3,49 +3,41 @@ import logging
 from contextlib import asynccontextmanager
 
 import redis.asyncio as aioredis
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import api_router
 from app.core.config import get_settings
+from app.core.deps import get_current_superuser, get_redis, get_resources
 from app.core.exceptions import setup_exception_handlers
+from app.core.instrumentation import MetricsMiddleware, metrics
+from app.core.jwt_keys import key_ring
+from app.core.principal_cache import Principal
 from app.core.rate_limit import RateLimitMiddleware
+from app.core.resources import Resources
+from app.core.responses import FastJSONResponse
+from app.db.routing import ReadYourWritesMiddleware
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Global Redis client
-redis_client: aioredis.Redis | None = None
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global redis_client
+    resources: Resources = app.state.resources
 
     # Startup
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
-
-    # Connect to Redis
-    try:
-        redis_client = await aioredis.from_url(
-            settings.REDIS_URL,
-            encoding="utf-8",
-            decode_responses=True,
-        )
-        await redis_client.ping()
-        logger.info("Connected to Redis")
-    except Exception as e:
-        logger.warning(f"Failed to connect to Redis: {e}")
+    await resources.start()
 
     yield
 
-    # Shutdown
+    # Shutdown (the server has stopped accepting and finished in-flight requests)
     logger.info("Shutting down...")
-    if redis_client:
-        await redis_client.close()
-        logger.info("Closed Redis connection")
+    await resources.close()
 
 
 app = FastAPI(
@@ -55,8 +47,12 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Shared connections and caches, connected by the lifespan
+app.state.resources = Resources.from_settings()
+
 # Setup exception handlers
 setup_exception_handlers(app)
 
@@ -69,9 +65,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add rate limiting middleware (if Redis is available)
-if redis_client:
-    app.add_middleware(RateLimitMiddleware, redis_client=redis_client)
+# Keep a client's reads on the primary after it writes (no-op without replicas)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Add rate limiting middleware (uses the lifespan-managed Redis client)
+app.add_middleware(RateLimitMiddleware)
+
+# Outermost, so latency includes every other middleware
+if metrics.enabled:
+    app.add_middleware(MetricsMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
@@ -88,7 +90,7 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(redis_client: aioredis.Redis | None = Depends(get_redis)):
     """Health check endpoint."""
     health_status = {"status": "healthy", "redis": "disconnected"}
 
@@ -100,3 +102,26 @@ async def health_check():
             health_status["redis"] = "error"
 
     return health_status
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    """Public JWT verification keys (empty for HS* algorithms)."""
+    return FastJSONResponse(key_ring.jwks(), headers={"Cache-Control": "public, max-age=300"})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics (404 unless METRICS_ENABLED)."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health/stats")
+async def health_stats(
+    _: Principal = Depends(get_current_superuser),
+    resources: Resources = Depends(get_resources),
+):
+    """Internal component metrics (superusers only)."""
+    return resources.stats()
@@ -0,0 +1,84 @@
+"""Backtest job model."""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import (
+    JSON,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    Text,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+# JSONB on Postgres, plain JSON elsewhere (SQLite in tests)
+JSONColumn = JSON().with_variant(JSONB(), "postgresql")
+
+
+class Backtest(Base):
+    """Backtest job: request, lifecycle and result."""
+
+    __tablename__ = "backtests"
+    __table_args__ = (
+        Index("idx_backtests_user_id", "user_id", "created_at"),
+        Index("idx_backtests_status", "status"),
+        CheckConstraint("total_return_bp >= -10000", name="ck_backtests_total_return_bp"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Stored market range (NULL for inline candles)
+    symbol: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    timeframe: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    start_date: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    end_date: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Strategy and settings (inline candles are not stored)
+    request: Mapped[dict[str, Any]] = mapped_column(JSONColumn, nullable=False)
+
+    status: Mapped[str] = mapped_column(String(20), default="QUEUED", nullable=False)
+    progress: Mapped[int] = mapped_column(SmallInteger, default=0, nullable=False)  # Percent
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    initial_capital: Mapped[Decimal] = mapped_column(Numeric(20, 8), nullable=False)
+    final_capital: Mapped[Decimal | None] = mapped_column(Numeric(20, 8), nullable=True)
+    total_return_bp: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    mdd_bp: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    win_rate_bp: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    sharpe_ratio: Mapped[Decimal | None] = mapped_column(Numeric(10, 4), nullable=True)
+    trade_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONColumn, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # API process running the job and its last sign of life; active rows
+    # whose heartbeat goes stale are failed as interrupted
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        """Return string representation."""
+        return f"<Backtest {self.id} {self.status}>"
@@ -0,0 +1,43 @@
+"""OHLCV market data model."""
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class OHLCVData(Base):
+    """
+    One candle per (symbol, timeframe, timestamp).
+
+    Source of truth for market data. Backtests read the columnar copy in
+    app.services.ohlcv_store, which scripts/sync_ohlcv.py keeps up to date.
+    """
+
+    __tablename__ = "ohlcv_data"
+    __table_args__ = (
+        # Also serves per-series range scans (idx_ohlcv_symbol_time in the docs)
+        UniqueConstraint("symbol", "timeframe", "timestamp", name="uq_ohlcv_symbol_time"),
+        Index("idx_ohlcv_timestamp", "timestamp"),
+    )
+
+    # SQLite only autoincrements INTEGER primary keys
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    symbol: Mapped[str] = mapped_column(String(20), nullable=False)
+    timeframe: Mapped[str] = mapped_column(String(10), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    open: Mapped[Decimal] = mapped_column(Numeric(20, 8), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(20, 8), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(20, 8), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(20, 8), nullable=False)
+    volume: Mapped[Decimal] = mapped_column(Numeric(30, 8), nullable=False)
+
+    def __repr__(self) -> str:
+        """Return string representation."""
+        return f"<OHLCVData {self.symbol} {self.timeframe} {self.timestamp}>"
@@ -0,0 +1,427 @@
+"""Backtest schemas."""
+import math
+from datetime import datetime
+from typing import Any, Literal
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Supported indicators and their output fields; a bare indicator operand
+# refers to the first one (implemented in app.services.indicators)
+INDICATOR_OUTPUTS: dict[str, tuple[str, ...]] = {
+    "SMA": ("value",),
+    "EMA": ("value",),
+    "RSI": ("value",),
+    "MACD": ("value", "signal", "histogram"),
+    "BOLLINGER": ("middle", "upper", "lower", "bandwidth", "percent_b"),
+    "ATR": ("value",),
+    "STOCHASTIC": ("k", "d"),
+}
+
+SYMBOL_PATTERN = r"^[A-Za-z0-9]{1,15}([/_-][A-Za-z0-9]{1,15})?$"  # BTC/USDT
+TIMEFRAME_PATTERN = r"^[0-9]{1,3}[smhdwM]$"  # 1m, 4h, 1d
+
+BacktestStatus = Literal["QUEUED", "RUNNING", "COMPLETED", "FAILED", "CANCELLED"]
+
+# Metrics an optimization can rank by (mdd is minimized, the rest maximized)
+OptimizationObjective = Literal[
+    "total_return",
+    "cagr",
+    "sharpe_ratio",
+    "calmar_ratio",
+    "win_rate",
+    "profit_factor",
+    "expected_value",
+    "mdd",
+]
+
+ComparisonOperator = Literal[">", "<", ">=", "<=", "==", "!=", "crosses_above", "crosses_below"]
+
+
+class IndicatorConfig(BaseModel):
+    """Indicator node config, e.g. {"indicator": "RSI", "period": 14}."""
+
+    model_config = {"extra": "allow"}
+
+    indicator: str
+    source: str = "close"
+
+    @field_validator("indicator")
+    @classmethod
+    def validate_indicator(cls, v: str) -> str:
+        """Accept known indicators only."""
+        if v.upper() not in INDICATOR_OUTPUTS:
+            raise ValueError(f"Unknown indicator: {v}. Supported: {', '.join(INDICATOR_OUTPUTS)}")
+        return v.upper()
+
+    @field_validator("source")
+    @classmethod
+    def validate_source(cls, v: str) -> str:
+        """Source must be an OHLCV column."""
+        if v not in OHLCV_COLUMNS:
+            raise ValueError(f"source must be one of {', '.join(OHLCV_COLUMNS)}")
+        return v
+
+    def params(self) -> dict[str, Any]:
+        """Indicator parameters (everything but the indicator name)."""
+        return self.model_dump(exclude={"indicator"})
+
+
+class SingleCondition(BaseModel):
+    """
+    Compare two operands candle by candle.
+
+    Operands are an OHLCV column ("close"), an indicator output ("rsi" or
+    "macd.signal") or a finite numeric literal ("30").
+    """
+
+    operator: ComparisonOperator
+    left: str
+    right: str
+
+
+class CompoundCondition(BaseModel):
+    """AND/OR of conditions."""
+
+    operator: Literal["AND", "OR"]
+    conditions: list["SingleCondition | CompoundCondition"] = Field(
+        ..., min_length=2, max_length=10
+    )
+
+
+Condition = SingleCondition | CompoundCondition
+
+
+class StrategySpec(BaseModel):
+    """Long-only strategy evaluated on every candle close."""
+
+    indicators: dict[str, IndicatorConfig] = Field(default_factory=dict)
+    entry: Condition
+    exit: Condition | None = None
+    stop_loss: float | None = Field(default=None, gt=0, lt=1)  # Fraction below entry
+    take_profit: float | None = Field(default=None, gt=0)  # Fraction above entry
+    position_size: float = Field(default=1.0, gt=0, le=1)  # Fraction of equity per trade
+
+    @field_validator("indicators")
+    @classmethod
+    def validate_indicator_names(cls, v: dict[str, IndicatorConfig]) -> dict[str, IndicatorConfig]:
+        """Indicator names must not shadow columns or contain the field separator."""
+        for name in v:
+            if name in OHLCV_COLUMNS or "." in name:
+                raise ValueError(f"Invalid indicator name: {name}")
+        return v
+
+    def _check_operand(self, operand: str) -> None:
+        """Raise ValueError unless operand is a column, indicator output or finite number."""
+        name, _, field = operand.partition(".")
+        if operand in OHLCV_COLUMNS:
+            return
+        config = self.indicators.get(name)
+        if config is not None:
+            fields = INDICATOR_OUTPUTS[config.indicator]
+            if not field or field in fields:
+                return
+            raise ValueError(f"Unknown operand: {operand}. {name} outputs: {', '.join(fields)}")
+        try:
+            value = float(operand)
+        except ValueError:
+            raise ValueError(f"Unknown operand: {operand}") from None
+        # NaN would make every comparison false; infinities are never crossed
+        if not math.isfinite(value):
+            raise ValueError(f"Numeric operands must be finite: {operand}")
+
+    @model_validator(mode="after")
+    def validate_operands(self) -> "StrategySpec":
+        """Every operand must be a column, a declared indicator output or a number."""
+        conditions = [self.entry] + ([self.exit] if self.exit else [])
+        while conditions:
+            condition = conditions.pop()
+            if isinstance(condition, CompoundCondition):
+                conditions.extend(condition.conditions)
+                continue
+            self._check_operand(condition.left)
+            self._check_operand(condition.right)
+        if self.exit is None and self.stop_loss is None and self.take_profit is None:
+            raise ValueError("Strategy needs an exit condition, stop_loss or take_profit")
+        return self
+
+
+class CandleColumns(BaseModel):
+    """OHLCV candles as parallel columns (timestamps in epoch milliseconds)."""
+
+    timestamp: list[int]
+    open: list[float]
+    high: list[float]
+    low: list[float]
+    close: list[float]
+    volume: list[float]
+
+    @model_validator(mode="after")
+    def validate_lengths(self) -> "CandleColumns":
+        """Columns must line up and fit the inline limit."""
+        n = len(self.timestamp)
+        if n < 2:
+            raise ValueError("At least 2 candles are required")
+        if n > settings.BACKTEST_MAX_INLINE_CANDLES:
+            raise ValueError(f"At most {settings.BACKTEST_MAX_INLINE_CANDLES} candles inline")
+        if any(len(getattr(self, column)) != n for column in OHLCV_COLUMNS):
+            raise ValueError("All candle columns must have the same length")
+        return self
+
+
+class MarketDataRange(BaseModel):
+    """Stored candles of one series between two dates."""
+
+    symbol: str = Field(..., pattern=SYMBOL_PATTERN)
+    timeframe: str = Field(..., pattern=TIMEFRAME_PATTERN)
+    start: datetime | None = None  # Inclusive, default: first stored candle
+    end: datetime | None = None  # Exclusive, default: last stored candle
+
+    @model_validator(mode="after")
+    def validate_range(self) -> "MarketDataRange":
+        """Start must come before end."""
+        if self.start and self.end and self.start >= self.end:
+            raise ValueError("start must be before end")
+        return self
+
+
+class BacktestInput(BaseModel):
+    """Strategy, candles (inline or a stored market data range) and trading costs."""
+
+    strategy: StrategySpec
+    candles: CandleColumns | None = None
+    market: MarketDataRange | None = None
+    initial_capital: float = Field(default=10000.0, gt=0)
+    fee_rate: float = Field(default=0.001, ge=0, lt=1)  # Taker fee per fill
+    slippage_rate: float = Field(default=0.0005, ge=0, lt=1)  # Adverse price move per fill
+
+    @model_validator(mode="after")
+    def validate_data_source(self) -> "BacktestInput":
+        """Exactly one of candles and market."""
+        if (self.candles is None) == (self.market is None):
+            raise ValueError("Provide either candles or market")
+        return self
+
+
+class BacktestRequest(BacktestInput):
+    """Backtest run request."""
+
+    equity_points: int = Field(default=500, ge=2, le=10000)  # Equity curve resolution
+
+
+class BacktestMetrics(BaseModel):
+    """Performance metrics."""
+
+    total_return: float
+    cagr: float  # Plain total return over spans shorter than 30 days
+    avg_profit: float
+    avg_loss: float
+    mdd: float
+    volatility: float
+    calmar_ratio: float
+    sharpe_ratio: float
+    win_rate: float
+    profit_factor: float | None  # None when there are no losing trades
+    expected_value: float
+    total_trades: int
+    avg_holding_seconds: float
+    max_win_streak: int
+    max_loss_streak: int  # Consecutive losing trades (breakeven ends a streak)
+
+
+class BacktestTrade(BaseModel):
+    """Closed trade."""
+
+    entry_time: int
+    exit_time: int
+    entry_price: float
+    exit_price: float
+    quantity: float
+    fees: float
+    pnl: float
+    exit_reason: Literal["signal", "stop_loss", "take_profit", "end_of_data"]
+
+
+class BacktestResult(BaseModel):
+    """Backtest result."""
+
+    metrics: BacktestMetrics
+    trades: list[BacktestTrade]
+    equity_curve: list[tuple[int, float]]  # (timestamp, equity), downsampled
+    candles: int
+    elapsed_ms: float
+
+
+class BacktestSubmitted(BaseModel):
+    """Accepted backtest job."""
+
+    backtest_id: UUID
+    status: BacktestStatus
+
+
+class BacktestJobSummary(BaseModel):
+    """Backtest job state and headline metrics."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    status: BacktestStatus
+    progress: int  # Percent
+    symbol: str | None
+    timeframe: str | None
+    start_date: datetime | None
+    end_date: datetime | None
+    initial_capital: float
+    final_capital: float | None
+    total_return_bp: int | None
+    mdd_bp: int | None
+    win_rate_bp: int | None
+    sharpe_ratio: float | None
+    trade_count: int | None
+    error_message: str | None
+    created_at: datetime
+    completed_at: datetime | None
+
+
+class BacktestJob(BacktestJobSummary):
+    """Backtest job with its full result once completed."""
+
+    result: BacktestResult | None = None
+
+
+class ParameterRange(BaseModel):
+    """
+    Values to try for one strategy parameter.
+
+    ``path`` points into the strategy: "indicators.rsi.period",
+    "entry.right", "exit.conditions.0.right", "stop_loss". Give either
+    explicit ``values`` or a ``min``/``max`` range. A grid steps through the
+    range by ``step``; random search samples it (whole numbers when min,
+    max and step are, on the step when given).
+    """
+
+    path: str = Field(..., pattern=r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$", max_length=100)
+    values: list[int | float | str] | None = Field(default=None, min_length=1, max_length=1000)
+    min: float | None = None
+    max: float | None = None
+    step: float | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def validate_values(self) -> "ParameterRange":
+        """Either values or a min/max range."""
+        if self.values is not None:
+            if self.min is not None or self.max is not None:
+                raise ValueError(f"{self.path}: give values or min/max, not both")
+        elif self.min is None or self.max is None:
+            raise ValueError(f"{self.path}: give values or min and max")
+        elif self.min > self.max:
+            raise ValueError(f"{self.path}: min must not exceed max")
+        elif self.step is not None and (self.max - self.min) / self.step >= 1000:
+            raise ValueError(f"{self.path}: at most 1000 steps")
+        return self
+
+    @property
+    def bounds(self) -> tuple[float, float]:
+        """(min, max) of a range; raises ValueError for explicit values."""
+        if self.min is None or self.max is None:
+            raise ValueError(f"{self.path}: not a min/max range")
+        return self.min, self.max
+
+    @property
+    def integral(self) -> bool:
+        """Whether the range only holds whole numbers."""
+        step = self.step if self.step is not None else 1.0
+        return all(float(bound).is_integer() for bound in (*self.bounds, step))
+
+    def grid(self) -> list[int | float | str]:
+        """Every value of a grid search."""
+        if self.values is not None:
+            return list(self.values)
+        if self.step is None:
+            raise ValueError(f"{self.path}: grid search needs values or a step")
+        low, high = self.bounds
+        count = int(math.floor((high - low) / self.step + 1e-9)) + 1
+        values = [low + i * self.step for i in range(count)]
+        return [int(v) for v in values] if self.integral else [round(v, 10) for v in values]
+
+
+class WalkForward(BaseModel):
+    """
+    Rolling in-sample / out-of-sample splits.
+
+    The range ends in ``folds`` consecutive out-of-sample windows, each
+    preceded by an in-sample window ``train_ratio`` times as long (or
+    reaching back to the first candle when ``anchored``).
+    """
+
+    folds: int = Field(default=4, ge=1, le=20)
+    train_ratio: float = Field(default=3.0, gt=0, le=20)
+    anchored: bool = False
+
+
+class OptimizationRequest(BacktestInput):
+    """Parameter sweep over one strategy."""
+
+    parameters: list[ParameterRange] = Field(..., min_length=1, max_length=10)
+    search: Literal["grid", "random"] = "grid"
+    samples: int = Field(default=100, ge=1)  # Random search candidates
+    seed: int | None = None  # Random search seed, for repeatable samples
+    objective: OptimizationObjective = "sharpe_ratio"
+    walk_forward: WalkForward | None = None
+    top: int = Field(default=20, ge=1, le=1000)  # Rows returned
+
+    @model_validator(mode="after")
+    def validate_search(self) -> "OptimizationRequest":
+        """Distinct parameters and a bounded number of candidates."""
+        paths = [parameter.path for parameter in self.parameters]
+        if len(set(paths)) != len(paths):
+            raise ValueError("Each parameter path may appear once")
+        limit = settings.OPTIMIZER_MAX_CANDIDATES
+        if self.search == "grid":
+            count = math.prod(len(parameter.grid()) for parameter in self.parameters)
+            if count > limit:
+                raise ValueError(f"Grid has {count} combinations, at most {limit} allowed")
+        elif self.samples > limit:
+            raise ValueError(f"At most {limit} samples allowed")
+        return self
+
+
+class OptimizationRow(BaseModel):
+    """One candidate of an optimization."""
+
+    rank: int
+    params: dict[str, int | float | str]
+    score: float | None  # Objective; mean out-of-sample value with walk-forward
+    metrics: BacktestMetrics  # Over the whole range
+    fold_scores: list[float | None] | None = None  # Out-of-sample objective per fold
+
+
+class WalkForwardFold(BaseModel):
+    """Best in-sample candidate of a fold and how it did out of sample."""
+
+    train_start: int  # First and last candle timestamps (epoch ms)
+    train_end: int
+    test_start: int
+    test_end: int
+    params: dict[str, int | float | str]
+    in_sample: BacktestMetrics
+    out_of_sample: BacktestMetrics
+
+
+class OptimizationResult(BaseModel):
+    """Ranked optimization candidates."""
+
+    objective: OptimizationObjective
+    candidates: int
+    indicators: int  # Distinct indicator computations shared by the candidates
+    evaluations: int  # Simulations run (candidates x windows)
+    candles: int
+    rows: list[OptimizationRow]  # Best first
+    folds: list[WalkForwardFold] | None = None
+    elapsed_ms: float
@@ -1,12 +1,10 @@
 """User schemas."""
 from datetime import datetime
 from typing import Any
+from uuid import UUID
 
-import re
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
-from app.core.config import get_settings
-
-settings = get_settings()
+from app.core.password_policy import password_policy
 
 
 class UserBase(BaseModel):
@@ -24,42 +22,8 @@ class UserCreate(UserBase):
     @field_validator("password")
     @classmethod
     def validate_password_complexity(cls, v: str) -> str:
-        """Validate password meets complexity requirements."""
-        if len(v) < settings.PASSWORD_MIN_LENGTH:
-            raise ValueError(
-                f"Password must be at least {settings.PASSWORD_MIN_LENGTH} characters long"
-            )
-
-        has_upper = any(c.isupper() for c in v)
-        has_lower = any(c.islower() for c in v)
-        has_digit = any(c.isdigit() for c in v)
-        has_special = bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', v))
-
-        errors = []
-        if settings.PASSWORD_REQUIRE_UPPERCASE and not has_upper:
-            errors.append("one uppercase letter")
-        if settings.PASSWORD_REQUIRE_LOWERCASE and not has_lower:
-            errors.append("one lowercase letter")
-        if settings.PASSWORD_REQUIRE_DIGIT and not has_digit:
-            errors.append("one digit")
-        if settings.PASSWORD_REQUIRE_SPECIAL and not has_special:
-            errors.append("one special character")
-
-        if errors:
-            raise ValueError(
-                f"Password must contain {', '.join(errors)}. "
-                f"Example: MySecureP@ssw0rd"
-            )
-
-        # Check for common passwords
-        common_passwords = [
-            "password", "12345678", "qwerty", "abc123", "password1",
-            "welcome", "monkey", "dragon", "master", "hello"
-        ]
-        if v.lower() in common_passwords:
-            raise ValueError("This password is too common. Please choose a stronger password.")
-
-        return v
+        """Validate password against the password policy."""
+        return password_policy.validate(v)
 
 
 class UserUpdate(BaseModel):
@@ -72,37 +36,10 @@ class UserUpdate(BaseModel):
     @field_validator("password")
     @classmethod
     def validate_password_complexity(cls, v: str | None) -> str | None:
-        """Validate password meets complexity requirements."""
+        """Validate password against the password policy."""
         if v is None:
             return v
-
-        if len(v) < settings.PASSWORD_MIN_LENGTH:
-            raise ValueError(
-                f"Password must be at least {settings.PASSWORD_MIN_LENGTH} characters long"
-            )
-
-        has_upper = any(c.isupper() for c in v)
-        has_lower = any(c.islower() for c in v)
-        has_digit = any(c.isdigit() for c in v)
-        has_special = bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', v))
-
-        errors = []
-        if settings.PASSWORD_REQUIRE_UPPERCASE and not has_upper:
-            errors.append("one uppercase letter")
-        if settings.PASSWORD_REQUIRE_LOWERCASE and not has_lower:
-            errors.append("one lowercase letter")
-        if settings.PASSWORD_REQUIRE_DIGIT and not has_digit:
-            errors.append("one digit")
-        if settings.PASSWORD_REQUIRE_SPECIAL and not has_special:
-            errors.append("one special character")
-
-        if errors:
-            raise ValueError(
-                f"Password must contain {', '.join(errors)}. "
-                f"Example: MySecureP@ssw0rd"
-            )
-
-        return v
+        return password_policy.validate(v)
 
 
 class UserInDB(UserBase):
@@ -116,6 +53,14 @@ class UserInDB(UserBase):
     created_at: datetime
     updated_at: datetime
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def coerce_id(cls, v: Any) -> Any:
+        """Accept UUID ids from ORM rows."""
+        if isinstance(v, UUID):
+            return str(v)
+        return v
+
 
 class User(UserInDB):
     """User schema returned to clients."""
@@ -123,6 +68,13 @@ class User(UserInDB):
     pass
 
 
+class UserPage(BaseModel):
+    """Page of users with an opaque cursor for the next page."""
+
+    items: list[User]
+    next_cursor: str | None = None
+
+
 class Token(BaseModel):
     """Token response schema."""
 
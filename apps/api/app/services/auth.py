@@ -1,17 +1,19 @@
 """Authentication service."""
-import hmac
 import logging
-from sqlalchemy import select
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    dummy_hashes,
+    get_password_hash_async,
+    verify_password_async,
 )
 from app.models.user import User
-from app.schemas.user import Token, UserCreate, UserUpdate
+from app.schemas.user import Token, UserCreate
 from app.services.user import get_user_by_email
 
 logger = logging.getLogger(__name__)
@@ -27,38 +29,64 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     user = await get_user_by_email(db, email)
 
     if not user:
-        # Use constant-time delay for non-existent users to prevent timing attacks
-        verify_password(password, get_password_hash("dummy_hash_for_timing"))
+        # Spend one verify on a precomputed hash so unknown emails take as long
+        # as a wrong password for a real account
+        await verify_password_async(password, await dummy_hashes.get_or_create())
         return None
 
     # Constant-time comparison for password verification
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
 
     return user
 
 
-async def register_user(db: AsyncSession, user_in: UserCreate) -> User:
-    """Register a new user."""
-    hashed_password = get_password_hash(user_in.password)
-    user = User(
-        email=user_in.email,
-        hashed_password=hashed_password,
-        full_name=user_in.full_name,
+async def register_user(db: AsyncSession, user_in: UserCreate) -> User | None:
+    """
+    Register a new user.
+
+    Issues a single ``INSERT ... ON CONFLICT (email) DO NOTHING RETURNING``
+    so the unique email index decides races and server defaults
+    (created_at, updated_at) come back without a refresh SELECT.
+
+    Returns:
+        Created user, or None if the email is already registered
+    """
+    hashed_password = await get_password_hash_async(user_in.password)
+
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = (
+        dialect.insert(User)
+        .values(
+            email=user_in.email,
+            hashed_password=hashed_password,
+            full_name=user_in.full_name,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
-    db.add(user)
+    user = (await db.scalars(stmt)).one_or_none()
     await db.commit()
-    await db.refresh(user)
+
+    if user is None:
+        return None
 
     logger.info(f"New user registered: {user.email}")
 
     return user
 
 
-async def create_tokens(user: User) -> Token:
-    """Create access and refresh tokens for user."""
+async def create_tokens(user: User, refresh_claims: dict[str, Any]) -> Token:
+    """
+    Create access and refresh tokens for user.
+
+    Args:
+        user: Authenticated user
+        refresh_claims: Session claims from RefreshTokenStore.issue (login)
+            or RefreshTokenStore.rotate (refresh)
+    """
     access_token = create_access_token(subject=str(user.id))
-    refresh_token = create_refresh_token(subject=str(user.id))
+    refresh_token = create_refresh_token(subject=str(user.id), claims=refresh_claims)
 
     logger.info(f"Tokens created for user: {user.email}")
 
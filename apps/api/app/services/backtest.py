@@ -0,0 +1,542 @@
+"""Vectorized backtest simulation over columnar OHLCV arrays."""
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from app.schemas.backtest import (
+    BacktestInput,
+    BacktestMetrics,
+    BacktestRequest,
+    BacktestResult,
+    BacktestTrade,
+    CompoundCondition,
+    Condition,
+    MarketDataRange,
+    StrategySpec,
+)
+from app.services.indicator_cache import IndicatorCache
+from app.services.indicators import compute_indicator
+from app.services.ohlcv_store import Candles, OHLCVStore, SeriesInfo, time_window, to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+MS_PER_DAY = 86_400_000
+MIN_CAGR_DAYS = 30  # Shorter spans report the plain total return as CAGR
+METRIC_LIMIT = 1e9  # Ratios are clamped to +/- this so results stay valid JSON
+
+# Stage callback: (stage name, fraction done)
+Progress = Callable[[str, float], None]
+
+# Exit reason codes (index into EXIT_REASONS)
+SIGNAL, STOP_LOSS, TAKE_PROFIT, END_OF_DATA = 0, 1, 2, 3
+EXIT_REASONS = ("signal", "stop_loss", "take_profit", "end_of_data")
+
+
+@dataclass(slots=True)
+class Trades:
+    """Closed trades as parallel arrays."""
+
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    entry_price: np.ndarray  # Fill prices, slippage included
+    exit_price: np.ndarray
+    quantity: np.ndarray
+    fees: np.ndarray
+    pnl: np.ndarray
+    exit_reason: np.ndarray  # EXIT_REASONS codes
+
+    def __len__(self) -> int:
+        return len(self.entry_index)
+
+
+@dataclass(slots=True)
+class Simulation:
+    """Equity per candle and the trades that produced it."""
+
+    equity: np.ndarray
+    trades: Trades
+
+
+def operand_series(
+    columns: dict[str, np.ndarray], outputs: dict[str, dict[str, np.ndarray]]
+) -> dict[str, np.ndarray]:
+    """
+    Series by operand name from OHLCV columns and indicator outputs.
+
+    Returns:
+        "<column>" for OHLCV, "<name>" for an indicator's main output and
+        "<name>.<field>" for every output
+    """
+    series: dict[str, np.ndarray] = dict(columns)
+    for name, fields in outputs.items():
+        series[name] = fields.get("value", next(iter(fields.values())))
+        for field, values in fields.items():
+            series[f"{name}.{field}"] = values
+    return series
+
+
+def _no_progress(stage: str, fraction: float) -> None:
+    pass
+
+
+def compute_indicators(spec: StrategySpec, candles: Candles) -> dict[str, np.ndarray]:
+    """Compute every indicator of a strategy (see operand_series)."""
+    columns = candles.columns()
+    return operand_series(
+        columns,
+        {
+            name: compute_indicator(config.indicator, config.params(), columns)
+            for name, config in spec.indicators.items()
+        },
+    )
+
+
+def _operand(series: dict[str, np.ndarray], operand: str) -> np.ndarray | float:
+    values = series.get(operand)
+    return float(operand) if values is None else values
+
+
+def _shift(values: np.ndarray | float) -> np.ndarray | float:
+    """Previous candle's value (NaN for the first)."""
+    if not isinstance(values, np.ndarray):
+        return values
+    shifted = np.empty_like(values)
+    shifted[0] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+def evaluate_condition(condition: Condition, series: dict[str, np.ndarray], n: int) -> np.ndarray:
+    """Evaluate a condition on every candle at once (NaN compares false)."""
+    if isinstance(condition, CompoundCondition):
+        parts = [evaluate_condition(part, series, n) for part in condition.conditions]
+        reduce = np.logical_and if condition.operator == "AND" else np.logical_or
+        return reduce.reduce(parts)
+
+    left = _operand(series, condition.left)
+    right = _operand(series, condition.right)
+    with np.errstate(invalid="ignore"):
+        match condition.operator:
+            case ">":
+                result = left > right
+            case "<":
+                result = left < right
+            case ">=":
+                result = left >= right
+            case "<=":
+                result = left <= right
+            case "==":
+                result = left == right
+            case "!=":
+                result = (left != right) & ~np.isnan(left - right)
+            case "crosses_above":
+                result = (left > right) & (_shift(left) <= _shift(right))
+            case "crosses_below":
+                result = (left < right) & (_shift(left) >= _shift(right))
+    return np.broadcast_to(result, (n,))
+
+
+def generate_signals(
+    spec: StrategySpec, candles: Candles, series: dict[str, np.ndarray] | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate entry and exit conditions over all candles.
+
+    Args:
+        spec: Strategy
+        candles: OHLCV series
+        series: Precomputed operand series (default: compute_indicators)
+
+    Returns:
+        (entries, exits) boolean arrays; a candle with both is an exit only
+    """
+    if series is None:
+        series = compute_indicators(spec, candles)
+    n = len(candles)
+    exits = evaluate_condition(spec.exit, series, n) if spec.exit else np.zeros(n, dtype=bool)
+    entries = evaluate_condition(spec.entry, series, n) & ~exits
+    return entries, exits
+
+
+def _first_stop(
+    low: np.ndarray,
+    high: np.ndarray,
+    start: int,
+    end: int,
+    stop_price: float,
+    target_price: float,
+) -> tuple[int, int]:
+    """
+    First candle in [start, end] touching the stop or target.
+
+    Scans in doubling chunks, so a trade costs time proportional to its
+    length rather than to the rest of the series.
+
+    Returns:
+        (index, STOP_LOSS or TAKE_PROFIT), or (-1, SIGNAL) if neither is hit
+    """
+    size = 64
+    while start <= end:
+        stop = min(start + size, end + 1)
+        stopped = low[start:stop] <= stop_price
+        targeted = high[start:stop] >= target_price
+        hit = stopped | targeted
+        if hit.any():
+            offset = int(hit.argmax())
+            # Both in one candle: assume the stop filled first
+            return start + offset, STOP_LOSS if stopped[offset] else TAKE_PROFIT
+        start = stop
+        size *= 2
+    return -1, SIGNAL
+
+
+def simulate(
+    candles: Candles,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    initial_capital: float = 10000.0,
+    fee_rate: float = 0.001,
+    slippage_rate: float = 0.0005,
+    position_size: float = 1.0,
+    stop_loss: float | None = None,
+    take_profit: float | None = None,
+) -> Simulation:
+    """
+    Simulate a long-only strategy from precomputed signals.
+
+    Orders fill at the signal candle's close (stops and targets at their
+    trigger price, or the open if the candle gapped past it), moved against
+    the trade by ``slippage_rate``; each fill pays ``fee_rate`` on its
+    notional. An open position is closed at the last close.
+
+    Only the trade boundaries are found sequentially (one search per trade,
+    not per candle); fills, fees, compounding and the equity curve are then
+    computed for all trades and candles at once.
+    """
+    n = len(candles)
+    close, low, high, open_ = candles.close, candles.low, candles.high, candles.open
+    entry_candidates = np.flatnonzero(entries)
+    exit_candidates = np.flatnonzero(exits)
+    use_stops = stop_loss is not None or take_profit is not None
+
+    entry_index: list[int] = []
+    exit_index: list[int] = []
+    raw_exit: list[float] = []
+    reasons: list[int] = []
+    cursor = 0
+    while True:
+        k = int(np.searchsorted(entry_candidates, cursor))
+        if k == len(entry_candidates) or entry_candidates[k] >= n - 1:
+            break
+        i = int(entry_candidates[k])
+
+        m = int(np.searchsorted(exit_candidates, i, side="right"))
+        if m < len(exit_candidates):
+            j, reason = int(exit_candidates[m]), SIGNAL
+        else:
+            j, reason = n - 1, END_OF_DATA
+        price = close[j]
+        if use_stops:
+            fill = close[i] * (1 + slippage_rate)
+            stop_price = fill * (1 - stop_loss) if stop_loss is not None else -math.inf
+            target_price = fill * (1 + take_profit) if take_profit is not None else math.inf
+            hit, hit_reason = _first_stop(low, high, i + 1, j, stop_price, target_price)
+            if hit >= 0:
+                j, reason = hit, hit_reason
+                if reason == STOP_LOSS:
+                    price = min(open_[j], stop_price)
+                else:
+                    price = max(open_[j], target_price)
+
+        entry_index.append(i)
+        exit_index.append(j)
+        raw_exit.append(price)
+        reasons.append(reason)
+        cursor = j + 1
+
+    entry_idx = np.asarray(entry_index, dtype=np.int64)
+    exit_idx = np.asarray(exit_index, dtype=np.int64)
+
+    # Batched fills: slippage, fees and compounding for every trade at once
+    entry_px = close[entry_idx] * (1 + slippage_rate)
+    exit_px = np.asarray(raw_exit, dtype=np.float64) * (1 - slippage_rate)
+    growth = 1 - position_size + position_size * (exit_px * (1 - fee_rate)) / (
+        entry_px * (1 + fee_rate)
+    )
+    equity_after = initial_capital * np.cumprod(growth)
+    equity_before = np.empty_like(equity_after)
+    equity_before[:1] = initial_capital
+    equity_before[1:] = equity_after[:-1]
+    allocated = equity_before * position_size
+    quantity = allocated / (entry_px * (1 + fee_rate))
+    proceeds = quantity * exit_px * (1 - fee_rate)
+    fees = quantity * (entry_px + exit_px) * fee_rate
+
+    # Equity per candle: mark the open trade to market, else the settled equity
+    if len(entry_idx):
+        candle = np.arange(n)
+        k = np.searchsorted(entry_idx, candle, side="right") - 1
+        trade = np.maximum(k, 0)
+        holding = (k >= 0) & (candle < exit_idx[trade])
+        settled = np.where(k >= 0, equity_after[trade], initial_capital)
+        marked = equity_before[trade] - allocated[trade] + quantity[trade] * close
+        equity = np.where(holding, marked, settled)
+    else:
+        equity = np.full(n, initial_capital)
+
+    trades = Trades(
+        entry_index=entry_idx,
+        exit_index=exit_idx,
+        entry_price=entry_px,
+        exit_price=exit_px,
+        quantity=quantity,
+        fees=fees,
+        pnl=proceeds - allocated,
+        exit_reason=np.asarray(reasons, dtype=np.int8),
+    )
+    return Simulation(equity=equity, trades=trades)
+
+
+def _max_streak(flags: np.ndarray) -> int:
+    """Longest run of True values."""
+    if not flags.any():
+        return 0
+    padded = np.concatenate(([0], flags.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def _bounded(value: float) -> float:
+    """Clamp a metric to +/- METRIC_LIMIT; NaN becomes 0."""
+    if math.isnan(value):
+        return 0.0
+    return max(-METRIC_LIMIT, min(METRIC_LIMIT, value))
+
+
+def compute_metrics(
+    timestamps: np.ndarray, simulation: Simulation, initial_capital: float
+) -> BacktestMetrics:
+    """
+    Performance metrics from the equity curve and closed trades.
+
+    Every value is finite: spans under MIN_CAGR_DAYS are not annualized
+    (compounding a few hours of returns over a year overflows), and ratios
+    are clamped to METRIC_LIMIT.
+    """
+    equity = simulation.equity
+    trades = simulation.trades
+    final = float(equity[-1])
+
+    total_return = final / initial_capital - 1
+    days = (timestamps[-1] - timestamps[0]) / MS_PER_DAY
+    if days < MIN_CAGR_DAYS:
+        cagr = total_return
+    elif final > 0:
+        # In log space: a huge growth rate saturates instead of overflowing
+        rate = math.log(final / initial_capital) * 365 / days
+        cagr = math.exp(min(rate, math.log(METRIC_LIMIT))) - 1
+    else:
+        cagr = -1.0
+
+    returns = np.diff(equity) / equity[:-1]
+    periods_per_year = 365 * MS_PER_DAY / max(float(np.median(np.diff(timestamps))), 1.0)
+    std = float(returns.std(ddof=1)) if len(returns) > 1 else 0.0
+    volatility = std * math.sqrt(periods_per_year)
+    sharpe = float(returns.mean()) / std * math.sqrt(periods_per_year) if std > 0 else 0.0
+
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    mdd = float(drawdown.max())
+
+    pnl = trades.pnl
+    wins = pnl > 0
+    losses = pnl < 0
+    gross_loss = float(-pnl[losses].sum())
+    holding = timestamps[trades.exit_index] - timestamps[trades.entry_index]
+
+    return BacktestMetrics(
+        total_return=_bounded(total_return),
+        cagr=_bounded(cagr),
+        avg_profit=float(pnl[wins].mean()) if wins.any() else 0.0,
+        avg_loss=float(pnl[losses].mean()) if losses.any() else 0.0,
+        mdd=mdd,
+        volatility=_bounded(volatility),
+        calmar_ratio=_bounded(cagr / mdd) if mdd > 0 else 0.0,
+        sharpe_ratio=_bounded(sharpe),
+        win_rate=float(wins.mean()) if len(pnl) else 0.0,
+        profit_factor=_bounded(float(pnl[wins].sum()) / gross_loss) if gross_loss > 0 else None,
+        expected_value=float(pnl.mean()) if len(pnl) else 0.0,
+        total_trades=len(pnl),
+        avg_holding_seconds=float(holding.mean()) / 1000 if len(holding) else 0.0,
+        max_win_streak=_max_streak(wins),
+        max_loss_streak=_max_streak(losses),
+    )
+
+
+def run_strategy(
+    spec: StrategySpec,
+    candles: Candles,
+    initial_capital: float = 10000.0,
+    fee_rate: float = 0.001,
+    slippage_rate: float = 0.0005,
+    series: dict[str, np.ndarray] | None = None,
+    progress: Progress | None = None,
+) -> tuple[Simulation, BacktestMetrics]:
+    """Evaluate signals, simulate and score one strategy."""
+    report = progress or _no_progress
+    if series is None:
+        report("indicators", 0.2)
+        series = compute_indicators(spec, candles)
+    report("signals", 0.5)
+    entries, exits = generate_signals(spec, candles, series)
+    report("simulating", 0.6)
+    simulation = simulate(
+        candles,
+        entries,
+        exits,
+        initial_capital=initial_capital,
+        fee_rate=fee_rate,
+        slippage_rate=slippage_rate,
+        position_size=spec.position_size,
+        stop_loss=spec.stop_loss,
+        take_profit=spec.take_profit,
+    )
+    report("metrics", 0.8)
+    return simulation, compute_metrics(candles.timestamp, simulation, initial_capital)
+
+
+def build_result(
+    candles: Candles,
+    simulation: Simulation,
+    metrics: BacktestMetrics,
+    equity_points: int,
+    elapsed: float,
+) -> BacktestResult:
+    """Shape a simulation for the API (downsampled equity curve)."""
+    trades = simulation.trades
+    timestamps = candles.timestamp
+    points = np.linspace(0, len(candles) - 1, min(equity_points, len(candles)))
+    points = np.unique(points.astype(np.int64))
+    return BacktestResult(
+        metrics=metrics,
+        trades=[
+            BacktestTrade(
+                entry_time=int(timestamps[entry]),
+                exit_time=int(timestamps[exit_]),
+                entry_price=float(entry_price),
+                exit_price=float(exit_price),
+                quantity=float(quantity),
+                fees=float(fees),
+                pnl=float(pnl),
+                exit_reason=EXIT_REASONS[reason],
+            )
+            for entry, exit_, entry_price, exit_price, quantity, fees, pnl, reason in zip(
+                trades.entry_index.tolist(),
+                trades.exit_index.tolist(),
+                trades.entry_price.tolist(),
+                trades.exit_price.tolist(),
+                trades.quantity.tolist(),
+                trades.fees.tolist(),
+                trades.pnl.tolist(),
+                trades.exit_reason.tolist(),
+            )
+        ],
+        equity_curve=list(zip(timestamps[points].tolist(), simulation.equity[points].tolist())),
+        candles=len(candles),
+        elapsed_ms=round(elapsed * 1000, 3),
+    )
+
+
+def load_stored(market: MarketDataRange, store: OHLCVStore) -> tuple[SeriesInfo, Candles, slice]:
+    """
+    Stored series of a market range and the window of it the range covers.
+
+    Raises:
+        ValueError: If the series is missing or has fewer than 2 candles in range
+    """
+    info, history = store.load(market.symbol, market.timeframe)
+    window = time_window(
+        history.timestamp,
+        to_epoch_ms(market.start) if market.start else None,
+        to_epoch_ms(market.end) if market.end else None,
+    )
+    if window.stop - window.start < 2:
+        raise ValueError(f"Fewer than 2 stored candles for {market.symbol} {market.timeframe}")
+    return info, history, window
+
+
+def load_candles(
+    request: BacktestInput, store: OHLCVStore, cache: IndicatorCache
+) -> tuple[Candles, dict[str, np.ndarray] | None]:
+    """
+    Candles a request runs on, plus operand series for stored ranges.
+
+    Indicators over a stored range come from the shared cache: computed once
+    over the series' whole history and sliced to the range, so the first
+    candles of a range already have warmed-up values.
+
+    Returns:
+        (candles, operand series or None to compute them from the candles)
+
+    Raises:
+        ValueError: If inline timestamps are not strictly increasing, or the
+            stored series is missing or has fewer than 2 candles in range
+    """
+    if request.candles is not None:
+        candles = Candles.from_columns(**request.candles.model_dump())
+        if np.any(np.diff(candles.timestamp) <= 0):
+            raise ValueError("Candle timestamps must be strictly increasing")
+        return candles, None
+
+    info, history, window = load_stored(request.market, store)
+    candles = history[window]
+    outputs = {}
+    for name, config in request.strategy.indicators.items():
+        fields = cache.get(info, history, config.indicator, config.params())
+        outputs[name] = {field: values[window] for field, values in fields.items()}
+    return candles, operand_series(candles.columns(), outputs)
+
+
+def run_backtest(
+    request: BacktestRequest,
+    store: OHLCVStore,
+    cache: IndicatorCache,
+    progress: Progress | None = None,
+) -> BacktestResult:
+    """
+    Run a backtest (CPU-bound, call off the event loop).
+
+    Args:
+        request: Backtest request
+        store: Stored candles
+        cache: Indicator cache for stored candles
+        progress: Called with (stage, fraction done) between stages; may
+            raise to abort the run
+
+    Raises:
+        ValueError: If the candles can't be loaded (see load_candles)
+    """
+    started = time.perf_counter()
+    report = progress or _no_progress
+    report("loading", 0.0)
+    candles, series = load_candles(request, store, cache)
+
+    simulation, metrics = run_strategy(
+        request.strategy,
+        candles,
+        initial_capital=request.initial_capital,
+        fee_rate=request.fee_rate,
+        slippage_rate=request.slippage_rate,
+        series=series,
+        progress=progress,
+    )
+    report("result", 0.9)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Backtest finished: {len(candles)} candles, {metrics.total_trades} trades "
+        f"in {elapsed * 1000:.1f} ms"
+    )
+    return build_result(candles, simulation, metrics, request.equity_points, elapsed)
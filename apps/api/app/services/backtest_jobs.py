@@ -0,0 +1,588 @@
+"""Backtest jobs on a bounded worker pool with progress events."""
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import (
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.exceptions import RateLimitError, ServiceUnavailableError
+from app.core.job_events import JobEventBroker, job_events
+from app.db.base import async_session_maker
+from app.models.backtest import Backtest
+from app.schemas.backtest import BacktestRequest, BacktestResult
+from app.services.backtest import run_backtest
+from app.services.indicator_cache import indicator_cache
+from app.services.ohlcv_store import ohlcv_store
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("QUEUED", "RUNNING")
+
+# A job whose heartbeat is this many intervals old has lost its API process
+STALE_HEARTBEATS = 3
+INTERRUPTED_ERROR = "Interrupted: the server running it stopped"
+
+# Worker-side channels, set by _init_worker in every pool worker
+_progress_queue: Any = None
+_cancel_flags: Any = None
+
+
+class JobCancelledError(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+
+def _init_worker(progress_queue: Any, cancel_flags: Any) -> None:
+    """Hand a worker the progress queue and cancel flags of its pool."""
+    global _progress_queue, _cancel_flags
+    _progress_queue, _cancel_flags = progress_queue, cancel_flags
+
+
+def _execute(job_id: str, slot: int, payload: str) -> BacktestResult:
+    """Run one job in a worker, reporting each stage and stopping if cancelled."""
+
+    def progress(stage: str, fraction: float) -> None:
+        if _cancel_flags[slot]:
+            raise JobCancelledError()
+        _progress_queue.put((job_id, stage, fraction))
+
+    request = BacktestRequest.model_validate_json(payload)
+    return run_backtest(request, ohlcv_store, indicator_cache, progress)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high) if math.isfinite(value) else 0.0
+
+
+def result_columns(result: BacktestResult) -> dict[str, Any]:
+    """Headline metrics of a result as Backtest column values."""
+    metrics = result.metrics
+    return {
+        "final_capital": result.equity_curve[-1][1] if result.equity_curve else None,
+        "total_return_bp": round(_clamp(metrics.total_return, -1.0, 1e5) * 10000),
+        "mdd_bp": round(_clamp(metrics.mdd, 0.0, 1e5) * 10000),
+        "win_rate_bp": round(_clamp(metrics.win_rate, 0.0, 1.0) * 10000),
+        "sharpe_ratio": round(_clamp(metrics.sharpe_ratio, -1e5, 1e5), 4),
+        "trade_count": metrics.total_trades,
+        "result": result.model_dump(mode="json"),
+    }
+
+
+async def get_backtest(
+    db: AsyncSession, backtest_id: uuid.UUID, user_id: uuid.UUID | str
+) -> Backtest | None:
+    """Get a user's backtest by ID (None if missing or someone else's)."""
+    result = await db.execute(
+        select(Backtest).where(
+            Backtest.id == backtest_id, Backtest.user_id == uuid.UUID(str(user_id))
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+@dataclass(slots=True)
+class _Job:
+    """Job queued or running in this process."""
+
+    slot: int  # Index into the cancel flags
+    user_id: str
+    future: Future
+    task: asyncio.Task | None = None
+    finished: bool = False  # Final event published, later progress is dropped
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class BacktestJobManager:
+    """
+    Queue backtests, run them in a worker pool and track them in the database.
+
+    ``submit()`` stores a QUEUED row and returns at once; the job then runs in
+    a process (or thread) pool, so a long backtest never blocks the event
+    loop. Workers report each stage through a queue that a pump thread
+    forwards to the loop, where it is published as a job event and written
+    to the row's status and progress. The result is stored on the row.
+
+    Admission is bounded twice, both per API process: ``max_pending`` jobs
+    queued or running overall (503 beyond that) and ``per_user`` per user
+    (429).
+
+    Cancellation is cooperative: a queued job is dropped from the pool, a
+    running one stops at its next stage. A job running in another API
+    process is cancelled through its row; that process then discards the
+    result instead of storing it.
+
+    Rows record the API process running them (``worker_id``), which
+    refreshes ``heartbeat_at`` every ``heartbeat`` seconds while the job is
+    in flight. Rows of a process that crashed or was killed stop beating;
+    once ``STALE_HEARTBEATS`` intervals old they are marked FAILED by
+    ``reap_stale()``, which every manager runs at startup and on each beat.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        events: JobEventBroker,
+        mode: str = "process",
+        max_workers: int = 0,
+        max_pending: int = 32,
+        per_user: int = 2,
+        heartbeat: float = 10.0,
+    ):
+        """
+        Initialize job manager.
+
+        Args:
+            session_maker: Session factory for backtest rows
+            events: Broker for progress and completion events
+            mode: "thread" or "process"
+            max_workers: Pool size, 0 for one worker per CPU core
+            max_pending: Max jobs queued or running before rejecting new ones
+            per_user: Max jobs queued or running per user
+            heartbeat: Seconds between liveness updates of in-flight rows
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unsupported backtest executor: {mode}")
+        self.session_maker = session_maker
+        self.events = events
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.per_user = per_user
+        self.heartbeat = heartbeat
+        self.worker_id = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat_task: asyncio.Task | None = None
+        self._executor: Executor | None = None
+        self._progress_queue: Any = None
+        self._cancel_flags: Any = None
+        self._pump: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._jobs: dict[str, _Job] = {}
+        self._free_slots = list(range(max_pending))
+        self._user_jobs: Counter[str] = Counter()
+
+        # Metrics
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._reaped = 0
+
+    @classmethod
+    def from_settings(cls) -> "BacktestJobManager":
+        """Create manager configured from application settings."""
+        return cls(
+            session_maker=async_session_maker,
+            events=job_events,
+            mode=settings.BACKTEST_JOB_EXECUTOR,
+            max_workers=settings.BACKTEST_JOB_WORKERS,
+            max_pending=settings.BACKTEST_JOB_MAX_PENDING,
+            per_user=settings.BACKTEST_JOBS_PER_USER,
+            heartbeat=settings.BACKTEST_JOB_HEARTBEAT,
+        )
+
+    async def start(self) -> None:
+        """Fail jobs orphaned by a previous process and start the heartbeat."""
+        await self._reap_logged()
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        """Keep this process's rows alive and reap other processes' dead ones."""
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            if self._jobs:
+                try:
+                    async with self.session_maker() as session:
+                        await session.execute(
+                            update(Backtest)
+                            .where(
+                                Backtest.worker_id == self.worker_id,
+                                Backtest.status.in_(ACTIVE_STATUSES),
+                            )
+                            .values(heartbeat_at=datetime.now(timezone.utc))
+                        )
+                        await session.commit()
+                except Exception as e:
+                    logger.warning(f"Failed to record backtest heartbeat: {e}")
+            await self._reap_logged()
+
+    async def _reap_logged(self) -> None:
+        try:
+            await self.reap_stale()
+        except Exception as e:
+            logger.warning(f"Failed to reap stale backtests: {e}")
+
+    def _stale(self) -> ColumnElement[bool]:
+        """Rows still active whose process stopped sending heartbeats."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.heartbeat * STALE_HEARTBEATS)
+        return and_(
+            Backtest.status.in_(ACTIVE_STATUSES),
+            Backtest.worker_id.is_distinct_from(self.worker_id),
+            func.coalesce(Backtest.heartbeat_at, Backtest.created_at) < cutoff,
+        )
+
+    async def reap_stale(self, backtest_id: uuid.UUID | None = None) -> int:
+        """
+        Mark active rows whose API process is gone as FAILED.
+
+        Args:
+            backtest_id: Only check this backtest (None = all)
+
+        Returns:
+            Number of rows marked FAILED
+        """
+        condition = self._stale()
+        if backtest_id is not None:
+            condition = and_(Backtest.id == backtest_id, condition)
+        async with self.session_maker() as session:
+            reaped = await session.execute(
+                update(Backtest)
+                .where(condition)
+                .values(
+                    status="FAILED",
+                    error_message=INTERRUPTED_ERROR,
+                    completed_at=datetime.now(timezone.utc),
+                )
+                .returning(Backtest.id)
+            )
+            job_ids = [str(job_id) for job_id in reaped.scalars()]
+            await session.commit()
+        for job_id in job_ids:
+            logger.warning(f"Backtest {job_id} lost its API process, marked failed")
+            await self.events.publish(
+                job_id, {"event": "failed", "status": "FAILED", "error": INTERRUPTED_ERROR}
+            )
+        self._reaped += len(job_ids)
+        return len(job_ids)
+
+    def _get_executor(self) -> Executor:
+        """Create the executor and progress pump on first use."""
+        if self._executor is None:
+            self._loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                # spawn avoids forking a process that is running an event loop
+                context = multiprocessing.get_context("spawn")
+                self._progress_queue = context.Queue()
+                self._cancel_flags = context.Array("b", self.max_pending, lock=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self._progress_queue, self._cancel_flags),
+                )
+            else:
+                self._progress_queue = queue.Queue()
+                self._cancel_flags = bytearray(self.max_pending)
+                _init_worker(self._progress_queue, self._cancel_flags)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="backtest",
+                )
+            self._pump = threading.Thread(
+                target=self._pump_progress,
+                args=(self._loop,),
+                name="backtest-progress",
+                daemon=True,
+            )
+            self._pump.start()
+            logger.info(f"Backtest job pool started: {self.mode} x{self.max_workers}")
+        return self._executor
+
+    def _pump_progress(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Forward worker progress to the event loop (runs in its own thread)."""
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._on_progress(*item), loop)
+            except RuntimeError:
+                return  # Loop closed
+
+    async def _on_progress(self, job_id: str, stage: str, fraction: float) -> None:
+        """Publish a stage and mark the job RUNNING with its progress."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        percent = int(fraction * 100)
+        async with job.lock:
+            if job.finished:
+                return
+            await self.events.publish(
+                job_id,
+                {"event": "progress", "status": "RUNNING", "stage": stage, "progress": percent},
+            )
+        try:
+            async with self.session_maker() as session:
+                await session.execute(
+                    update(Backtest)
+                    .where(Backtest.id == uuid.UUID(job_id), Backtest.status.in_(ACTIVE_STATUSES))
+                    .values(status="RUNNING", progress=percent)
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record progress of backtest {job_id}: {e}")
+
+    async def submit(self, user_id: uuid.UUID | str, request: BacktestRequest) -> uuid.UUID:
+        """
+        Queue a backtest.
+
+        Args:
+            user_id: Owner
+            request: Backtest request
+
+        Returns:
+            Backtest ID
+
+        Raises:
+            RateLimitError: If the user already has per_user jobs in flight
+            ServiceUnavailableError: If max_pending jobs are already in flight
+        """
+        user_key = str(user_id)
+        if self._user_jobs[user_key] >= self.per_user:
+            self._rejected += 1
+            raise RateLimitError(
+                message=f"At most {self.per_user} backtests can be queued or running at once",
+                retry_after=5,
+            )
+        if not self._free_slots:
+            self._rejected += 1
+            logger.warning(f"Backtest queue full ({len(self._jobs)} jobs in flight)")
+            raise ServiceUnavailableError(
+                message="Backtest queue is full. Please try again shortly.",
+                retry_after=5,
+            )
+
+        slot = self._free_slots.pop()
+        self._user_jobs[user_key] += 1
+        backtest_id = uuid.uuid4()
+        market = request.market
+        try:
+            async with self.session_maker() as session:
+                session.add(
+                    Backtest(
+                        id=backtest_id,
+                        user_id=uuid.UUID(user_key),
+                        symbol=market.symbol if market else None,
+                        timeframe=market.timeframe if market else None,
+                        start_date=market.start if market else None,
+                        end_date=market.end if market else None,
+                        # Inline candles are input only: encoding them would
+                        # stall the event loop and bloat the row
+                        request=request.model_dump(mode="json", exclude={"candles"}),
+                        status="QUEUED",
+                        progress=0,
+                        initial_capital=request.initial_capital,
+                        worker_id=self.worker_id,
+                        heartbeat_at=datetime.now(timezone.utc),
+                    )
+                )
+                await session.commit()
+        except Exception:
+            self._release(slot, user_key)
+            raise
+
+        job_id = str(backtest_id)
+        future = self._get_executor().submit(_execute, job_id, slot, request.model_dump_json())
+        # Registered before the loop can run a progress callback for it
+        job = self._jobs[job_id] = _Job(slot=slot, user_id=user_key, future=future)
+        self._submitted += 1
+        job.task = asyncio.create_task(self._run(job_id, job))
+        async with job.lock:
+            # Held so the worker's first stage can't be published before this
+            await self.events.publish(
+                job_id, {"event": "queued", "status": "QUEUED", "progress": 0}
+            )
+        return backtest_id
+
+    async def _run(self, job_id: str, job: _Job) -> None:
+        """Wait for a job's result and store it."""
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except (CancelledError, asyncio.CancelledError, JobCancelledError):
+            await self._finish(job_id, job, "CANCELLED")
+        except ValueError as e:
+            await self._finish(job_id, job, "FAILED", error=str(e))
+        except Exception as e:
+            logger.error(f"Backtest {job_id} failed: {e}", exc_info=True)
+            await self._finish(job_id, job, "FAILED", error="Backtest failed")
+        else:
+            await self._finish(job_id, job, "COMPLETED", result=result)
+        finally:
+            del self._jobs[job_id]
+            self._release(job.slot, job.user_id)
+
+    async def _finish(
+        self,
+        job_id: str,
+        job: _Job,
+        status: str,
+        result: BacktestResult | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Store a job's final state, unless its row was finished elsewhere, and publish it."""
+        values: dict[str, Any] = {
+            "status": status,
+            "completed_at": datetime.now(timezone.utc),
+            "error_message": error,
+        }
+        if result is not None:
+            values.update(result_columns(result), progress=100)
+
+        async with job.lock:
+            job.finished = True
+            try:
+                async with self.session_maker() as session:
+                    updated = await session.execute(
+                        update(Backtest)
+                        .where(
+                            Backtest.id == uuid.UUID(job_id),
+                            Backtest.status.in_(ACTIVE_STATUSES),
+                        )
+                        .values(**values)
+                        .returning(Backtest.id)
+                    )
+                    stored = updated.scalar_one_or_none() is not None
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Failed to store backtest {job_id}: {e}")
+                status, error = "FAILED", "Backtest result could not be stored"
+            else:
+                if not stored:
+                    # Cancelled (or deleted) through another API process, which
+                    # has published that already
+                    self._cancelled += 1
+                    return
+
+            if status == "COMPLETED" and result is not None:
+                self._completed += 1
+                event = {
+                    "event": "completed",
+                    "status": status,
+                    "progress": 100,
+                    "metrics": result.metrics.model_dump(),
+                }
+            elif status == "CANCELLED":
+                self._cancelled += 1
+                event = {"event": "cancelled", "status": status}
+            else:
+                self._failed += 1
+                event = {"event": "failed", "status": status, "error": error}
+            await self.events.publish(job_id, event)
+
+    def _release(self, slot: int, user_key: str) -> None:
+        """Return a job's slot and per-user quota."""
+        if self._cancel_flags is not None:
+            self._cancel_flags[slot] = 0
+        self._free_slots.append(slot)
+        self._user_jobs[user_key] -= 1
+        if self._user_jobs[user_key] <= 0:
+            del self._user_jobs[user_key]
+
+    async def cancel(self, backtest_id: uuid.UUID) -> bool:
+        """
+        Cancel a queued or running backtest (ownership is the caller's check).
+
+        Returns:
+            False if the backtest had already finished (its final state is
+            stored by then)
+        """
+        job_id = str(backtest_id)
+        job = self._jobs.get(job_id)
+        if job is not None:
+            # Waits out a _finish in progress, so its row is stored on False
+            async with job.lock:
+                if job.finished:
+                    return False
+                # Drops it if still queued, otherwise it stops at its next stage
+                self._cancel_flags[job.slot] = 1
+                job.future.cancel()
+                return True
+
+        # Not running here: may be running in another API process
+        async with self.session_maker() as session:
+            updated = await session.execute(
+                update(Backtest)
+                .where(Backtest.id == backtest_id, Backtest.status.in_(ACTIVE_STATUSES))
+                .values(status="CANCELLED", completed_at=datetime.now(timezone.utc))
+                .returning(Backtest.id)
+            )
+            cancelled = updated.scalar_one_or_none() is not None
+            await session.commit()
+        if not cancelled:
+            return False
+        await self.events.publish(job_id, {"event": "cancelled", "status": "CANCELLED"})
+        return True
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        Cancel jobs in flight and stop the pool.
+
+        Jobs that don't stop within ``timeout`` seconds are marked FAILED so
+        they don't stay RUNNING forever.
+        """
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        jobs = list(self._jobs.items())
+        for _, job in jobs:
+            self._cancel_flags[job.slot] = 1
+            job.future.cancel()
+        pending: set[asyncio.Task] = set()
+        tasks = [job.task for _, job in jobs if job.task is not None]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for job_id, job in jobs:
+                if job.task in pending:
+                    await self._finish(
+                        job_id, job, "FAILED", error="Interrupted by server shutdown"
+                    )
+                    job.task.cancel()
+
+        if self._executor is not None:
+            # Don't block shutdown on a worker stuck in a long stage
+            self._executor.shutdown(wait=not pending, cancel_futures=True)
+            self._executor = None
+            self._progress_queue.put(None)
+            if self._pump is not None:
+                self._pump.join(timeout=1)
+            logger.info("Backtest job pool stopped")
+
+    def stats(self) -> dict[str, Any]:
+        """Return job metrics."""
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "per_user": self.per_user,
+            "in_flight": len(self._jobs),
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "cancelled": self._cancelled,
+            "rejected": self._rejected,
+            "reaped": self._reaped,
+        }
+
+
+backtest_jobs = BacktestJobManager.from_settings()
@@ -0,0 +1,245 @@
+"""Shared cache of indicator series over stored OHLCV."""
+import hashlib
+import json
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.indicators import IndicatorState, indicator_params, run_indicator
+from app.services.ohlcv_store import Candles, SeriesInfo
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, str, int, str, str]
+
+
+@dataclass(slots=True)
+class _Entry:
+    """Indicator outputs for the first ``length`` candles of a series."""
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    length: int = 0
+    buffers: dict[str, np.ndarray] = field(default_factory=dict)  # Capacity >= length
+    state: IndicatorState | None = None
+    accounted: int = 0  # Bytes counted against the budget
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+class IndicatorCache:
+    """
+    Memoized indicator outputs shared by every backtest of a stored series.
+
+    Entries are keyed by (symbol, timeframe, file generation, indicator,
+    params) and hold outputs over the whole series. The series' committed
+    length is the data version: a request for more candles than an entry
+    holds extends it with only the new candles, continuing from the
+    indicator state (last smoothed values or window tails) saved with it,
+    instead of recomputing from the first candle. A rebuild of the series
+    starts a new generation and therefore new entries.
+
+    Least recently used entries are evicted once ``max_bytes`` is exceeded;
+    with a ``spill_dir`` they are pickled there first and loaded back on
+    the next miss. Spill files are only a cache and can be deleted at any
+    time.
+
+    Thread-safe: backtests run in the thread pool. Each entry has its own
+    lock, so concurrent requests for one indicator compute it once.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: str | Path | None = None):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Memory budget for cached outputs (0 disables caching)
+            spill_dir: Directory for evicted entries (None = drop them)
+        """
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+        self.spills = 0
+        self.spill_hits = 0
+
+    @classmethod
+    def from_settings(cls) -> "IndicatorCache":
+        """Create cache from application settings."""
+        return cls(
+            max_bytes=settings.INDICATOR_CACHE_MAX_MB * 1024 * 1024,
+            spill_dir=settings.INDICATOR_CACHE_SPILL_DIR or None,
+        )
+
+    @staticmethod
+    def key(info: SeriesInfo, name: str, params: dict[str, Any]) -> CacheKey:
+        """Cache key; params are normalized so defaults match explicit values."""
+        normalized = json.dumps(indicator_params(name, params), sort_keys=True)
+        return (info.symbol, info.timeframe, info.generation, name.upper(), normalized)
+
+    def get(
+        self, info: SeriesInfo, candles: Candles, name: str, params: dict[str, Any]
+    ) -> dict[str, np.ndarray]:
+        """
+        Indicator outputs over a whole stored series.
+
+        Args:
+            info: Committed state of the series
+            candles: Its candles (all ``info.length`` of them)
+            name: Indicator name
+            params: Indicator parameters
+
+        Returns:
+            Read-only output arrays by field, ``info.length`` long
+
+        Raises:
+            ValueError: If the indicator is unknown
+        """
+        if self.max_bytes == 0:
+            return run_indicator(name, params, candles.columns())[0]
+
+        key = self.key(info, name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            else:
+                self._entries.move_to_end(key)
+
+        with entry.lock:
+            if entry.length == 0 and self.spill_dir is not None:
+                self._load_spill(self.spill_dir, key, entry)
+            if entry.length >= info.length:
+                self.hits += 1
+            else:
+                if entry.length == 0:
+                    self.misses += 1
+                else:
+                    self.extensions += 1
+                self._extend(entry, name, params, candles[entry.length : info.length])
+            outputs = {}
+            for field_name, buffer in entry.buffers.items():
+                view = buffer[: info.length]
+                view.flags.writeable = False
+                outputs[field_name] = view
+
+        self._account(key, entry)
+        return outputs
+
+    @staticmethod
+    def _extend(entry: _Entry, name: str, params: dict[str, Any], new: Candles) -> None:
+        """Compute outputs for new candles and append them to the entry."""
+        outputs, entry.state = run_indicator(name, params, new.columns(), entry.state)
+        needed = entry.length + len(new)
+        for field_name, values in outputs.items():
+            buffer = entry.buffers.get(field_name)
+            if buffer is None or len(buffer) < needed:
+                # Headroom so a trickle of new candles doesn't copy every time
+                grown = np.empty(needed + needed // 16, dtype=np.float64)
+                if buffer is not None:
+                    grown[: entry.length] = buffer[: entry.length]
+                buffer = entry.buffers[field_name] = grown
+            buffer[entry.length : needed] = values
+        entry.length = needed
+
+    def _account(self, key: CacheKey, entry: _Entry) -> None:
+        """Charge an entry's growth to the budget and evict down to it."""
+        evicted = []
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return  # Evicted while it was being computed
+            size = entry.nbytes
+            self._bytes += size - entry.accounted
+            entry.accounted = size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._bytes -= old_entry.accounted
+                self.evictions += 1
+                evicted.append((old_key, old_entry))
+
+        if self.spill_dir is not None:
+            for old_key, old_entry in evicted:
+                self._spill(self.spill_dir, old_key, old_entry)
+
+    @staticmethod
+    def _spill_path(spill_dir: Path, key: CacheKey) -> Path:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        return spill_dir / f"{digest}.pkl"
+
+    def _spill(self, spill_dir: Path, key: CacheKey, entry: _Entry) -> None:
+        """Write an evicted entry to disk."""
+        with entry.lock:
+            if entry.length == 0:
+                return
+            data = {
+                "key": key,
+                "length": entry.length,
+                "outputs": {f: b[: entry.length] for f, b in entry.buffers.items()},
+                "state": entry.state,
+            }
+        try:
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self._spill_path(spill_dir, key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+            tmp.replace(path)
+            self.spills += 1
+        except OSError as e:
+            logger.warning(f"Failed to spill indicator cache entry: {e}")
+
+    def _load_spill(self, spill_dir: Path, key: CacheKey, entry: _Entry) -> None:
+        """Restore an entry spilled earlier, if any (caller holds entry.lock)."""
+        path = self._spill_path(spill_dir, key)
+        try:
+            data = pickle.loads(path.read_bytes())
+            path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable indicator cache spill {path.name}: {e}")
+            return
+        if data["key"] != key:
+            return
+        entry.buffers = {f: np.array(values) for f, values in data["outputs"].items()}
+        entry.state = data["state"]
+        entry.length = data["length"]
+        self.spill_hits += 1
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache metrics."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "extensions": self.extensions,
+            "evictions": self.evictions,
+            "spills": self.spills,
+            "spill_hits": self.spill_hits,
+        }
+
+
+indicator_cache = IndicatorCache.from_settings()
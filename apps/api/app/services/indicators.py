@@ -0,0 +1,338 @@
+"""Vectorized technical indicators over NumPy arrays."""
+import math
+from typing import Any, Callable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Keep (1 - alpha) ** -k within this exponent inside one EWM block
+_EWM_BLOCK_EXPONENT = 40.0
+
+# Carry-over between chunks of one series (last smoothed values, window tails)
+IndicatorState = dict[str, Any]
+
+# OHLCV arrays by column name
+Columns = dict[str, np.ndarray]
+
+# (output arrays by field, state for the next chunk)
+IndicatorOutput = tuple[dict[str, np.ndarray], IndicatorState]
+
+# run(columns, params, state) computes one indicator over a chunk of candles
+IndicatorRun = Callable[[Columns, dict[str, Any], IndicatorState | None], IndicatorOutput]
+
+
+def _ewm(values: np.ndarray, alpha: float, initial: float | None = None) -> np.ndarray:
+    """
+    Exponentially weighted mean, y[t] = alpha * x[t] + (1 - alpha) * y[t-1].
+
+    Starts from y[0] = x[0], equivalent to pandas
+    ``ewm(alpha=alpha, adjust=False).mean()`` for NaN-free input, or
+    continues a previous run when ``initial`` (its last value) is given. The
+    recursion is solved in closed form over blocks (a scaled cumulative
+    sum), so the Python-level loop runs once per block rather than once per
+    element.
+    """
+    n = len(values)
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    block = max(1, min(n, int(_EWM_BLOCK_EXPONENT / -math.log(decay))))
+    powers = decay ** np.arange(1, block + 1)  # decay^(k+1)
+    inverse = 1.0 / powers
+    previous = values[0] if initial is None else initial
+    for start in range(0, n, block):
+        chunk = values[start : start + block]
+        size = len(chunk)
+        # y[k] = decay^(k+1) * prev + alpha * sum_j decay^(k-j) * x[j]
+        acc = np.cumsum(chunk * inverse[:size]) * alpha
+        out[start : start + size] = powers[:size] * (previous + acc)
+        previous = out[start + size - 1]
+    return out
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average (NaN for the first period - 1 values)."""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    # Offset by the first value to keep the running sum small
+    shifted = values - values[0]
+    sums = np.cumsum(shifted)
+    sums[period:] = sums[period:] - sums[:-period]
+    out[period - 1 :] = sums[period - 1 :] / period + values[0]
+    return out
+
+
+def ema(values: np.ndarray, period: int, initial: float | None = None) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (period + 1)."""
+    return _ewm(values, 2.0 / (period + 1), initial)
+
+
+def rolling_std(values: np.ndarray, period: int) -> np.ndarray:
+    """Rolling sample standard deviation (ddof=1)."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period > 1:
+        out[period - 1 :] = sliding_window_view(values, period).std(axis=1, ddof=1)
+    return out
+
+
+def _rsi(
+    values: np.ndarray, period: int, state: IndicatorState | None
+) -> tuple[np.ndarray, IndicatorState]:
+    previous = values[0] if state is None else state["previous"]
+    delta = np.diff(values, prepend=previous)
+    alpha = 1.0 / period
+    gains = _ewm(np.where(delta > 0, delta, 0.0), alpha, None if state is None else state["gain"])
+    losses = _ewm(np.where(delta < 0, -delta, 0.0), alpha, None if state is None else state["loss"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + gains / losses)
+    return out, {"previous": values[-1], "gain": gains[-1], "loss": losses[-1]}
+
+
+def rsi(values: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative strength index (Wilder smoothing), 0 to 100."""
+    return _rsi(values, period, None)[0]
+
+
+def _macd(
+    values: np.ndarray, fast: int, slow: int, signal: int, state: IndicatorState | None
+) -> tuple[dict[str, np.ndarray], IndicatorState]:
+    state = state or {"fast": None, "slow": None, "signal": None}
+    fast_line = ema(values, fast, state["fast"])
+    slow_line = ema(values, slow, state["slow"])
+    line = fast_line - slow_line
+    signal_line = ema(line, signal, state["signal"])
+    outputs = {"value": line, "signal": signal_line, "histogram": line - signal_line}
+    return outputs, {"fast": fast_line[-1], "slow": slow_line[-1], "signal": signal_line[-1]}
+
+
+def macd(
+    values: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
+) -> dict[str, np.ndarray]:
+    """MACD line, signal line and histogram."""
+    return _macd(values, fast, slow, signal, None)[0]
+
+
+def bollinger_bands(
+    values: np.ndarray, period: int = 20, std_dev: float = 2.0
+) -> dict[str, np.ndarray]:
+    """Bollinger bands with bandwidth and %B."""
+    middle = sma(values, period)
+    band = std_dev * rolling_std(values, period)
+    upper, lower = middle + band, middle - band
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "middle": middle,
+            "upper": upper,
+            "lower": lower,
+            "bandwidth": (upper - lower) / middle,
+            "percent_b": (values - lower) / (upper - lower),
+        }
+
+
+def _atr(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int,
+    state: IndicatorState | None,
+) -> tuple[np.ndarray, IndicatorState]:
+    previous = close[0] if state is None else state["close"]
+    prev_close = np.concatenate(([previous], close[:-1]))
+    true_range = np.maximum(high - low, np.abs(high - prev_close))
+    true_range = np.maximum(true_range, np.abs(low - prev_close))
+    if state is None:
+        true_range[0] = high[0] - low[0]
+    out = _ewm(true_range, 1.0 / period, None if state is None else state["atr"])
+    return out, {"close": close[-1], "atr": out[-1]}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average true range (Wilder smoothing)."""
+    return _atr(high, low, close, period, None)[0]
+
+
+def stochastic(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, k_period: int = 14, d_period: int = 3
+) -> dict[str, np.ndarray]:
+    """Stochastic oscillator %K and %D (NaN %K only blanks the %D windows containing it)."""
+    n = len(close)
+    k = np.full(n, np.nan)
+    if n >= k_period:
+        lowest = sliding_window_view(low, k_period).min(axis=1)
+        highest = sliding_window_view(high, k_period).max(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k[k_period - 1 :] = 100.0 * (close[k_period - 1 :] - lowest) / (highest - lowest)
+    d = np.full(n, np.nan)
+    if n >= k_period + d_period - 1:
+        d[k_period + d_period - 2 :] = sliding_window_view(k[k_period - 1 :], d_period).mean(axis=1)
+    return {"k": k, "d": d}
+
+
+def _source(columns: dict[str, np.ndarray], params: dict[str, Any]) -> np.ndarray:
+    return columns[params.get("source", "close")]
+
+
+def _windowed(
+    columns: dict[str, np.ndarray],
+    state: IndicatorState | None,
+    names: tuple[str, ...],
+    lookback: int,
+    compute: Callable[[dict[str, np.ndarray]], dict[str, np.ndarray]],
+) -> tuple[dict[str, np.ndarray], IndicatorState]:
+    """
+    Run a sliding-window indicator over new candles.
+
+    The state keeps the last ``lookback`` inputs, enough to recompute the
+    first new windows exactly.
+    """
+    tail = state["tail"] if state else {name: columns[name][:0] for name in names}
+    joined = {name: np.concatenate((tail[name], columns[name])) for name in names}
+    n = len(columns[names[0]])
+    outputs = {field: values[len(values) - n :] for field, values in compute(joined).items()}
+    start = max(len(joined[names[0]]) - lookback, 0)
+    return outputs, {"tail": {name: values[start:].copy() for name, values in joined.items()}}
+
+
+def _run_sma(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    source = p.get("source", "close")
+    return _windowed(
+        columns, state, (source,), p["period"] - 1, lambda c: {"value": sma(c[source], p["period"])}
+    )
+
+
+def _run_ema(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    out = ema(_source(columns, p), p["period"], None if state is None else state["last"])
+    return {"value": out}, {"last": out[-1]}
+
+
+def _run_rsi(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    out, state = _rsi(_source(columns, p), p["period"], state)
+    return {"value": out}, state
+
+
+def _run_macd(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    return _macd(_source(columns, p), p["fast"], p["slow"], p["signal"], state)
+
+
+def _run_bollinger(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    source = p.get("source", "close")
+    return _windowed(
+        columns,
+        state,
+        (source,),
+        p["period"] - 1,
+        lambda c: bollinger_bands(c[source], p["period"], p["std_dev"]),
+    )
+
+
+def _run_atr(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    out, state = _atr(columns["high"], columns["low"], columns["close"], p["period"], state)
+    return {"value": out}, state
+
+
+def _run_stochastic(
+    columns: Columns, p: dict[str, Any], state: IndicatorState | None
+) -> IndicatorOutput:
+    return _windowed(
+        columns,
+        state,
+        ("high", "low", "close"),
+        p["k_period"] + p["d_period"] - 2,
+        lambda c: stochastic(c["high"], c["low"], c["close"], p["k_period"], p["d_period"]),
+    )
+
+
+# name -> (run(columns, params, state) -> ({field: array}, state), default params)
+# Names and output fields must match app.schemas.backtest.INDICATOR_OUTPUTS
+INDICATORS: dict[str, tuple[IndicatorRun, dict[str, Any]]] = {
+    "SMA": (_run_sma, {"period": 20}),
+    "EMA": (_run_ema, {"period": 20}),
+    "RSI": (_run_rsi, {"period": 14}),
+    "MACD": (_run_macd, {"fast": 12, "slow": 26, "signal": 9}),
+    "BOLLINGER": (_run_bollinger, {"period": 20, "std_dev": 2.0}),
+    "ATR": (_run_atr, {"period": 14}),
+    "STOCHASTIC": (_run_stochastic, {"k_period": 14, "d_period": 3}),
+}
+
+
+def indicator_params(name: str, params: dict[str, Any]) -> dict[str, Any]:
+    """
+    Parameters with defaults filled in.
+
+    Raises:
+        ValueError: If the indicator is unknown
+    """
+    try:
+        _, defaults = INDICATORS[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown indicator: {name}") from None
+    return {**defaults, **params}
+
+
+def run_indicator(
+    name: str,
+    params: dict[str, Any],
+    columns: dict[str, np.ndarray],
+    state: IndicatorState | None = None,
+) -> tuple[dict[str, np.ndarray], IndicatorState]:
+    """
+    Compute an indicator over candles, optionally continuing a previous run.
+
+    Feeding a series in consecutive chunks, each with the state returned for
+    the previous one, gives the same values as one call over the whole
+    series (up to float rounding), so cached results can be extended when
+    new candles arrive.
+
+    Args:
+        name: Indicator name (see INDICATORS)
+        params: Indicator parameters; missing ones use the defaults
+        columns: OHLCV arrays by column name (at least one candle)
+        state: State returned by the previous chunk (None = start of series)
+
+    Returns:
+        (output arrays by field, state for the next chunk)
+
+    Raises:
+        ValueError: If the indicator is unknown
+    """
+    params = indicator_params(name, params)
+    run, _ = INDICATORS[name.upper()]
+    return run(columns, params, state)
+
+
+def compute_indicator(
+    name: str, params: dict[str, Any], columns: dict[str, np.ndarray]
+) -> dict[str, np.ndarray]:
+    """
+    Compute one indicator over OHLCV columns.
+
+    Args:
+        name: Indicator name (see INDICATORS)
+        params: Indicator parameters; missing ones use the defaults
+        columns: OHLCV arrays by column name
+
+    Returns:
+        Output arrays by field ("value" for single-output indicators)
+
+    Raises:
+        ValueError: If the indicator is unknown
+    """
+    return run_indicator(name, params, columns)[0]
@@ -0,0 +1,330 @@
+"""Columnar, memory-mapped OHLCV store."""
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.schemas.backtest import OHLCV_COLUMNS, SYMBOL_PATTERN, TIMEFRAME_PATTERN
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+COLUMN_DTYPES: dict[str, type[np.generic]] = {
+    "timestamp": np.int64,
+    **{name: np.float64 for name in OHLCV_COLUMNS},
+}
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Epoch milliseconds of a datetime (naive values are UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return round(value.timestamp() * 1000)
+
+
+def from_epoch_ms(value: int) -> datetime:
+    """UTC datetime of epoch milliseconds."""
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def time_window(timestamps: np.ndarray, start: int | None, end: int | None) -> slice:
+    """Rows with start <= timestamp < end of sorted timestamps (binary search)."""
+    lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+    return slice(lo, hi)
+
+
+@dataclass(slots=True)
+class Candles:
+    """Columnar OHLCV series; timestamps are epoch milliseconds."""
+
+    timestamp: np.ndarray  # int64
+    open: np.ndarray  # float64
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_columns(cls, timestamp: Any, **columns: Any) -> "Candles":
+        """Build from array-likes (no copy for arrays of the right dtype)."""
+        return cls(
+            np.asarray(timestamp, dtype=np.int64),
+            *(np.asarray(columns[name], dtype=np.float64) for name in OHLCV_COLUMNS),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, window: slice) -> "Candles":
+        """Candles in a slice of rows (views, no copy)."""
+        return Candles(*(getattr(self, name)[window] for name in COLUMN_DTYPES))
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """OHLCV arrays by column name."""
+        return {name: getattr(self, name) for name in OHLCV_COLUMNS}
+
+
+@dataclass(slots=True)
+class SeriesInfo:
+    """Committed state of one symbol/timeframe series (its meta.json)."""
+
+    symbol: str
+    timeframe: str
+    length: int = 0
+    version: int = 0  # Bumped on every append or rebuild
+    generation: int = 0  # Column file set, changes on rebuild
+    first_timestamp: int | None = None
+    last_timestamp: int | None = None
+
+
+class OHLCVStore:
+    """
+    Per-series column files mapped straight into NumPy.
+
+    Each symbol/timeframe is a directory holding one raw little-endian file
+    per column (int64 epoch-ms timestamps, float64 prices and volume) plus a
+    meta.json recording the committed length. Reads memory-map the columns
+    and binary-search the timestamp column, so a date range is two
+    O(log n) lookups and the returned Candles are views into the page
+    cache: nothing is parsed or copied, and only the pages a backtest
+    touches are read from disk.
+
+    Writers append to the column files first and commit by atomically
+    replacing meta.json; readers only trust the committed length, so they
+    never lock and never see a torn append. Rebuilds write a new file
+    generation and switch to it the same way, leaving existing mappings of
+    the old files valid.
+
+    Postgres (the ohlcv_data table) stays the source of truth; see
+    app.services.ohlcv_sync.
+    """
+
+    def __init__(self, root: str | Path):
+        """
+        Initialize store.
+
+        Args:
+            root: Directory holding one subdirectory per series
+        """
+        self.root = Path(root)
+        self._mapped: dict[tuple[str, str], tuple[SeriesInfo, Candles]] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.maps = 0
+
+    @classmethod
+    def from_settings(cls) -> "OHLCVStore":
+        """Create store from application settings."""
+        return cls(settings.OHLCV_STORE_DIR)
+
+    def _series_dir(self, symbol: str, timeframe: str) -> Path:
+        """
+        Directory of a series (BTC/USDT 1h -> BTC-USDT/1h, BTC-USDT -> BTC--USDT).
+
+        Symbols hold at most one separator, so doubling "-" before mapping
+        "/" to it keeps distinct symbols in distinct directories.
+        """
+        if not re.match(SYMBOL_PATTERN, symbol) or not re.match(TIMEFRAME_PATTERN, timeframe):
+            raise ValueError(f"Invalid series: {symbol} {timeframe}")
+        return self.root / symbol.replace("-", "--").replace("/", "-") / timeframe
+
+    @staticmethod
+    def _column_path(directory: Path, name: str, generation: int) -> Path:
+        return directory / f"{name}.{generation}.bin"
+
+    def info(self, symbol: str, timeframe: str) -> SeriesInfo | None:
+        """Committed state of a series, or None if it was never written."""
+        try:
+            meta = json.loads((self._series_dir(symbol, timeframe) / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+        return SeriesInfo(**meta)
+
+    def series(self) -> list[SeriesInfo]:
+        """All stored series."""
+        return [
+            SeriesInfo(**json.loads(path.read_text()))
+            for path in sorted(self.root.glob("*/*/meta.json"))
+        ]
+
+    def load(self, symbol: str, timeframe: str) -> tuple[SeriesInfo, Candles]:
+        """
+        Whole committed series, memory-mapped (remapped only after writes).
+
+        Raises:
+            ValueError: If the series does not exist
+        """
+        info = self.info(symbol, timeframe)
+        if info is None:
+            raise ValueError(f"No stored candles for {symbol} {timeframe}")
+
+        key = (symbol, timeframe)
+        with self._lock:
+            self.reads += 1
+            cached = self._mapped.get(key)
+            if cached is not None and cached[0].version == info.version:
+                return cached
+
+            directory = self._series_dir(symbol, timeframe)
+            columns = {}
+            for name, dtype in COLUMN_DTYPES.items():
+                if info.length == 0:
+                    columns[name] = np.empty(0, dtype=dtype)
+                    continue
+                path = self._column_path(directory, name, info.generation)
+                # Plain ndarray view: arithmetic results shouldn't be memmaps
+                columns[name] = np.memmap(
+                    path, dtype=dtype, mode="r", shape=(info.length,)
+                ).view(np.ndarray)
+            self._mapped[key] = (info, Candles(**columns))
+            self.maps += 1
+            return self._mapped[key]
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> Candles:
+        """
+        Candles with start <= timestamp < end, as zero-copy read-only views.
+
+        Args:
+            symbol: Market symbol, e.g. BTC/USDT
+            timeframe: Candle timeframe, e.g. 1h
+            start: Inclusive lower bound in epoch milliseconds (default: first)
+            end: Exclusive upper bound in epoch milliseconds (default: last)
+
+        Raises:
+            ValueError: If the series does not exist
+        """
+        _, candles = self.load(symbol, timeframe)
+        return candles[time_window(candles.timestamp, start, end)]
+
+    @contextmanager
+    def _writing(self, directory: Path) -> Iterator[None]:
+        """Serialize writers of one series across processes."""
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _commit(directory: Path, info: SeriesInfo) -> None:
+        """Atomically publish a new series state."""
+        tmp = directory / "meta.json.tmp"
+        tmp.write_text(json.dumps(asdict(info)))
+        os.replace(tmp, directory / "meta.json")
+
+    def _write_columns(
+        self, directory: Path, candles: Candles, generation: int, offset: int
+    ) -> None:
+        """Write candles at row ``offset`` of a generation's column files."""
+        for name, dtype in COLUMN_DTYPES.items():
+            path = self._column_path(directory, name, generation)
+            values = np.ascontiguousarray(getattr(candles, name), dtype=dtype)
+            with open(path, "ab") as f:
+                # Drop any uncommitted tail left by an interrupted append
+                f.truncate(offset * values.itemsize)
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _validate(candles: Candles) -> None:
+        if len(candles) > 1 and np.any(np.diff(candles.timestamp) <= 0):
+            raise ValueError("Candle timestamps must be strictly increasing")
+
+    def append(self, symbol: str, timeframe: str, candles: Candles) -> int:
+        """
+        Append candles newer than the last stored one.
+
+        Candles at or before the last stored timestamp are skipped, so
+        re-sending an overlapping batch is harmless.
+
+        Returns:
+            Number of candles appended
+
+        Raises:
+            ValueError: If timestamps are not strictly increasing
+        """
+        self._validate(candles)
+        directory = self._series_dir(symbol, timeframe)
+        with self._writing(directory):
+            info = self.info(symbol, timeframe) or SeriesInfo(symbol, timeframe)
+            skip = 0
+            if info.last_timestamp is not None:
+                skip = int(np.searchsorted(candles.timestamp, info.last_timestamp, side="right"))
+            new = Candles(*(getattr(candles, name)[skip:] for name in COLUMN_DTYPES))
+            if not len(new):
+                return 0
+
+            self._write_columns(directory, new, info.generation, info.length)
+            info.length += len(new)
+            info.version += 1
+            if info.first_timestamp is None:
+                info.first_timestamp = int(new.timestamp[0])
+            info.last_timestamp = int(new.timestamp[-1])
+            self._commit(directory, info)
+        logger.info(f"Appended {len(new)} candles to {symbol} {timeframe} ({info.length} total)")
+        return len(new)
+
+    def rebuild(self, symbol: str, timeframe: str, candles: Candles) -> None:
+        """
+        Replace a series entirely (e.g. after corrections in the database).
+
+        Readers keep their current mapping until the new generation is
+        committed.
+
+        Raises:
+            ValueError: If timestamps are not strictly increasing
+        """
+        self._validate(candles)
+        directory = self._series_dir(symbol, timeframe)
+        with self._writing(directory):
+            old = self.info(symbol, timeframe) or SeriesInfo(symbol, timeframe, generation=-1)
+            info = SeriesInfo(
+                symbol,
+                timeframe,
+                length=len(candles),
+                version=old.version + 1,
+                generation=old.generation + 1,
+                first_timestamp=int(candles.timestamp[0]) if len(candles) else None,
+                last_timestamp=int(candles.timestamp[-1]) if len(candles) else None,
+            )
+            self._write_columns(directory, candles, info.generation, 0)
+            self._commit(directory, info)
+            # Mapped files stay readable after unlink
+            for name in COLUMN_DTYPES:
+                self._column_path(directory, name, old.generation).unlink(missing_ok=True)
+        logger.info(f"Rebuilt {symbol} {timeframe} with {len(candles)} candles")
+
+    def stats(self) -> dict[str, Any]:
+        """Return store metrics."""
+        with self._lock:
+            mapped = list(self._mapped.values())
+        return {
+            "root": str(self.root),
+            "mapped_series": len(mapped),
+            "mapped_candles": sum(info.length for info, _ in mapped),
+            "maps": self.maps,
+            "reads": self.reads,
+        }
+
+
+ohlcv_store = OHLCVStore.from_settings()
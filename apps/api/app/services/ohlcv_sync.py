@@ -0,0 +1,93 @@
+"""Sync the columnar OHLCV store from the ohlcv_data table."""
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import Float, Row, cast, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.ohlcv import OHLCVData
+from app.schemas.backtest import OHLCV_COLUMNS
+from app.services.ohlcv_store import (
+    COLUMN_DTYPES,
+    Candles,
+    OHLCVStore,
+    from_epoch_ms,
+    to_epoch_ms,
+)
+
+
+def _to_candles(rows: Sequence[Row]) -> Candles:
+    """Convert a batch of (timestamp, open, high, low, close, volume) rows."""
+    timestamps, *prices = zip(*rows)
+    return Candles(
+        np.fromiter((to_epoch_ms(ts) for ts in timestamps), dtype=np.int64, count=len(rows)),
+        *(np.asarray(column, dtype=np.float64) for column in prices),
+    )
+
+
+async def list_series(session: AsyncSession) -> list[tuple[str, str]]:
+    """Every (symbol, timeframe) present in the database."""
+    result = await session.execute(
+        select(OHLCVData.symbol, OHLCVData.timeframe)
+        .distinct()
+        .order_by(OHLCVData.symbol, OHLCVData.timeframe)
+    )
+    return [(symbol, timeframe) for symbol, timeframe in result]
+
+
+async def sync_series(
+    session_maker: async_sessionmaker[AsyncSession],
+    store: OHLCVStore,
+    symbol: str,
+    timeframe: str,
+    batch_size: int = 50_000,
+    rebuild: bool = False,
+) -> int:
+    """
+    Copy candles of one series from the database into the store.
+
+    Incremental by default: only rows after the last stored timestamp are
+    fetched (an index range scan on (symbol, timeframe, timestamp)) and
+    appended batch by batch. ``rebuild`` re-reads the whole series and
+    swaps it in atomically, for when past candles were corrected.
+
+    DECIMAL prices are cast to float in SQL, so the driver hands back
+    floats instead of Decimal objects.
+
+    Returns:
+        Number of candles written
+    """
+    stmt = (
+        select(
+            OHLCVData.timestamp,
+            *(cast(getattr(OHLCVData, name), Float) for name in OHLCV_COLUMNS),
+        )
+        .where(OHLCVData.symbol == symbol, OHLCVData.timeframe == timeframe)
+        .order_by(OHLCVData.timestamp)
+        .execution_options(yield_per=batch_size)
+    )
+    info = None if rebuild else store.info(symbol, timeframe)
+    if info is not None and info.last_timestamp is not None:
+        stmt = stmt.where(OHLCVData.timestamp > from_epoch_ms(info.last_timestamp))
+
+    written = 0
+    batches: list[Candles] = []
+    async with session_maker() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            candles = _to_candles(rows)
+            if rebuild:
+                batches.append(candles)
+            else:
+                written += store.append(symbol, timeframe, candles)
+
+    if rebuild:
+        candles = Candles(
+            *(
+                np.concatenate([getattr(batch, name) for batch in batches] or [np.empty(0, dtype)])
+                for name, dtype in COLUMN_DTYPES.items()
+            )
+        )
+        store.rebuild(symbol, timeframe, candles)
+        written = len(candles)
+    return written
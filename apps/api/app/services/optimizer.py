@@ -0,0 +1,597 @@
+"""Parameter sweeps and walk-forward optimization over shared candles."""
+import asyncio
+import copy
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.core.config import get_settings
+from app.core.exceptions import ServiceUnavailableError
+from app.schemas.backtest import (
+    BacktestMetrics,
+    IndicatorConfig,
+    OptimizationRequest,
+    OptimizationResult,
+    OptimizationRow,
+    ParameterRange,
+    StrategySpec,
+    WalkForward,
+    WalkForwardFold,
+)
+from app.services.backtest import (
+    compute_metrics,
+    generate_signals,
+    load_candles,
+    load_stored,
+    operand_series,
+    simulate,
+)
+from app.services.indicator_cache import IndicatorCache
+from app.services.indicators import INDICATORS, compute_indicator, indicator_params
+from app.services.ohlcv_store import Candles, OHLCVStore
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# (indicator, normalized params): one computation shared by every candidate using it
+IndicatorKey = tuple[str, str]
+Window = tuple[int, int]  # Candle rows [start, stop)
+Params = dict[str, int | float | str]
+
+MINIMIZED = frozenset({"mdd"})
+
+
+def indicator_key(config: IndicatorConfig) -> IndicatorKey:
+    """Key of an indicator node; defaults are filled so they match explicit values."""
+    params = indicator_params(config.indicator, config.params())
+    return config.indicator, json.dumps(params, sort_keys=True)
+
+
+def set_param(strategy: dict[str, Any], path: str, value: int | float | str) -> None:
+    """
+    Set a parameter of a dumped strategy by dotted path.
+
+    Numeric literal operands ("30") stay strings. Indicator parameters that
+    the strategy leaves at their default can be set too.
+
+    Raises:
+        ValueError: If the path doesn't point at a strategy parameter
+    """
+    *parents, last = path.split(".")
+    node: Any = strategy
+    try:
+        for part in parents:
+            node = node[int(part)] if isinstance(node, list) else node[part]
+        if isinstance(node, list):
+            index = int(last)
+            current = node[index]
+            node[index] = str(value) if isinstance(current, str) else value
+            return
+        if last not in node:
+            # Only indicator parameters left at their default may be missing
+            if len(parents) != 2 or parents[0] != "indicators":
+                raise KeyError(last)
+            if last not in INDICATORS[node["indicator"]][1]:
+                raise KeyError(last)
+        node[last] = str(value) if isinstance(node.get(last), str) else value
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise ValueError(f"Unknown strategy parameter: {path}") from None
+
+
+def _sample(parameter: ParameterRange, rng: np.random.Generator) -> int | float | str:
+    """One random value of a parameter."""
+    if parameter.values is not None:
+        return parameter.values[int(rng.integers(len(parameter.values)))]
+    low, high = parameter.bounds
+    if parameter.step is not None:
+        steps = int(math.floor((high - low) / parameter.step + 1e-9))
+        value = low + int(rng.integers(steps + 1)) * parameter.step
+        return int(value) if parameter.integral else round(value, 10)
+    if parameter.integral:
+        return int(rng.integers(int(low), int(high) + 1))
+    return float(rng.uniform(low, high))
+
+
+def build_candidates(request: OptimizationRequest) -> list[Params]:
+    """Parameter sets to evaluate: the full grid, or distinct random samples."""
+    paths = [parameter.path for parameter in request.parameters]
+    if request.search == "grid":
+        grids = [parameter.grid() for parameter in request.parameters]
+        return [dict(zip(paths, values)) for values in itertools.product(*grids)]
+
+    rng = np.random.default_rng(request.seed)
+    seen: set[tuple] = set()
+    candidates = []
+    # Small discrete spaces can't yield `samples` distinct sets; stop trying
+    for _ in range(request.samples * 20):
+        values = tuple(_sample(parameter, rng) for parameter in request.parameters)
+        if values not in seen:
+            seen.add(values)
+            candidates.append(dict(zip(paths, values)))
+            if len(candidates) == request.samples:
+                break
+    return candidates
+
+
+def build_strategies(base: StrategySpec, candidates: list[Params]) -> list[StrategySpec]:
+    """
+    The base strategy with each candidate's parameters applied.
+
+    Raises:
+        ValueError: If a path is unknown or a candidate makes the strategy invalid
+    """
+    dumped = base.model_dump()
+    strategies = []
+    for params in candidates:
+        strategy = copy.deepcopy(dumped)
+        for path, value in params.items():
+            set_param(strategy, path, value)
+        try:
+            strategies.append(StrategySpec.model_validate(strategy))
+        except ValidationError as e:
+            raise ValueError(f"Invalid strategy for {params}: {e.errors()[0]['msg']}") from None
+    return strategies
+
+
+def walk_forward_windows(n: int, walk_forward: WalkForward) -> list[tuple[Window, Window]]:
+    """
+    (in-sample, out-of-sample) windows of each fold, oldest first.
+
+    Raises:
+        ValueError: If the windows would hold fewer than 2 candles
+    """
+    test = int(n / (walk_forward.folds + walk_forward.train_ratio))
+    train = int(test * walk_forward.train_ratio)
+    if test < 2 or train < 2:
+        raise ValueError(f"Too few candles for {walk_forward.folds} walk-forward folds")
+    first_test = n - walk_forward.folds * test
+    folds = []
+    for fold in range(walk_forward.folds):
+        test_start = first_test + fold * test
+        train_start = 0 if walk_forward.anchored else test_start - train
+        folds.append(((train_start, test_start), (test_start, test_start + test)))
+    return folds
+
+
+@dataclass(frozen=True, slots=True)
+class SharedSeries:
+    """Layout of candles and indicator outputs in a shared memory block."""
+
+    name: str
+    length: int
+    columns: dict[str, int]  # Candle column -> byte offset
+    outputs: dict[IndicatorKey, dict[str, int]]  # Indicator -> field -> byte offset
+
+
+def share_series(
+    candles: Candles, outputs: dict[IndicatorKey, dict[str, np.ndarray]]
+) -> tuple[SharedMemory, SharedSeries]:
+    """Copy candles and indicator outputs into a new shared memory block (caller unlinks)."""
+    n = len(candles)
+    arrays = {"timestamp": candles.timestamp, **candles.columns()}
+    count = len(arrays) + sum(len(fields) for fields in outputs.values())
+    shm = SharedMemory(create=True, size=max(count * n * 8, 1))
+    offset = 0
+
+    def put(values: np.ndarray, dtype: type = np.float64) -> int:
+        nonlocal offset
+        start = offset
+        np.ndarray(n, dtype, buffer=shm.buf, offset=start)[:] = values
+        offset += n * 8
+        return start
+
+    columns = {
+        name: put(values, np.int64 if name == "timestamp" else np.float64)
+        for name, values in arrays.items()
+    }
+    layout = {
+        key: {field: put(values) for field, values in fields.items()}
+        for key, fields in outputs.items()
+    }
+    return shm, SharedSeries(shm.name, n, columns, layout)
+
+
+def _views(
+    shm: SharedMemory, shared: SharedSeries
+) -> tuple[Candles, dict[IndicatorKey, dict[str, np.ndarray]]]:
+    """Read-only arrays over an attached block."""
+
+    def view(offset: int, dtype: type = np.float64) -> np.ndarray:
+        array = np.ndarray(shared.length, dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        return array
+
+    columns = {
+        name: view(offset) for name, offset in shared.columns.items() if name != "timestamp"
+    }
+    candles = Candles.from_columns(view(shared.columns["timestamp"], np.int64), **columns)
+    outputs = {
+        key: {field: view(offset) for field, offset in fields.items()}
+        for key, fields in shared.outputs.items()
+    }
+    return candles, outputs
+
+
+def evaluate(
+    strategy: StrategySpec,
+    candles: Candles,
+    outputs: dict[IndicatorKey, dict[str, np.ndarray]],
+    windows: list[Window],
+    costs: tuple[float, float, float],
+) -> list[BacktestMetrics]:
+    """
+    Metrics of one strategy in each window.
+
+    Signals are evaluated once over all candles; each window is then
+    simulated from the initial capital on its own.
+    """
+    initial_capital, fee_rate, slippage_rate = costs
+    series = operand_series(
+        candles.columns(),
+        {name: outputs[indicator_key(config)] for name, config in strategy.indicators.items()},
+    )
+    entries, exits = generate_signals(strategy, candles, series)
+    metrics = []
+    for start, stop in windows:
+        window = slice(start, stop)
+        part = candles[window]
+        simulation = simulate(
+            part,
+            entries[window],
+            exits[window],
+            initial_capital=initial_capital,
+            fee_rate=fee_rate,
+            slippage_rate=slippage_rate,
+            position_size=strategy.position_size,
+            stop_loss=strategy.stop_loss,
+            take_profit=strategy.take_profit,
+        )
+        metrics.append(compute_metrics(part.timestamp, simulation, initial_capital))
+    return metrics
+
+
+def _evaluate_batch(
+    shared: SharedSeries,
+    strategies: list[StrategySpec],
+    windows: list[Window],
+    costs: tuple[float, float, float],
+) -> list[list[BacktestMetrics]]:
+    """Evaluate a batch of strategies in a worker, reading the shared block in place."""
+    shm = SharedMemory(name=shared.name)
+    try:
+        return _evaluate_attached(shm, shared, strategies, windows, costs)
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # A traceback still holds views; released with it
+
+
+def _evaluate_attached(
+    shm: SharedMemory,
+    shared: SharedSeries,
+    strategies: list[StrategySpec],
+    windows: list[Window],
+    costs: tuple[float, float, float],
+) -> list[list[BacktestMetrics]]:
+    candles, outputs = _views(shm, shared)
+    return [evaluate(strategy, candles, outputs, windows, costs) for strategy in strategies]
+
+
+def _objective(metrics: BacktestMetrics, objective: str) -> float:
+    """
+    Objective value; NaN when the candidate didn't trade.
+
+    Profit factor without losing trades counts as infinite when there were
+    winning trades and as NaN when every trade broke even.
+    """
+    if metrics.total_trades == 0:
+        return math.nan
+    value = getattr(metrics, objective)
+    if value is None:
+        return math.inf if metrics.win_rate > 0 else math.nan
+    return float(value)
+
+
+def _rank_key(value: float, objective: str) -> float:
+    """Sort key, lower is better; NaN sorts last."""
+    if math.isnan(value):
+        return math.inf
+    return value if objective in MINIMIZED else -value
+
+
+def _finite(value: float) -> float | None:
+    return value if math.isfinite(value) else None
+
+
+@dataclass(slots=True)
+class _Prepared:
+    """Candidates and the data they are evaluated on."""
+
+    candidates: list[Params]
+    strategies: list[StrategySpec]
+    candles: Candles
+    outputs: dict[IndicatorKey, dict[str, np.ndarray]]
+    folds: list[tuple[Window, Window]]
+
+
+class BacktestOptimizer:
+    """
+    Evaluate many parameter sets of one strategy in parallel batches.
+
+    The candle range is loaded once and every distinct indicator the
+    candidates need (each node/params pair, however many candidates share
+    it) is computed once, through the shared indicator cache for stored
+    ranges. Candles and indicator outputs are then copied into one shared
+    memory block that pool workers read in place, so a batch only carries
+    its strategies; workers evaluate signals and simulate.
+
+    With walk-forward splits, each candidate is also simulated on every
+    fold's in-sample and out-of-sample window. Rows are then ranked by their
+    mean out-of-sample objective, and each fold reports the best in-sample
+    candidate and how it did out of sample.
+
+    At most ``max_running`` optimizations run at once per API process;
+    beyond that, callers get a 503.
+    """
+
+    def __init__(self, mode: str = "process", max_workers: int = 0, max_running: int = 2):
+        """
+        Initialize optimizer.
+
+        Args:
+            mode: "thread" or "process"
+            max_workers: Pool size, 0 for one worker per CPU core
+            max_running: Max optimizations running at once
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unsupported optimizer executor: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_running = max_running
+        self._executor: Executor | None = None
+
+        # Metrics
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._evaluations = 0
+
+    @classmethod
+    def from_settings(cls) -> "BacktestOptimizer":
+        """Create optimizer configured from application settings."""
+        return cls(
+            mode=settings.OPTIMIZER_EXECUTOR,
+            max_workers=settings.OPTIMIZER_WORKERS,
+            max_running=settings.OPTIMIZER_MAX_RUNNING,
+        )
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use."""
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn avoids forking a process that is running an event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="optimizer",
+                )
+            logger.info(f"Optimizer pool started: {self.mode} x{self.max_workers}")
+        return self._executor
+
+    @staticmethod
+    def prepare(
+        request: OptimizationRequest, store: OHLCVStore, cache: IndicatorCache
+    ) -> _Prepared:
+        """
+        Build candidates, load candles and compute the indicators they need.
+
+        Raises:
+            ValueError: If candidates are invalid, the candles can't be loaded
+                or the data would exceed OPTIMIZER_MAX_SHARED_MB
+        """
+        candidates = build_candidates(request)
+        strategies = build_strategies(request.strategy, candidates)
+        configs = {
+            indicator_key(config): config
+            for strategy in strategies
+            for config in strategy.indicators.values()
+        }
+
+        if request.market is not None:
+            info, history, window = load_stored(request.market, store)
+            candles = history[window]
+        else:
+            candles, _ = load_candles(request, store, cache)
+
+        n = len(candles)
+        folds = walk_forward_windows(n, request.walk_forward) if request.walk_forward else []
+
+        max_fields = settings.OPTIMIZER_MAX_SHARED_MB * 1024 * 1024 // (n * 8)
+        fields = 6  # Timestamp and OHLCV
+        outputs = {}
+        for key, config in configs.items():
+            if request.market is not None:
+                values = cache.get(info, history, config.indicator, config.params())
+                outputs[key] = {field: array[window] for field, array in values.items()}
+            else:
+                outputs[key] = compute_indicator(
+                    config.indicator, config.params(), candles.columns()
+                )
+            fields += len(outputs[key])
+            if fields > max_fields:
+                raise ValueError(
+                    "Too much data to optimize at once: narrow the range or the parameters"
+                )
+        return _Prepared(candidates, strategies, candles, outputs, folds)
+
+    async def optimize(
+        self, request: OptimizationRequest, store: OHLCVStore, cache: IndicatorCache
+    ) -> OptimizationResult:
+        """
+        Evaluate every candidate of a request and rank them.
+
+        Raises:
+            ValueError: See prepare
+            ServiceUnavailableError: If max_running optimizations are running
+        """
+        if self._running >= self.max_running:
+            self._rejected += 1
+            raise ServiceUnavailableError(
+                message="Too many optimizations running. Please try again shortly.",
+                retry_after=5,
+            )
+
+        self._running += 1
+        started = time.perf_counter()
+        try:
+            prepared = await asyncio.to_thread(self.prepare, request, store, cache)
+            n = len(prepared.candles)
+            windows = [(0, n)] + [window for fold in prepared.folds for window in fold]
+            costs = (request.initial_capital, request.fee_rate, request.slippage_rate)
+
+            shm, shared = await asyncio.to_thread(share_series, prepared.candles, prepared.outputs)
+            try:
+                strategies = prepared.strategies
+                # A few batches per worker: even load without per-strategy overhead
+                size = max(1, min(32, math.ceil(len(strategies) / (self.max_workers * 4))))
+                loop = asyncio.get_running_loop()
+                executor = self._get_executor()
+                batches = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            executor,
+                            _evaluate_batch,
+                            shared,
+                            strategies[i : i + size],
+                            windows,
+                            costs,
+                        )
+                        for i in range(0, len(strategies), size)
+                    )
+                )
+            finally:
+                shm.close()
+                shm.unlink()
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._running -= 1
+
+        results = [metrics for batch in batches for metrics in batch]
+        self._completed += 1
+        self._evaluations += len(results) * len(windows)
+        result = self._rank(request, prepared, results, len(windows))
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(
+            f"Optimization finished: {len(results)} candidates x {len(windows)} windows "
+            f"over {n} candles in {result.elapsed_ms:.0f} ms"
+        )
+        return result
+
+    @staticmethod
+    def _rank(
+        request: OptimizationRequest,
+        prepared: _Prepared,
+        results: list[list[BacktestMetrics]],
+        windows: int,
+    ) -> OptimizationResult:
+        """Ranked rows and walk-forward folds from per-window metrics."""
+        objective = request.objective
+        timestamps = prepared.candles.timestamp
+        fold_count = len(prepared.folds)
+
+        # (score, out-of-sample score per fold); a fold without trades makes the mean NaN
+        scores: list[tuple[float, list[float] | None]] = []
+        for metrics in results:
+            if fold_count:
+                # Windows are [whole, train 1, test 1, train 2, test 2, ...]
+                out_of_sample = [
+                    _objective(metrics[2 + 2 * f], objective) for f in range(fold_count)
+                ]
+                scores.append((float(np.mean(out_of_sample)), out_of_sample))
+            else:
+                scores.append((_objective(metrics[0], objective), None))
+
+        order = sorted(range(len(results)), key=lambda i: _rank_key(scores[i][0], objective))
+        rows = []
+        for rank, i in enumerate(order[: request.top], start=1):
+            score, fold_scores = scores[i]
+            rows.append(
+                OptimizationRow(
+                    rank=rank,
+                    params=prepared.candidates[i],
+                    score=_finite(score),
+                    metrics=results[i][0],
+                    fold_scores=[_finite(s) for s in fold_scores] if fold_scores else None,
+                )
+            )
+
+        folds = []
+        for f, ((train_start, train_stop), (test_start, test_stop)) in enumerate(prepared.folds):
+            best = min(
+                range(len(results)),
+                key=lambda i: _rank_key(_objective(results[i][1 + 2 * f], objective), objective),
+            )
+            folds.append(
+                WalkForwardFold(
+                    train_start=int(timestamps[train_start]),
+                    train_end=int(timestamps[train_stop - 1]),
+                    test_start=int(timestamps[test_start]),
+                    test_end=int(timestamps[test_stop - 1]),
+                    params=prepared.candidates[best],
+                    in_sample=results[best][1 + 2 * f],
+                    out_of_sample=results[best][2 + 2 * f],
+                )
+            )
+
+        return OptimizationResult(
+            objective=objective,
+            candidates=len(results),
+            indicators=len(prepared.outputs),
+            evaluations=len(results) * windows,
+            candles=len(prepared.candles),
+            rows=rows,
+            folds=folds or None,
+            elapsed_ms=0.0,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return optimizer metrics."""
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "max_running": self.max_running,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "evaluations": self._evaluations,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info("Optimizer pool stopped")
+
+
+backtest_optimizer = BacktestOptimizer.from_settings()
@@ -1,10 +1,24 @@
 """User service."""
-from sqlalchemy import select
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import Row, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.models.user import User
 
+# Columns needed by the public User schema (never the password hash)
+USER_PUBLIC_COLUMNS = (
+    User.id,
+    User.email,
+    User.full_name,
+    User.is_active,
+    User.is_superuser,
+    User.created_at,
+    User.updated_at,
+)
+
 
 async def get_user_by_id(db: AsyncSession, user_id: int | UUID) -> User | None:
     """Get user by ID."""
@@ -18,9 +32,51 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     return result.scalars().first()
 
 
-async def get_users(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> list[User]:
-    """Get list of users."""
-    result = await db.execute(select(User).offset(skip).limit(limit))
-    return list(result.scalars().all())
+def encode_user_cursor(created_at: datetime, user_id: UUID) -> str:
+    """Encode the (created_at, id) position of a user as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{user_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_user_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_user_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, user_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def get_users_page(
+    db: AsyncSession, limit: int = 100, cursor: str | None = None
+) -> tuple[list[Row], str | None]:
+    """
+    Get a page of users ordered by (created_at, id).
+
+    Uses keyset pagination on ix_users_created_at_id, so every page costs the
+    same regardless of depth, and selects only the public columns.
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+    """
+    stmt = select(*USER_PUBLIC_COLUMNS).order_by(User.created_at, User.id).limit(limit + 1)
+    if cursor:
+        created_at, user_id = decode_user_cursor(cursor)
+        # Row-value comparison so Postgres can seek directly in the index
+        stmt = stmt.where(
+            tuple_(User.created_at, User.id)
+            > tuple_(literal(created_at, User.created_at.type), literal(user_id, User.id.type))
+        )
+
+    rows = list((await db.execute(stmt)).all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_user_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
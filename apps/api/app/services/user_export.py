@@ -0,0 +1,90 @@
+"""Streaming bulk export of users."""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.user import User
+from app.services.user import USER_PUBLIC_COLUMNS
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_FIELDS = [column.key for column in USER_PUBLIC_COLUMNS]
+
+
+def _json_default(value: Any) -> str:
+    """Encode timestamps and UUIDs the way the API responses do."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Cannot export value of type {type(value).__name__}")
+
+
+def _encode_ndjson(rows: Sequence[Row]) -> bytes:
+    """Encode a batch of rows as newline-delimited JSON."""
+    lines = [
+        json.dumps(row._asdict(), default=_json_default, separators=(",", ":")) for row in rows
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _encode_csv(rows: Sequence[Row], header: bool) -> bytes:
+    """Encode a batch of rows as CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def export_users(
+    session_maker: async_sessionmaker[AsyncSession],
+    fmt: str = "ndjson",
+    batch_size: int = 1000,
+) -> AsyncIterator[bytes]:
+    """
+    Stream every user as NDJSON or CSV chunks.
+
+    Rows come from a server-side cursor (``AsyncSession.stream`` with
+    ``yield_per``), one batch per chunk, so memory stays constant regardless
+    of table size. The generator only fetches the next batch after the
+    previous chunk was consumed, so a slow client slows the query down
+    instead of buffering rows.
+
+    The session is opened here rather than taken from the request because it
+    must outlive the endpoint function while the response streams.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    stmt = (
+        select(*USER_PUBLIC_COLUMNS)
+        .order_by(User.created_at, User.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    async with session_maker() as session:
+        result = await session.stream(stmt)
+        first = True
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield _encode_csv(rows, header=first)
+            else:
+                yield _encode_ndjson(rows)
+            first = False
+
+        if first and fmt == "csv":
+            yield _encode_csv([], header=True)
@@ -0,0 +1,211 @@
+"""Bulk user import pipeline."""
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from asyncpg.exceptions import UniqueViolationError
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.hashing import PasswordHashPool
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.schemas.user import UserCreate
+
+logger = logging.getLogger(__name__)
+
+# Columns written on import; created_at/updated_at use server defaults
+IMPORT_COLUMNS = ["id", "email", "hashed_password", "full_name", "is_active", "is_superuser"]
+
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import."""
+
+    read: int = 0
+    invalid: int = 0
+    duplicates: int = 0  # repeated within the input
+    existing: int = 0  # already in the database
+    inserted: int = 0
+    elapsed: float = 0.0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows read per second of wall time."""
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        """Record a rejected record (keeps the first MAX_REPORTED_ERRORS)."""
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def read_records(path: str | Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Stream (line number, record) pairs from a .jsonl/.ndjson or .csv file.
+
+    CSV files need a header row with at least ``email`` and ``password``.
+    """
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                yield line, row
+        else:
+            for line, raw in enumerate(f, start=1):
+                if raw.strip():
+                    try:
+                        yield line, json.loads(raw)
+                    except json.JSONDecodeError as e:
+                        yield line, {"__error__": f"Invalid JSON: {e.msg}"}
+
+
+def _batched(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+async def _insert_rows(session: AsyncSession, rows: list[dict[str, Any]], use_copy: bool) -> int:
+    """
+    Insert rows, skipping emails that already exist.
+
+    Uses asyncpg COPY when requested; if COPY hits a unique violation (a
+    concurrent registration), the batch is retried as a multi-row
+    INSERT ... ON CONFLICT DO NOTHING.
+
+    Returns:
+        Number of rows inserted
+    """
+    if use_copy:
+        try:
+            connection = await session.connection()
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                User.__tablename__,
+                records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+                columns=IMPORT_COLUMNS,
+            )
+            return len(rows)
+        except UniqueViolationError:
+            await session.rollback()
+
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    stmt = (
+        dialect.insert(User)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
+    )
+    result = await session.execute(stmt)
+    return len(result.all())
+
+
+async def import_users(
+    session_maker: async_sessionmaker[AsyncSession],
+    records: Iterable[tuple[int, dict[str, Any]]],
+    hash_pool: PasswordHashPool,
+    batch_size: int = 1000,
+    use_copy: bool | None = None,
+    dry_run: bool = False,
+) -> ImportReport:
+    """
+    Validate, hash and insert users in batches.
+
+    Per batch: records are validated against UserCreate, deduplicated within
+    the input and against the database with one ``IN`` query, hashed in
+    parallel on ``hash_pool``, then inserted with COPY or a multi-row
+    INSERT ... ON CONFLICT and committed.
+
+    Args:
+        session_maker: Session factory (writes go to the primary)
+        records: (line number, raw dict) pairs, e.g. from read_records
+        hash_pool: Pool to hash on; needs max_pending >= batch_size
+        batch_size: Records per batch/transaction
+        use_copy: Force COPY on/off (default: COPY when the driver is asyncpg)
+        dry_run: Validate and dedupe only, insert nothing
+    """
+    report = ImportReport()
+    seen: set[str] = set()
+    start = time.perf_counter()
+
+    for batch in _batched(records, batch_size):
+        report.read += len(batch)
+
+        valid: list[UserCreate] = []
+        for line, record in batch:
+            if "__error__" in record:
+                report.add_error(line, record["__error__"])
+                continue
+            try:
+                user_in = UserCreate.model_validate(record)
+            except ValidationError as e:
+                report.add_error(line, "; ".join(err["msg"] for err in e.errors()))
+                continue
+            if user_in.email in seen:
+                report.duplicates += 1
+                continue
+            seen.add(user_in.email)
+            valid.append(user_in)
+
+        if not valid:
+            continue
+
+        async with session_maker() as session:
+            result = await session.execute(
+                select(User.email).where(User.email.in_([u.email for u in valid]))
+            )
+            existing = set(result.scalars().all())
+        report.existing += len(existing)
+        valid = [u for u in valid if u.email not in existing]
+        if not valid or dry_run:
+            continue
+
+        # Hash outside any session so no connection is held meanwhile
+        hashes = await asyncio.gather(
+            *(hash_pool.run(get_password_hash, u.password) for u in valid)
+        )
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "email": u.email,
+                "hashed_password": hashed,
+                "full_name": u.full_name,
+                "is_active": True,
+                "is_superuser": False,
+            }
+            for u, hashed in zip(valid, hashes)
+        ]
+
+        async with session_maker() as session:
+            copy = use_copy
+            if copy is None:
+                copy = session.bind.dialect.driver == "asyncpg"
+            inserted = await _insert_rows(session, rows, copy)
+            await session.commit()
+
+        # Rows lost to a concurrent insert between the check and the write
+        report.existing += len(rows) - inserted
+        report.inserted += inserted
+
+        logger.info(
+            f"Imported batch: {report.inserted} inserted, {report.read} read "
+            f"({report.read / (time.perf_counter() - start):,.0f} rows/s)"
+        )
+
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,197 @@
+"""Benchmark the vectorized backtest engine against a per-candle loop.
+
+Generates a synthetic random-walk 1m series, runs the same strategy through
+app.services.backtest and through a reference loop that steps candle by
+candle (the design in docs/04-backtesting/specs/simulation.md, with floats
+instead of Decimal), checks both produce the same trades and equity, and
+reports candles per second. Run from apps/api:
+
+    python scripts/bench_backtest.py --candles 525600
+"""
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app.schemas.backtest import CompoundCondition, StrategySpec  # noqa: E402
+from app.services.backtest import (  # noqa: E402
+    Candles,
+    compute_indicators,
+    compute_metrics,
+    generate_signals,
+    simulate,
+)
+
+STRATEGY = {
+    "indicators": {
+        "rsi": {"indicator": "RSI", "period": 14},
+        "fast": {"indicator": "EMA", "period": 12},
+        "slow": {"indicator": "SMA", "period": 50},
+    },
+    "entry": {
+        "operator": "AND",
+        "conditions": [
+            {"operator": "<", "left": "rsi", "right": "35"},
+            {"operator": ">", "left": "fast", "right": "slow"},
+        ],
+    },
+    "exit": {
+        "operator": "OR",
+        "conditions": [
+            {"operator": ">", "left": "rsi", "right": "65"},
+            {"operator": "crosses_below", "left": "fast", "right": "slow"},
+        ],
+    },
+    "stop_loss": 0.01,
+    "take_profit": 0.02,
+}
+
+
+def synthetic_candles(n: int, seed: int = 7) -> Candles:
+    """Random-walk 1m candles starting at 30000."""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0007, (2, n)))
+    return Candles.from_columns(
+        timestamp=1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000,
+        open=open_,
+        high=np.maximum(open_, close) * (1 + wick[0]),
+        low=np.minimum(open_, close) * (1 - wick[1]),
+        close=close,
+        volume=rng.uniform(1, 10, n),
+    )
+
+
+def reference_loop(
+    spec: StrategySpec,
+    candles: Candles,
+    initial_capital: float,
+    fee_rate: float,
+    slippage_rate: float,
+) -> tuple[list[float], list[tuple[int, int, float]]]:
+    """Step through candles one at a time with scalar portfolio state."""
+    series = {name: values.tolist() for name, values in compute_indicators(spec, candles).items()}
+    open_, high, low, close = (series[c] for c in ("open", "high", "low", "close"))
+    n = len(close)
+
+    def value(operand: str, t: int) -> float:
+        if operand in series:
+            return series[operand][t] if t >= 0 else math.nan
+        return float(operand)
+
+    def holds(condition, t: int) -> bool:
+        if isinstance(condition, CompoundCondition):
+            parts = (holds(part, t) for part in condition.conditions)
+            return all(parts) if condition.operator == "AND" else any(parts)
+        left, right = value(condition.left, t), value(condition.right, t)
+        before = value(condition.left, t - 1), value(condition.right, t - 1)
+        match condition.operator:
+            case ">":
+                return left > right
+            case "<":
+                return left < right
+            case ">=":
+                return left >= right
+            case "<=":
+                return left <= right
+            case "==":
+                return left == right
+            case "!=":
+                return left != right and not math.isnan(left - right)
+            case "crosses_above":
+                return left > right and before[0] <= before[1]
+            case "crosses_below":
+                return left < right and before[0] >= before[1]
+
+    cash, quantity, allocated, entry = initial_capital, 0.0, 0.0, -1
+    stop_price = target_price = 0.0
+    equity: list[float] = []
+    trades: list[tuple[int, int, float]] = []
+    for t in range(n):
+        exit_signal = spec.exit is not None and holds(spec.exit, t)
+        if quantity:
+            price = None
+            if spec.stop_loss is not None and low[t] <= stop_price:
+                price = min(open_[t], stop_price)
+            elif spec.take_profit is not None and high[t] >= target_price:
+                price = max(open_[t], target_price)
+            elif exit_signal or t == n - 1:
+                price = close[t]
+            if price is not None:
+                proceeds = quantity * price * (1 - slippage_rate) * (1 - fee_rate)
+                trades.append((entry, t, proceeds - allocated))
+                cash += proceeds
+                quantity = 0.0
+        elif not exit_signal and t < n - 1 and holds(spec.entry, t):
+            fill = close[t] * (1 + slippage_rate)
+            allocated = cash * spec.position_size
+            quantity = allocated / (fill * (1 + fee_rate))
+            cash -= allocated
+            entry = t
+            stop_price = fill * (1 - (spec.stop_loss or 0))
+            target_price = fill * (1 + (spec.take_profit or 0))
+        equity.append(cash + quantity * close[t])
+    return equity, trades
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candles", type=int, default=525_600, help="Default: one year of 1m")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    spec = StrategySpec.model_validate(STRATEGY)
+    candles = synthetic_candles(args.candles)
+    settings = {"initial_capital": 10000.0, "fee_rate": 0.001, "slippage_rate": 0.0005}
+
+    def vectorized():
+        entries, exits = generate_signals(spec, candles)
+        return simulate(
+            candles,
+            entries,
+            exits,
+            position_size=spec.position_size,
+            stop_loss=spec.stop_loss,
+            take_profit=spec.take_profit,
+            **settings,
+        )
+
+    simulation = vectorized()
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        vectorized()
+        timings.append(time.perf_counter() - start)
+    vector_time = min(timings)
+
+    start = time.perf_counter()
+    equity, trades = reference_loop(spec, candles, **settings)
+    loop_time = time.perf_counter() - start
+
+    # Both engines must agree before speed means anything
+    assert len(trades) == len(simulation.trades), (len(trades), len(simulation.trades))
+    assert [(a, b) for a, b, _ in trades] == list(
+        zip(simulation.trades.entry_index.tolist(), simulation.trades.exit_index.tolist())
+    )
+    np.testing.assert_allclose(simulation.equity, equity, rtol=1e-9)
+    metrics = compute_metrics(candles.timestamp, simulation, settings["initial_capital"])
+
+    print(
+        f"candles: {len(candles)}  trades: {metrics.total_trades}  "
+        f"return: {metrics.total_return:.2%}  mdd: {metrics.mdd:.2%}"
+    )
+    print(f"{'engine':<12} {'seconds':>9} {'candles/s':>14}")
+    print(f"{'loop':<12} {loop_time:>9.3f} {len(candles) / loop_time:>14,.0f}")
+    print(f"{'vectorized':<12} {vector_time:>9.3f} {len(candles) / vector_time:>14,.0f}")
+    print(f"speedup: {loop_time / vector_time:.1f}x (results match)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark event loop responsiveness while backtest jobs run.
+
+Submits a batch of backtests over synthetic candles to the job manager
+(temporary SQLite database, in-memory event broker) in thread and process
+mode and samples how late a 10 ms timer fires on the event loop meanwhile,
+which is the delay every other request would see. Run from apps/api:
+
+    python scripts/bench_backtest_jobs.py --jobs 4 --candles 100000
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bench_backtest import synthetic_candles  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.job_events import JobEventBroker  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.backtest import BacktestRequest  # noqa: E402
+from app.services.backtest_jobs import BacktestJobManager  # noqa: E402
+
+STRATEGY = {
+    "indicators": {
+        "rsi": {"indicator": "RSI", "period": 14},
+        "macd": {"indicator": "MACD"},
+        "stoch": {"indicator": "STOCHASTIC"},
+    },
+    "entry": {"operator": "<", "left": "rsi", "right": "30"},
+    "exit": {"operator": ">", "left": "stoch.k", "right": "80"},
+}
+
+
+async def lag_monitor(stop: asyncio.Event, interval: float = 0.01) -> list[float]:
+    """Sample how late a periodic timer fires, in ms."""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+    return lags
+
+
+async def run(mode: str, url: str, request: BacktestRequest, jobs: int) -> None:
+    """Run a batch of jobs in one mode and report timings."""
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_maker() as session:
+        user = User(id=uuid.uuid4(), email="bench@example.com", hashed_password="x")
+        session.add(user)
+        await session.commit()
+
+    events = JobEventBroker()
+    manager = BacktestJobManager(
+        session_maker, events, mode=mode, max_pending=jobs, per_user=jobs
+    )
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(lag_monitor(stop))
+
+    start = time.perf_counter()
+    ids = [await manager.submit(user.id, request) for _ in range(jobs)]
+
+    async def wait(backtest_id: uuid.UUID) -> str:
+        last = ""
+        async for event in events.subscribe(str(backtest_id)):
+            if event is not None:
+                last = event["event"]
+        return last
+
+    outcomes = await asyncio.gather(*(wait(backtest_id) for backtest_id in ids))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = sorted(await monitor)
+    await manager.close()
+    await engine.dispose()
+
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+    print(
+        f"{mode:<8} {elapsed:>8.2f} {lags[len(lags) // 2]:>9.1f} {p99:>9.1f} "
+        f"{lags[-1]:>9.1f}  {', '.join(sorted(set(outcomes)))}"
+    )
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--candles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    candles = synthetic_candles(args.candles)
+    columns = {"timestamp": candles.timestamp, **candles.columns()}
+    request = BacktestRequest.model_validate(
+        {"strategy": STRATEGY, "candles": {n: c.tolist() for n, c in columns.items()}}
+    )
+    print(f"{args.jobs} jobs x {args.candles:,} candles")
+    print(f"{'mode':<8} {'total s':>8} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}  outcome")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("thread", "process"):
+            asyncio.run(run(mode, f"sqlite+aiosqlite:///{tmp}/bench.db", request, args.jobs))
+
+
+if __name__ == "__main__":
+    main()
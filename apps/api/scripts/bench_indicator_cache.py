@@ -0,0 +1,112 @@
+"""Benchmark backtests over a stored series with and without the indicator cache.
+
+Writes a synthetic 1m series to a temporary OHLCV store, then times
+repeated backtests of one strategy (as many users running the same market)
+with the cache disabled, cold and warm, and after new candles are appended
+(incremental extension versus recomputing from scratch). Checks that cached
+and uncached runs produce identical results. Run from apps/api:
+
+    python scripts/bench_indicator_cache.py --candles 525600
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bench_backtest import synthetic_candles  # noqa: E402
+
+from app.schemas.backtest import BacktestRequest  # noqa: E402
+from app.services.backtest import run_backtest  # noqa: E402
+from app.services.indicator_cache import IndicatorCache  # noqa: E402
+from app.services.ohlcv_store import OHLCVStore  # noqa: E402
+
+SYMBOL, TIMEFRAME = "BTC/USDT", "1m"
+
+STRATEGY = {
+    "indicators": {
+        "rsi": {"indicator": "RSI", "period": 14},
+        "macd": {"indicator": "MACD"},
+        "bb": {"indicator": "BOLLINGER", "period": 20},
+        "atr": {"indicator": "ATR", "period": 14},
+        "stoch": {"indicator": "STOCHASTIC"},
+        "slow": {"indicator": "SMA", "period": 200},
+    },
+    "entry": {
+        "operator": "AND",
+        "conditions": [
+            {"operator": "<", "left": "rsi", "right": "35"},
+            {"operator": "<", "left": "close", "right": "bb.lower"},
+            {"operator": ">", "left": "macd.histogram", "right": "macd.signal"},
+        ],
+    },
+    "exit": {
+        "operator": "OR",
+        "conditions": [
+            {"operator": ">", "left": "stoch.k", "right": "80"},
+            {"operator": "crosses_below", "left": "close", "right": "slow"},
+        ],
+    },
+    "stop_loss": 0.01,
+}
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    """Mean wall time of fn() in ms over repeat runs, and its last result."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candles", type=int, default=525_600, help="Default: one year of 1m")
+    parser.add_argument("--append", type=int, default=60, help="New candles per update")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    candles = synthetic_candles(args.candles + args.append)
+    request = BacktestRequest.model_validate(
+        {"strategy": STRATEGY, "market": {"symbol": SYMBOL, "timeframe": TIMEFRAME}}
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OHLCVStore(tmp)
+        store.append(SYMBOL, TIMEFRAME, candles[: args.candles])
+        uncached = IndicatorCache(max_bytes=0)
+        cache = IndicatorCache(max_bytes=512 * 1024 * 1024)
+
+        def run(with_cache: IndicatorCache):
+            return run_backtest(request, store, with_cache)
+
+        rows = []
+        baseline_ms, baseline = timed(lambda: run(uncached), args.repeat)
+        rows.append(("no cache", baseline_ms))
+        cold_ms, _ = timed(lambda: run(cache), 1)
+        rows.append(("cold", cold_ms))
+        warm_ms, warm = timed(lambda: run(cache), args.repeat)
+        rows.append(("warm", warm_ms))
+
+        store.append(SYMBOL, TIMEFRAME, candles[args.candles :])
+        extend_ms, extended = timed(lambda: run(cache), 1)
+        rows.append((f"+{args.append} candles", extend_ms))
+        recompute_ms, recomputed = timed(lambda: run(uncached), 1)
+        rows.append((f"+{args.append} no cache", recompute_ms))
+
+        assert warm.trades == baseline.trades and warm.metrics == baseline.metrics
+        assert extended.metrics.total_trades == recomputed.metrics.total_trades
+        assert abs(extended.metrics.total_return - recomputed.metrics.total_return) < 1e-9
+
+    print(f"candles: {args.candles:,}  trades: {baseline.metrics.total_trades}")
+    print(f"{'run':<18} {'ms':>9}")
+    for label, ms in rows:
+        print(f"{label:<18} {ms:>9.1f}")
+    print(f"warm speedup: {baseline_ms / warm_ms:.1f}x  cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark JSON response serialization paths.
+
+Calls minimal FastAPI routes directly over ASGI (no HTTP client or server) so
+the difference between variants is the response_model validation and
+serialization work. Payloads are a Token, a User and a 100-item UserPage.
+Run from apps/api:
+
+    python scripts/bench_json_response.py --requests 5000
+
+Variants:
+    json      response_class=JSONResponse: validate, dump to dicts, stdlib json
+    default   FastAPI's default response class (newer FastAPI serializes
+              response_model fields straight to bytes here)
+    fast      default_response_class=FastJSONResponse with response_model
+    direct    endpoint returns FastJSONResponse(model), no re-validation
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core.responses import HAS_ORJSON, FastJSONResponse  # noqa: E402
+from app.schemas.user import Token, User, UserPage  # noqa: E402
+
+VARIANTS = ["json", "default", "fast", "direct"]
+
+
+def make_user(i: int) -> User:
+    """Build a validated user schema object."""
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=i)
+    return User(
+        id=str(uuid.UUID(int=i)),
+        email=f"user{i}@example.com",
+        full_name=f"User {i}",
+        is_active=True,
+        is_superuser=False,
+        created_at=created,
+        updated_at=created,
+    )
+
+
+def make_payloads() -> dict[str, Any]:
+    """Return the payloads served by each route."""
+    return {
+        "token": Token(access_token="a" * 180, refresh_token="r" * 200),
+        "user": make_user(0),
+        "users": UserPage(items=[make_user(i) for i in range(100)], next_cursor="x" * 40),
+    }
+
+
+def make_endpoint(payload: Any, direct: bool) -> Any:
+    """Build a no-argument endpoint returning payload."""
+    if direct:
+        async def endpoint() -> Any:
+            return FastJSONResponse(payload)
+    else:
+        async def endpoint() -> Any:
+            return payload
+    return endpoint
+
+
+def build_app(variant: str, payloads: dict[str, Any]) -> FastAPI:
+    """Build an app serving every payload with the given variant."""
+    models = {"token": Token, "user": User, "users": UserPage}
+    if variant == "fast":
+        app = FastAPI(default_response_class=FastJSONResponse)
+    else:
+        app = FastAPI()
+
+    for name, payload in payloads.items():
+        kwargs: dict[str, Any] = {"response_model": models[name]}
+        if variant == "json":
+            kwargs["response_class"] = JSONResponse
+        endpoint = make_endpoint(payload, direct=variant == "direct")
+        app.add_api_route(f"/{name}", endpoint, methods=["GET"], **kwargs)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """Send one GET through the ASGI app and return the body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    body = bytearray()
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def run(requests: int) -> None:
+    """Time every variant/payload pair."""
+    payloads = make_payloads()
+    apps = {variant: build_app(variant, payloads) for variant in VARIANTS}
+
+    print(f"orjson: {'installed' if HAS_ORJSON else 'not installed (stdlib fallback)'}")
+    print(f"{'payload':<8} {'variant':<8} {'us/req':>10} {'bytes':>8} {'vs json':>8}")
+    for name in payloads:
+        baseline = None
+        for variant, app in apps.items():
+            body = await call(app, f"/{name}")
+            for _ in range(min(200, requests)):
+                await call(app, f"/{name}")
+
+            start = time.perf_counter()
+            for _ in range(requests):
+                await call(app, f"/{name}")
+            per_request = (time.perf_counter() - start) / requests * 1e6
+
+            baseline = baseline or per_request
+            print(
+                f"{name:<8} {variant:<8} {per_request:>10.1f} {len(body):>8} "
+                f"{baseline / per_request:>7.2f}x"
+            )
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
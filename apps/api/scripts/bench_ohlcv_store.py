@@ -0,0 +1,173 @@
+"""Benchmark loading candles from the OHLCV store against the ORM.
+
+Seeds a SQLite database with a synthetic 1m series (in a child process),
+syncs it into a temporary store, then times loading the full series and a
+one-week range three ways: ORM objects from ohlcv_data, a Core SELECT of
+float-cast columns, and memory-mapped store reads. Run from apps/api:
+
+    python scripts/bench_ohlcv_store.py --candles 525600
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+from sqlalchemy import Float, cast, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models.ohlcv import OHLCVData  # noqa: E402
+from app.schemas.backtest import OHLCV_COLUMNS  # noqa: E402
+from app.services.ohlcv_store import (  # noqa: E402
+    Candles,
+    OHLCVStore,
+    from_epoch_ms,
+    to_epoch_ms,
+)
+from app.services.ohlcv_sync import sync_series  # noqa: E402
+
+SYMBOL, TIMEFRAME = "BTC/USDT", "1m"
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WEEK_MS = 7 * 86_400_000
+
+
+async def seed(url: str, candles: int) -> None:
+    """Create ohlcv_data and insert a random walk."""
+    engine = create_async_engine(url)
+    rng = np.random.default_rng(7)
+    close = (30000 * np.exp(np.cumsum(rng.normal(0, 0.001, candles)))).round(2)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        batch = 20_000
+        for offset in range(0, candles, batch):
+            await conn.execute(
+                insert(OHLCVData),
+                [
+                    {
+                        "symbol": SYMBOL,
+                        "timeframe": TIMEFRAME,
+                        "timestamp": START + timedelta(minutes=i),
+                        "open": close[i - 1] if i else close[0],
+                        "high": close[i] + 5,
+                        "low": close[i] - 5,
+                        "close": close[i],
+                        "volume": 1.5,
+                    }
+                    for i in range(offset, min(offset + batch, candles))
+                ],
+            )
+    await engine.dispose()
+
+
+def seed_sync(url: str, candles: int) -> None:
+    """Seed in a separate process."""
+    asyncio.run(seed(url, candles))
+
+
+def timed(fn, repeat: int = 1) -> tuple[float, object]:
+    """Best wall time of fn() over repeat runs, and its last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+async def run(url: str, store_dir: str) -> None:
+    """Time each loading path."""
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    store = OHLCVStore(store_dir)
+    series = (OHLCVData.symbol == SYMBOL, OHLCVData.timeframe == TIMEFRAME)
+
+    start = time.perf_counter()
+    synced = await sync_series(session_maker, store, SYMBOL, TIMEFRAME)
+    print(f"sync: {synced:,} candles in {time.perf_counter() - start:.2f}s")
+
+    async def orm(lo=None, hi=None) -> Candles:
+        stmt = select(OHLCVData).where(*series).order_by(OHLCVData.timestamp)
+        if lo is not None:
+            stmt = stmt.where(OHLCVData.timestamp >= from_epoch_ms(lo))
+            stmt = stmt.where(OHLCVData.timestamp < from_epoch_ms(hi))
+        async with session_maker() as session:
+            rows = (await session.scalars(stmt)).all()
+        return Candles.from_columns(
+            [to_epoch_ms(row.timestamp) for row in rows],
+            **{name: [float(getattr(row, name)) for row in rows] for name in OHLCV_COLUMNS},
+        )
+
+    async def core(lo=None, hi=None) -> Candles:
+        stmt = (
+            select(
+                OHLCVData.timestamp,
+                *(cast(getattr(OHLCVData, name), Float) for name in OHLCV_COLUMNS),
+            )
+            .where(*series)
+            .order_by(OHLCVData.timestamp)
+        )
+        if lo is not None:
+            stmt = stmt.where(OHLCVData.timestamp >= from_epoch_ms(lo))
+            stmt = stmt.where(OHLCVData.timestamp < from_epoch_ms(hi))
+        async with session_maker() as session:
+            rows = (await session.execute(stmt)).all()
+        timestamps, *prices = zip(*rows)
+        return Candles.from_columns(
+            [to_epoch_ms(ts) for ts in timestamps], **dict(zip(OHLCV_COLUMNS, prices))
+        )
+
+    def mapped(lo=None, hi=None) -> Candles:
+        candles = store.read(SYMBOL, TIMEFRAME, lo, hi)
+        candles.close.sum()  # Touch the pages a backtest would
+        return candles
+
+    info = store.info(SYMBOL, TIMEFRAME)
+    week = (info.last_timestamp - WEEK_MS, info.last_timestamp + 1)
+    results = {}
+    for label, bounds in (("full", ()), ("1 week", week)):
+        start = time.perf_counter()
+        orm_candles = await orm(*bounds)
+        orm_time = time.perf_counter() - start
+        start = time.perf_counter()
+        core_candles = await core(*bounds)
+        core_time = time.perf_counter() - start
+        store_time, store_candles = timed(lambda: mapped(*bounds), repeat=20)
+
+        for candles in (core_candles, store_candles):
+            np.testing.assert_array_equal(candles.timestamp, orm_candles.timestamp)
+            np.testing.assert_allclose(candles.close, orm_candles.close)
+        results[label] = (len(orm_candles), orm_time, core_time, store_time)
+    await engine.dispose()
+
+    print(f"{'range':<8} {'candles':>9} {'orm s':>9} {'core s':>9} {'store ms':>9} {'vs orm':>9}")
+    for label, (n, orm_time, core_time, store_time) in results.items():
+        print(
+            f"{label:<8} {n:>9,} {orm_time:>9.3f} {core_time:>9.3f} "
+            f"{store_time * 1000:>9.3f} {orm_time / store_time:>8,.0f}x"
+        )
+    print(f"store: {store.stats()}")
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candles", type=int, default=525_600, help="Default: one year of 1m")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        seeder = multiprocessing.Process(target=seed_sync, args=(url, args.candles))
+        seeder.start()
+        seeder.join()
+        asyncio.run(run(url, f"{tmp}/store"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark a parameter sweep against running each candidate as a backtest.
+
+Sweeps RSI period and entry/exit thresholds (325 candidates) over
+synthetic candles, first as one run_backtest per candidate (indicators
+recomputed every time), then through the optimizer in thread and process
+mode, and checks that every candidate's metrics match. Then times the same
+sweep with walk-forward splits. Run from apps/api:
+
+    python scripts/bench_optimizer.py --candles 100000
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bench_backtest import synthetic_candles  # noqa: E402
+
+from app.schemas.backtest import (  # noqa: E402
+    BacktestRequest,
+    OptimizationRequest,
+    WalkForward,
+)
+from app.services.backtest import run_backtest  # noqa: E402
+from app.services.indicator_cache import IndicatorCache  # noqa: E402
+from app.services.ohlcv_store import OHLCVStore  # noqa: E402
+from app.services.optimizer import BacktestOptimizer, build_candidates  # noqa: E402
+
+STRATEGY = {
+    "indicators": {"rsi": {"indicator": "RSI", "period": 14}},
+    "entry": {"operator": "<", "left": "rsi", "right": "30"},
+    "exit": {"operator": ">", "left": "rsi", "right": "70"},
+    "stop_loss": 0.02,
+}
+
+PARAMETERS = [
+    {"path": "indicators.rsi.period", "min": 6, "max": 30, "step": 2},
+    {"path": "entry.right", "min": 20, "max": 40, "step": 5},
+    {"path": "exit.right", "min": 60, "max": 80, "step": 5},
+]
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candles", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU core")
+    args = parser.parse_args()
+
+    candles = synthetic_candles(args.candles)
+    data = {"timestamp": candles.timestamp.tolist()}
+    data.update({name: values.tolist() for name, values in candles.columns().items()})
+    request = OptimizationRequest.model_validate(
+        {"strategy": STRATEGY, "candles": data, "parameters": PARAMETERS, "top": 1000}
+    )
+    candidates = build_candidates(request)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OHLCVStore(tmp)
+        cache = IndicatorCache(max_bytes=0)
+
+        start = time.perf_counter()
+        baseline = {}
+        for params in candidates:
+            single = BacktestRequest.model_validate(
+                request.model_dump(include={"candles", "initial_capital", "fee_rate"})
+                | {"strategy": STRATEGY}
+            )
+            for path, value in params.items():
+                if path == "indicators.rsi.period":
+                    single.strategy.indicators["rsi"].period = value
+                elif path == "exit.right":
+                    single.strategy.exit.right = str(value)
+                else:
+                    single.strategy.entry.right = str(value)
+            baseline[tuple(params.values())] = run_backtest(single, store, cache).metrics
+        rows = [("run_backtest each", time.perf_counter() - start)]
+
+        for mode in ("thread", "process"):
+            optimizer = BacktestOptimizer(mode=mode, max_workers=args.workers)
+            # Start the workers outside the timing
+            asyncio.run(optimizer.optimize(request.model_copy(update={"top": 1}), store, cache))
+            start = time.perf_counter()
+            result = asyncio.run(optimizer.optimize(request, store, cache))
+            rows.append((f"optimizer {mode}", time.perf_counter() - start))
+            for row in result.rows:
+                assert row.metrics == baseline[tuple(row.params.values())], row.params
+
+            walk_forward = request.model_copy(update={"walk_forward": WalkForward(folds=4)})
+            start = time.perf_counter()
+            folds = asyncio.run(optimizer.optimize(walk_forward, store, cache))
+            rows.append(("  + walk-forward x4", time.perf_counter() - start))
+            optimizer.shutdown()
+
+    print(
+        f"candles: {args.candles:,}  candidates: {len(candidates)}  "
+        f"indicators: {result.indicators}  workers: {optimizer.max_workers}"
+    )
+    print(f"{'run':<20} {'s':>8} {'per candidate ms':>17}")
+    for label, seconds in rows:
+        print(f"{label:<20} {seconds:>8.2f} {seconds / len(candidates) * 1000:>17.2f}")
+    best = result.rows[0]
+    print(f"best: {best.params} sharpe {best.score:.2f}")
+    for fold in folds.folds:
+        print(
+            f"fold: {fold.params} in-sample sharpe {fold.in_sample.sharpe_ratio:.2f} "
+            f"out-of-sample {fold.out_of_sample.sharpe_ratio:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Local load benchmark for RateLimitMiddleware.
+
+Drives a minimal FastAPI app in-process through httpx's ASGI transport with
+and without the rate limiter. Redis is replaced by an in-memory script stub
+so only middleware overhead is measured. Run from apps/api:
+
+    python scripts/bench_rate_limit.py --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+from pathlib import Path
+
+os.environ["ENVIRONMENT"] = "production"  # the limiter is skipped in development
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.rate_limit import RateLimitMiddleware  # noqa: E402
+
+
+class StubRedis:
+    """Stands in for Redis: every script call allows the request."""
+
+    def register_script(self, script):
+        async def run(keys, args):
+            return [1, int(args[0]) - 1, 0, 1]
+
+        return run
+
+
+def build_app(with_limiter: bool) -> FastAPI:
+    """Create a one-route app, optionally behind the rate limiter."""
+    app = FastAPI()
+    # The middleware only reads resources.redis
+    app.state.resources = SimpleNamespace(redis=StubRedis())
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if with_limiter:
+        app.add_middleware(RateLimitMiddleware, default_limit=10**9)
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    """Send requests and return requests per second."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/ping")  # warm up
+
+        async def worker(n: int):
+            for _ in range(n):
+                await client.get("/ping")
+
+        per_worker = requests // concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = await run(build_app(False), args.requests, args.concurrency)
+    limited = await run(build_app(True), args.requests, args.concurrency)
+    print(f"no middleware        {baseline:9.0f} req/s")
+    print(f"RateLimitMiddleware  {limited:9.0f} req/s")
+    print(f"overhead             {(1 - limited / baseline) * 100:9.1f} %")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
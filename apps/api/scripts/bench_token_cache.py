@@ -0,0 +1,45 @@
+"""Microbenchmark: full JWT decode versus verified-token cache hit.
+
+Run from apps/api:
+
+    python scripts/bench_token_cache.py --iterations 100000
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from jose import jwt  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.security import create_access_token, verify_token  # noqa: E402
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    token = create_access_token(subject="7f1c1f9e-2f55-4c1e-9d1a-0c6f6f1d2a10")
+
+    def decode():
+        jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+    verify_token(token)  # populate cache
+
+    def cached():
+        verify_token(token)
+
+    decode_us = timeit.timeit(decode, number=args.iterations) / args.iterations * 1e6
+    cached_us = timeit.timeit(cached, number=args.iterations) / args.iterations * 1e6
+    print(f"jose decode + verify   {decode_us:8.2f} us/call")
+    print(f"cache hit              {cached_us:8.2f} us/call")
+    print(f"speedup                {decode_us / cached_us:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark streaming user export against full materialization.
+
+Seeds a SQLite database with synthetic users (in a child process, so the
+measured process only does the export), then exports it and reports rows
+per second and peak RSS. Run from apps/api:
+
+    python scripts/bench_user_export.py --rows 1000000 --mode stream
+    python scripts/bench_user_export.py --rows 1000000 --mode list
+"""
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.user import User as UserSchema  # noqa: E402
+from app.services.user_export import export_users  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(url: str, rows: int) -> None:
+    """Create the users table and insert synthetic rows."""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        batch = 10_000
+        for offset in range(0, rows, batch):
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        # Leading hex letter: SQLite gives the UUID column numeric
+                        # affinity and would coerce all-digit hex strings
+                        "id": uuid.UUID(int=(0xA << 124) | i),
+                        "email": f"user{i}@example.com",
+                        "hashed_password": "x" * 60,
+                        "full_name": f"User {i}",
+                        "is_active": True,
+                        "is_superuser": False,
+                        "created_at": start + timedelta(seconds=i),
+                        "updated_at": start + timedelta(seconds=i),
+                    }
+                    for i in range(offset, min(offset + batch, rows))
+                ],
+            )
+    await engine.dispose()
+
+
+def seed_sync(url: str, rows: int) -> None:
+    """Seed in a separate process."""
+    asyncio.run(seed(url, rows))
+
+
+async def run_export(url: str, mode: str) -> None:
+    """Export all users and report throughput and memory."""
+    engine = create_async_engine(url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    size = 0
+
+    if mode == "stream":
+        rows = 0
+        async for chunk in export_users(session_maker, fmt="ndjson", batch_size=1000):
+            size += len(chunk)
+            rows += chunk.count(b"\n")
+    else:
+        # Previous approach: load every ORM row, then validate into a list
+        async with session_maker() as session:
+            users = list((await session.execute(select(User))).scalars().all())
+            payload = [UserSchema.model_validate(user).model_dump_json() for user in users]
+            size = sum(len(item) for item in payload)
+            rows = len(users)
+
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    print(f"mode={mode} rows={rows} bytes={size}")
+    print(f"  {rows / elapsed:,.0f} rows/s ({elapsed:.1f}s)")
+    print(f"  peak RSS {peak_rss_mb():.0f} MB (baseline before export {rss_before:.0f} MB)")
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["stream", "list"], default="stream")
+    parser.add_argument("--db", default="/tmp/gr8diy_export_bench.db")
+    args = parser.parse_args()
+
+    url = f"sqlite+aiosqlite:///{args.db}"
+    if not Path(args.db).exists():
+        print(f"Seeding {args.rows:,} users into {args.db} ...")
+        child = multiprocessing.Process(target=seed_sync, args=(url, args.rows))
+        child.start()
+        child.join()
+
+    asyncio.run(run_export(url, args.mode))
+
+
+if __name__ == "__main__":
+    main()
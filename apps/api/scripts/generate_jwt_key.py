@@ -1,8 +1,26 @@
-"""Generate secure JWT secret key."""
+"""Generate secure JWT secret key or rotate asymmetric signing keys.
+
+    python scripts/generate_jwt_key.py                                 # HS256 secret
+    python scripts/generate_jwt_key.py --algorithm RS256 --keys-dir keys  # new key pair
+
+Each asymmetric run adds a new <kid>.pem to the key directory, which becomes
+the signing key on next restart (the newest key signs when JWT_ACTIVE_KID is
+empty). Older keys keep verifying tokens; all but the newest --keep keys are
+deleted, so keep at least one retiring key for a full refresh-token lifetime.
+"""
+import argparse
+import os
 import secrets
+from datetime import datetime, timezone
+from pathlib import Path
 
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
 
-def main():
+EC_CURVES = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+
+
+def generate_secret():
     """Generate and print a secure JWT secret key."""
     key = secrets.token_urlsafe(32)
     print("=" * 60)
@@ -15,5 +33,65 @@ def main():
     print("\nMake sure to keep this secret and never commit it to version control!")
 
 
+def generate_key_pair(algorithm: str, keys_dir: Path, keep: int):
+    """Write a new private key to keys_dir and prune the oldest ones."""
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ec.generate_private_key(EC_CURVES[algorithm]())
+
+    # Sortable kid: the newest key is last by name
+    kid = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}-{secrets.token_hex(2)}"
+    keys_dir.mkdir(parents=True, exist_ok=True)
+    path = keys_dir / f"{kid}.pem"
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+
+    existing = sorted(keys_dir.glob("*.pem"))
+    retired = existing[:-keep] if keep > 0 else []
+    for old in retired:
+        old.unlink()
+
+    print("=" * 60)
+    print(f"Generated {algorithm} key: {path}")
+    print("=" * 60)
+    print("Keys in ring (newest signs):")
+    for key_path in existing[len(retired):]:
+        print(f"  {key_path.name}")
+    for old in retired:
+        print(f"  removed {old.name}")
+    print("\nAdd this to your .env file:")
+    print(f"JWT_ALGORITHM={algorithm}")
+    print(f"JWT_KEYS_DIR={keys_dir}")
+    print("\nRestart the API to start signing with the new key.")
+    print("Never commit private keys to version control!")
+
+
+def main():
+    """Parse arguments and generate key material."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--algorithm",
+        default="HS256",
+        choices=["HS256", "RS256", "RS384", "RS512", *EC_CURVES],
+    )
+    parser.add_argument("--keys-dir", type=Path, help="Key ring directory (RS*/ES*)")
+    parser.add_argument("--keep", type=int, default=2, help="Keys to keep, including the new one")
+    args = parser.parse_args()
+
+    if args.algorithm.startswith("HS"):
+        generate_secret()
+    elif args.keys_dir is None:
+        parser.error("--keys-dir is required for asymmetric algorithms")
+    else:
+        generate_key_pair(args.algorithm, args.keys_dir, args.keep)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,72 @@
+"""Bulk import users from a JSONL or CSV file.
+
+Each record needs ``email`` and ``password`` (``full_name`` optional) and is
+validated with the same rules as POST /auth/register. Run from apps/api:
+
+    python scripts/import_users.py partners.jsonl --workers 8
+    python scripts/import_users.py partners.csv --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.hashing import PasswordHashPool  # noqa: E402
+from app.db.base import async_session_maker, engine  # noqa: E402
+from app.services.user_import import import_users, read_records  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Run the import and print a report."""
+    pool = PasswordHashPool(
+        mode=args.executor,
+        max_workers=args.workers,
+        max_pending=args.batch_size,
+    )
+    try:
+        report = await import_users(
+            async_session_maker,
+            read_records(args.path),
+            hash_pool=pool,
+            batch_size=args.batch_size,
+            use_copy=False if args.no_copy else None,
+            dry_run=args.dry_run,
+        )
+    finally:
+        pool.shutdown()
+        await engine.dispose()
+
+    print("=" * 60)
+    print(f"Read:        {report.read}")
+    print(f"Inserted:    {report.inserted}")
+    print(f"Existing:    {report.existing}")
+    print(f"Duplicates:  {report.duplicates}")
+    print(f"Invalid:     {report.invalid}")
+    print(f"Elapsed:     {report.elapsed:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+    print("=" * 60)
+    for line, message in report.errors:
+        print(f"line {line}: {message}")
+    return 1 if report.invalid else 0
+
+
+def main():
+    """Parse arguments and run import."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Input file (.jsonl, .ndjson or .csv)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    parser.add_argument("--no-copy", action="store_true", help="Use INSERT instead of COPY")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
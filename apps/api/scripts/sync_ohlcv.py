@@ -0,0 +1,74 @@
+"""Sync the columnar OHLCV store from the ohlcv_data table.
+
+Appends candles newer than what each series already holds; run it after
+every ingest (or from cron). Use --rebuild after correcting past candles in
+the database. Run from apps/api:
+
+    python scripts/sync_ohlcv.py
+    python scripts/sync_ohlcv.py --symbol BTC/USDT --timeframe 1h --rebuild
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.base import async_session_maker, engine  # noqa: E402
+from app.services.ohlcv_store import OHLCVStore  # noqa: E402
+from app.services.ohlcv_sync import list_series, sync_series  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Sync the selected series and print a report."""
+    store = OHLCVStore(args.store_dir) if args.store_dir else OHLCVStore.from_settings()
+    try:
+        async with async_session_maker() as session:
+            series = await list_series(session)
+        if args.symbol:
+            series = [item for item in series if item[0] == args.symbol]
+        if args.timeframe:
+            series = [item for item in series if item[1] == args.timeframe]
+        if not series:
+            print("No matching series in ohlcv_data")
+            return 1
+
+        for symbol, timeframe in series:
+            start = time.perf_counter()
+            written = await sync_series(
+                async_session_maker,
+                store,
+                symbol,
+                timeframe,
+                batch_size=args.batch_size,
+                rebuild=args.rebuild,
+            )
+            info = store.info(symbol, timeframe)
+            total = info.length if info else 0
+            print(
+                f"{symbol:<12} {timeframe:<4} +{written:<10,} total {total:<12,} "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main():
+    """Parse arguments and run sync."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbol", help="Only this symbol, e.g. BTC/USDT")
+    parser.add_argument("--timeframe", help="Only this timeframe, e.g. 1h")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--rebuild", action="store_true", help="Rewrite series from scratch")
+    parser.add_argument("--store-dir", help="Default: OHLCV_STORE_DIR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
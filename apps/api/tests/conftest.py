@@ -0,0 +1,64 @@
+"""Shared test fixtures."""
+import os
+import tempfile
+
+# Settings are read at import time, so configure them before importing the app
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-0123456789-abcdefghijklmnop")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='gr8diy-test-')}/app.db"
+)
+
+from collections.abc import AsyncIterator, Callable  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from fakeredis import FakeAsyncRedis  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.models.backtest  # noqa: E402, F401
+import app.models.ohlcv  # noqa: E402, F401
+import app.models.user  # noqa: E402, F401
+from app.db.base import Base  # noqa: E402
+from app.services.ohlcv_store import Candles  # noqa: E402
+
+
+@pytest.fixture
+async def redis() -> AsyncIterator[FakeAsyncRedis]:
+    """In-memory Redis with Lua scripting."""
+    client = FakeAsyncRedis()
+    yield client
+    await client.flushall()
+    await client.aclose()
+
+
+@pytest.fixture
+async def session_maker(tmp_path) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """Session factory over a fresh SQLite database with every table created."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def synthetic_candles(n: int, seed: int = 7) -> Candles:
+    """Random-walk 1m candles starting at 30000."""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.001, (2, n)))
+    return Candles.from_columns(
+        timestamp=1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000,
+        open=open_,
+        high=np.maximum(open_, close) * (1 + wick[0]),
+        low=np.minimum(open_, close) * (1 - wick[1]),
+        close=close,
+        volume=rng.uniform(1, 10, n),
+    )
+
+
+@pytest.fixture
+def make_candles() -> Callable[..., Candles]:
+    """Factory for synthetic candles: make_candles(n, seed=7)."""
+    return synthetic_candles
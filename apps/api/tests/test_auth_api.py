@@ -0,0 +1,91 @@
+"""Auth endpoints with an injected refresh-token store."""
+import httpx
+import pytest
+
+from app.core.deps import get_refresh_tokens, get_session_maker
+from app.core.refresh_tokens import RefreshTokenStore
+from app.core.security import create_access_token, create_refresh_token
+from app.main import app
+
+PREFIX = "/api/v1/auth"
+CREDENTIALS = {"email": "trader@example.com", "password": "Corr3ct-Horse-Battery!"}
+
+
+@pytest.fixture
+async def token_store(redis) -> RefreshTokenStore:
+    store = RefreshTokenStore(ttl_seconds=3600, key_prefix="test-refresh:")
+    store.bind_redis(redis)
+    return store
+
+
+@pytest.fixture
+async def client(session_maker, token_store):
+    app.dependency_overrides[get_session_maker] = lambda: session_maker
+    app.dependency_overrides[get_refresh_tokens] = lambda: token_store
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(f"{PREFIX}/register", json=CREDENTIALS)
+        assert response.status_code == 201
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    response = await client.post(f"{PREFIX}/login", json=CREDENTIALS)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def refresh(client: httpx.AsyncClient, refresh_token: str) -> httpx.Response:
+    client.cookies.clear()
+    return await client.post(f"{PREFIX}/refresh", json={"refresh_token": refresh_token})
+
+
+async def test_refresh_rotates_through_injected_store(client, token_store):
+    tokens = await login(client)
+
+    response = await refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != tokens["refresh_token"]
+
+    # The rotated token is spent; replaying it revokes the session
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+    assert (await refresh(client, response.json()["refresh_token"])).status_code == 401
+    assert token_store.issued == 1
+    assert token_store.reuse_detected == 1
+
+
+async def test_logout_revokes_session(client):
+    tokens = await login(client)
+
+    response = await client.post(
+        f"{PREFIX}/logout", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+
+async def test_logout_all_revokes_every_session(client):
+    first = await login(client)
+    second = await login(client)
+
+    response = await client.post(
+        f"{PREFIX}/logout/all", headers={"Authorization": f"Bearer {first['access_token']}"}
+    )
+    assert response.status_code == 200
+
+    assert (await refresh(client, first["refresh_token"])).status_code == 401
+    assert (await refresh(client, second["refresh_token"])).status_code == 401
+    assert (await refresh(client, (await login(client))["refresh_token"])).status_code == 200
+
+
+async def test_malformed_subject_is_unauthorized(client):
+    access = create_access_token("not-a-uuid")
+    response = await client.post(
+        f"{PREFIX}/logout/all", headers={"Authorization": f"Bearer {access}"}
+    )
+    assert response.status_code == 401
+
+    refresh_token = create_refresh_token("42", {"jti": "j", "fam": "f", "gen": 0})
+    assert (await refresh(client, refresh_token)).status_code == 401
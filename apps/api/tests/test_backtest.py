@@ -0,0 +1,270 @@
+"""Vectorized backtest engine, metrics and strategy validation."""
+import json
+import math
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.backtest import INDICATOR_OUTPUTS, CompoundCondition, StrategySpec
+from app.services.backtest import (
+    METRIC_LIMIT,
+    MS_PER_DAY,
+    Simulation,
+    Trades,
+    compute_indicators,
+    compute_metrics,
+    run_strategy,
+)
+from app.services.indicators import INDICATORS, run_indicator
+
+COSTS = {"initial_capital": 10000.0, "fee_rate": 0.001, "slippage_rate": 0.0005}
+
+STRATEGIES = {
+    "rsi_trend_with_stops": {
+        "indicators": {
+            "rsi": {"indicator": "RSI", "period": 14},
+            "fast": {"indicator": "EMA", "period": 12},
+            "slow": {"indicator": "SMA", "period": 50},
+        },
+        "entry": {
+            "operator": "AND",
+            "conditions": [
+                {"operator": "<", "left": "rsi", "right": "40"},
+                {"operator": ">", "left": "fast", "right": "slow"},
+            ],
+        },
+        "exit": {
+            "operator": "OR",
+            "conditions": [
+                {"operator": ">", "left": "rsi", "right": "60"},
+                {"operator": "crosses_below", "left": "fast", "right": "slow"},
+            ],
+        },
+        "stop_loss": 0.01,
+        "take_profit": 0.02,
+    },
+    "macd_cross": {
+        "indicators": {"macd": {"indicator": "MACD"}},
+        "entry": {"operator": "crosses_above", "left": "macd", "right": "macd.signal"},
+        "exit": {"operator": "crosses_below", "left": "macd.value", "right": "macd.signal"},
+        "position_size": 0.5,
+    },
+    "bollinger_reversion": {
+        "indicators": {
+            "bb": {"indicator": "BOLLINGER", "period": 20},
+            "stoch": {"indicator": "STOCHASTIC"},
+        },
+        "entry": {
+            "operator": "OR",
+            "conditions": [
+                {"operator": "<=", "left": "bb.percent_b", "right": "0"},
+                {"operator": "crosses_above", "left": "stoch.k", "right": "stoch.d"},
+            ],
+        },
+        "exit": {"operator": ">=", "left": "close", "right": "bb.middle"},
+        "stop_loss": 0.005,
+    },
+}
+
+
+def reference_loop(spec: StrategySpec, candles) -> tuple[list[float], list[tuple[int, int, float]]]:
+    """Step through candles one at a time with scalar portfolio state."""
+    series = {name: values.tolist() for name, values in compute_indicators(spec, candles).items()}
+    open_, high, low, close = (series[c] for c in ("open", "high", "low", "close"))
+    n = len(close)
+    fee_rate, slippage_rate = COSTS["fee_rate"], COSTS["slippage_rate"]
+
+    def value(operand: str, t: int) -> float:
+        if operand in series:
+            return series[operand][t] if t >= 0 else math.nan
+        return float(operand)
+
+    def holds(condition, t: int) -> bool:
+        if isinstance(condition, CompoundCondition):
+            parts = (holds(part, t) for part in condition.conditions)
+            return all(parts) if condition.operator == "AND" else any(parts)
+        left, right = value(condition.left, t), value(condition.right, t)
+        before = value(condition.left, t - 1), value(condition.right, t - 1)
+        match condition.operator:
+            case ">":
+                return left > right
+            case "<":
+                return left < right
+            case ">=":
+                return left >= right
+            case "<=":
+                return left <= right
+            case "==":
+                return left == right
+            case "!=":
+                return left != right and not math.isnan(left - right)
+            case "crosses_above":
+                return left > right and before[0] <= before[1]
+            case "crosses_below":
+                return left < right and before[0] >= before[1]
+
+    cash, quantity, allocated, entry = COSTS["initial_capital"], 0.0, 0.0, -1
+    stop_price = target_price = 0.0
+    equity: list[float] = []
+    trades: list[tuple[int, int, float]] = []
+    for t in range(n):
+        exit_signal = spec.exit is not None and holds(spec.exit, t)
+        if quantity:
+            price = None
+            if spec.stop_loss is not None and low[t] <= stop_price:
+                price = min(open_[t], stop_price)
+            elif spec.take_profit is not None and high[t] >= target_price:
+                price = max(open_[t], target_price)
+            elif exit_signal or t == n - 1:
+                price = close[t]
+            if price is not None:
+                proceeds = quantity * price * (1 - slippage_rate) * (1 - fee_rate)
+                trades.append((entry, t, proceeds - allocated))
+                cash += proceeds
+                quantity = 0.0
+        elif not exit_signal and t < n - 1 and holds(spec.entry, t):
+            fill = close[t] * (1 + slippage_rate)
+            allocated = cash * spec.position_size
+            quantity = allocated / (fill * (1 + fee_rate))
+            cash -= allocated
+            entry = t
+            stop_price = fill * (1 - (spec.stop_loss or 0))
+            target_price = fill * (1 + (spec.take_profit or 0))
+        equity.append(cash + quantity * close[t])
+    return equity, trades
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES.values(), ids=STRATEGIES.keys())
+def test_vectorized_engine_matches_reference_loop(strategy, make_candles):
+    spec = StrategySpec.model_validate(strategy)
+    candles = make_candles(5000)
+
+    simulation, metrics = run_strategy(spec, candles, **COSTS)
+    equity, trades = reference_loop(spec, candles)
+
+    assert len(trades) > 5
+    assert metrics.total_trades == len(trades)
+    assert simulation.trades.entry_index.tolist() == [entry for entry, _, _ in trades]
+    assert simulation.trades.exit_index.tolist() == [exit for _, exit, _ in trades]
+    np.testing.assert_allclose(simulation.trades.pnl, [pnl for _, _, pnl in trades], rtol=1e-9)
+    np.testing.assert_allclose(simulation.equity, equity, rtol=1e-9)
+
+
+def _simulation(pnl: list[float]) -> Simulation:
+    n = len(pnl)
+    index = np.arange(n, dtype=np.int64)
+    equity = 10000.0 + np.concatenate(([0.0], np.cumsum(pnl)))
+    trades = Trades(
+        entry_index=index,
+        exit_index=index + 1,
+        entry_price=np.ones(n),
+        exit_price=np.ones(n),
+        quantity=np.ones(n),
+        fees=np.zeros(n),
+        pnl=np.asarray(pnl, dtype=np.float64),
+        exit_reason=np.zeros(n, dtype=np.int8),
+    )
+    return Simulation(equity=equity, trades=trades)
+
+
+def test_streaks_skip_breakeven_trades():
+    pnl = [-5.0, 0.0, -1.0, -2.0, 3.0, 0.0, 4.0]
+    timestamps = 1_700_000_000_000 + np.arange(len(pnl) + 1, dtype=np.int64) * 60_000
+
+    metrics = compute_metrics(timestamps, _simulation(pnl), 10000.0)
+
+    assert metrics.max_loss_streak == 2
+    assert metrics.max_win_streak == 1
+    assert metrics.profit_factor == pytest.approx(7 / 8)
+
+
+def test_profit_factor_without_losses_is_none():
+    pnl = [1.0, 0.0, 2.0]
+    timestamps = 1_700_000_000_000 + np.arange(len(pnl) + 1, dtype=np.int64) * 60_000
+
+    metrics = compute_metrics(timestamps, _simulation(pnl), 10000.0)
+
+    assert metrics.profit_factor is None
+    assert metrics.max_loss_streak == 0
+
+
+def test_short_span_is_not_annualized():
+    # Doubling the capital over three 1m candles
+    pnl = [5000.0, 3000.0, 2000.0]
+    timestamps = 1_700_000_000_000 + np.arange(len(pnl) + 1, dtype=np.int64) * 60_000
+
+    metrics = compute_metrics(timestamps, _simulation(pnl), 10000.0)
+
+    assert metrics.total_return == pytest.approx(1.0)
+    assert metrics.cagr == metrics.total_return
+    dumped = metrics.model_dump(mode="json")
+    assert all(math.isfinite(v) for v in dumped.values() if isinstance(v, float))
+    json.dumps(dumped, allow_nan=False)
+
+
+def test_cagr_annualizes_and_saturates():
+    timestamps = np.array([0, 365 * MS_PER_DAY // 2], dtype=np.int64)
+
+    doubled = compute_metrics(timestamps, _simulation([10000.0]), 10000.0)
+    assert doubled.cagr == pytest.approx(3.0)
+
+    month = np.array([0, 31 * MS_PER_DAY], dtype=np.int64)
+    huge = compute_metrics(month, _simulation([1e12]), 1.0)
+    assert huge.cagr == pytest.approx(METRIC_LIMIT - 1)
+    assert math.isfinite(huge.calmar_ratio)
+
+
+def _spec(left: str, right: str = "0", **indicators) -> dict:
+    return {
+        "indicators": indicators,
+        "entry": {"operator": ">", "left": left, "right": right},
+        "take_profit": 0.1,
+    }
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        ("close", "open"),
+        ("rsi", "30"),
+        ("rsi.value", "1e1"),
+        ("macd.signal", "-0.5"),
+        ("bb.percent_b", "bb.upper"),
+    ],
+)
+def test_accepts_known_operands(left, right):
+    StrategySpec.model_validate(
+        _spec(
+            left,
+            right,
+            rsi={"indicator": "RSI"},
+            macd={"indicator": "MACD"},
+            bb={"indicator": "BOLLINGER"},
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "operand",
+    ["rsi.nope", "close.x", "macd.k", "volume.value", "price", "nan", "inf", "-inf"],
+)
+def test_rejects_unknown_operands(operand):
+    with pytest.raises(ValidationError):
+        StrategySpec.model_validate(
+            _spec(operand, rsi={"indicator": "RSI"}, macd={"indicator": "MACD"})
+        )
+
+
+@pytest.mark.parametrize("name", ["close", "my.rsi"])
+def test_rejects_ambiguous_indicator_names(name):
+    with pytest.raises(ValidationError):
+        StrategySpec.model_validate(_spec("close", **{name: {"indicator": "RSI"}}))
+
+
+@pytest.mark.parametrize("name", INDICATOR_OUTPUTS)
+def test_indicator_registry_matches_outputs(name, make_candles):
+    outputs, _ = run_indicator(name, {}, make_candles(100).columns())
+
+    assert tuple(outputs) == INDICATOR_OUTPUTS[name]
+    assert set(INDICATORS) == set(INDICATOR_OUTPUTS)
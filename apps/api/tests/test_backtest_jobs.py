@@ -0,0 +1,245 @@
+"""Backtest job queue: submission, quotas, cancellation and orphaned rows."""
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.core.deps import (
+    get_backtest_jobs,
+    get_current_active_user,
+    get_job_events,
+    get_session_maker,
+)
+from app.core.exceptions import RateLimitError, ServiceUnavailableError
+from app.core.job_events import JobEventBroker
+from app.core.principal_cache import Principal
+from app.main import app
+from app.models.backtest import Backtest
+from app.schemas.backtest import BacktestRequest
+from app.services import backtest_jobs as jobs_module
+from app.services.backtest_jobs import INTERRUPTED_ERROR, BacktestJobManager
+
+USER_ID = str(uuid.uuid4())
+
+STRATEGY = {
+    "indicators": {"fast": {"indicator": "EMA", "period": 5}, "slow": {"indicator": "SMA"}},
+    "entry": {"operator": "crosses_above", "left": "fast", "right": "slow"},
+    "exit": {"operator": "crosses_below", "left": "fast", "right": "slow"},
+}
+
+
+@pytest.fixture
+def request_body(make_candles) -> BacktestRequest:
+    candles = make_candles(500)
+    return BacktestRequest.model_validate(
+        {
+            "strategy": STRATEGY,
+            "candles": {"timestamp": candles.timestamp.tolist(), **candles.columns()},
+        }
+    )
+
+
+@pytest.fixture
+def gate(monkeypatch) -> threading.Event:
+    """Hold every job in its worker until set (thread executor only)."""
+    event = threading.Event()
+    run_backtest = jobs_module.run_backtest
+
+    def gated(*args, **kwargs):
+        event.wait(timeout=10)
+        return run_backtest(*args, **kwargs)
+
+    monkeypatch.setattr(jobs_module, "run_backtest", gated)
+    return event
+
+
+@pytest.fixture
+async def manager(session_maker):
+    manager = BacktestJobManager(
+        session_maker,
+        JobEventBroker(),
+        mode="thread",
+        max_workers=1,
+        max_pending=3,
+        per_user=2,
+        heartbeat=1.0,
+    )
+    yield manager
+    await manager.close(timeout=5)
+
+
+async def wait_for(manager: BacktestJobManager) -> None:
+    """Wait until no job is in flight."""
+    tasks = [job.task for job in manager._jobs.values() if job.task is not None]
+    if tasks:
+        await asyncio.wait(tasks, timeout=10)
+
+
+async def load(session_maker, backtest_id) -> Backtest:
+    async with session_maker() as session:
+        return await session.get(Backtest, backtest_id)
+
+
+async def test_submitted_job_runs_and_stores_result(manager, session_maker, request_body):
+    backtest_id = await manager.submit(USER_ID, request_body)
+    row = await load(session_maker, backtest_id)
+    assert row.status == "QUEUED"
+    assert row.worker_id == manager.worker_id
+    assert "candles" not in row.request
+
+    await wait_for(manager)
+
+    row = await load(session_maker, backtest_id)
+    assert row.status == "COMPLETED"
+    assert row.progress == 100
+    assert row.trade_count == row.result["metrics"]["total_trades"]
+    latest = await manager.events.latest(str(backtest_id))
+    assert latest["event"] == "completed"
+    assert manager.stats()["completed"] == 1
+
+
+async def test_per_user_quota(manager, request_body, gate):
+    await manager.submit(USER_ID, request_body)
+    await manager.submit(USER_ID, request_body)
+
+    with pytest.raises(RateLimitError):
+        await manager.submit(USER_ID, request_body)
+    # Other users still get in until the process-wide limit
+    await manager.submit(str(uuid.uuid4()), request_body)
+    with pytest.raises(ServiceUnavailableError):
+        await manager.submit(str(uuid.uuid4()), request_body)
+    assert manager.stats()["rejected"] == 2
+
+    gate.set()
+    await wait_for(manager)
+    await manager.submit(USER_ID, request_body)
+    await wait_for(manager)
+
+
+async def test_cancel_queued_and_running_jobs(manager, session_maker, request_body, gate):
+    running = await manager.submit(USER_ID, request_body)
+    queued = await manager.submit(USER_ID, request_body)
+
+    assert await manager.cancel(queued)
+    assert await manager.cancel(running)
+    gate.set()
+    await wait_for(manager)
+
+    for backtest_id in (running, queued):
+        row = await load(session_maker, backtest_id)
+        assert row.status == "CANCELLED"
+        assert (await manager.events.latest(str(backtest_id)))["event"] == "cancelled"
+    # Finished jobs can't be cancelled again
+    assert not await manager.cancel(running)
+    assert manager.stats()["in_flight"] == 0
+
+
+async def insert_row(session_maker, status: str, worker_id: str | None, age: float) -> uuid.UUID:
+    """Insert an active row as if written by another API process."""
+    backtest_id = uuid.uuid4()
+    async with session_maker() as session:
+        session.add(
+            Backtest(
+                id=backtest_id,
+                user_id=uuid.UUID(USER_ID),
+                request={},
+                status=status,
+                progress=40,
+                initial_capital=10000,
+                worker_id=worker_id,
+                heartbeat_at=datetime.now(timezone.utc) - timedelta(seconds=age),
+            )
+        )
+        await session.commit()
+    return backtest_id
+
+
+async def test_cancel_job_of_another_process(manager, session_maker):
+    backtest_id = await insert_row(session_maker, "RUNNING", "other", age=0)
+
+    assert await manager.cancel(backtest_id)
+    assert (await load(session_maker, backtest_id)).status == "CANCELLED"
+    assert not await manager.cancel(backtest_id)
+
+
+async def test_reap_fails_rows_of_dead_processes(manager, session_maker):
+    dead = await insert_row(session_maker, "RUNNING", "dead", age=60)
+    queued = await insert_row(session_maker, "QUEUED", None, age=60)
+    alive = await insert_row(session_maker, "RUNNING", "alive", age=0)
+    own = await insert_row(session_maker, "RUNNING", manager.worker_id, age=60)
+
+    assert await manager.reap_stale() == 2
+
+    for backtest_id in (dead, queued):
+        row = await load(session_maker, backtest_id)
+        assert row.status == "FAILED"
+        assert row.error_message == INTERRUPTED_ERROR
+        assert (await manager.events.latest(str(backtest_id)))["event"] == "failed"
+    for backtest_id in (alive, own):
+        assert (await load(session_maker, backtest_id)).status == "RUNNING"
+    assert await manager.reap_stale() == 0
+
+
+async def test_start_reaps_and_heartbeat_keeps_own_rows_fresh(
+    manager, session_maker, request_body, gate
+):
+    orphan = await insert_row(session_maker, "RUNNING", "dead", age=60)
+    await manager.start()
+    assert (await load(session_maker, orphan)).status == "FAILED"
+
+    backtest_id = await manager.submit(USER_ID, request_body)
+    submitted = (await load(session_maker, backtest_id)).heartbeat_at
+    await asyncio.sleep(1.5)
+    assert (await load(session_maker, backtest_id)).heartbeat_at > submitted
+
+    gate.set()
+    await wait_for(manager)
+
+
+@pytest.fixture
+async def client(manager, session_maker):
+    now = datetime.now(timezone.utc)
+    principal = Principal(
+        id=USER_ID,
+        email="trader@example.com",
+        is_active=True,
+        is_superuser=False,
+        full_name=None,
+        created_at=now,
+        updated_at=now,
+    )
+    app.dependency_overrides[get_current_active_user] = lambda: principal
+    app.dependency_overrides[get_session_maker] = lambda: session_maker
+    app.dependency_overrides[get_backtest_jobs] = lambda: manager
+    app.dependency_overrides[get_job_events] = lambda: manager.events
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def test_events_of_orphaned_job_end_with_failure(client, session_maker):
+    backtest_id = await insert_row(session_maker, "RUNNING", "dead", age=60)
+
+    response = await asyncio.wait_for(
+        client.get(f"/api/v1/backtests/{backtest_id}/events"), timeout=5
+    )
+
+    assert response.status_code == 200
+    assert response.text.startswith("event: failed\n")
+    assert INTERRUPTED_ERROR in response.text
+
+
+async def test_cancel_reports_final_status(client, manager, request_body):
+    response = await client.post("/api/v1/backtests/", json=request_body.model_dump(mode="json"))
+    assert response.status_code == 202
+    backtest_id = response.json()["backtest_id"]
+    await wait_for(manager)
+
+    response = await client.post(f"/api/v1/backtests/{backtest_id}/cancel")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Backtest already completed"
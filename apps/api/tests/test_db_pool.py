@@ -0,0 +1,58 @@
+"""Connection pool telemetry."""
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.instrumentation import metrics
+from app.db.pool import InstrumentedAsyncPool
+
+
+@pytest.fixture
+async def engine(request, tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    # Registry children are per label, so give every test its own pool name
+    engine.pool.set_name(request.node.name)
+    yield engine
+    await engine.dispose()
+
+
+async def test_pool_counts_overflow_and_timeouts(engine):
+    async with engine.connect() as first, engine.connect() as second:
+        await first.execute(text("SELECT 1"))
+        await second.execute(text("SELECT 1"))
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+
+    stats = engine.pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["checkins"] == 2
+    assert stats["overflow_events"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds"]["count"] == 3
+
+
+async def test_pool_metrics_are_exported(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    rendered = metrics.render()
+    label = f'{{pool="{engine.pool.metrics.name}"}}'
+    assert f"db_pool_wait_seconds_count{label} 1" in rendered
+    assert f"db_pool_timeouts_total{label} 0.0" in rendered
+    assert f"db_pool_overflow_connections_total{label} 0.0" in rendered
+
+
+async def test_metrics_survive_pool_recreation(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    assert engine.pool.metrics.name == "test_metrics_survive_pool_recreation"
+    assert engine.pool.stats()["checkouts"] == 1
@@ -0,0 +1,48 @@
+"""Health endpoints."""
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.core.deps import get_current_active_user
+from app.core.principal_cache import Principal
+from app.main import app
+
+
+def principal(is_superuser: bool) -> Principal:
+    now = datetime.now(timezone.utc)
+    return Principal(
+        id="00000000-0000-0000-0000-000000000001",
+        email="ops@example.com",
+        is_active=True,
+        is_superuser=is_superuser,
+        full_name=None,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def test_stats_require_a_superuser(client):
+    assert (await client.get("/health/stats")).status_code in (401, 403)
+
+    app.dependency_overrides[get_current_active_user] = lambda: principal(is_superuser=False)
+    assert (await client.get("/health/stats")).status_code == 403
+
+    app.dependency_overrides[get_current_active_user] = lambda: principal(is_superuser=True)
+    response = await client.get("/health/stats")
+    assert response.status_code == 200
+    assert "backtest_jobs" in response.json()
+
+
+async def test_liveness_stays_public(client):
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
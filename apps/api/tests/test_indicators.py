@@ -0,0 +1,114 @@
+"""Indicator chunking and the shared indicator cache."""
+import numpy as np
+import pytest
+
+from app.services.indicator_cache import IndicatorCache
+from app.services.indicators import INDICATORS, compute_indicator, ema, run_indicator, sma
+from app.services.ohlcv_store import SeriesInfo
+
+CONFIGS = [
+    ("SMA", {"period": 20}),
+    ("EMA", {"period": 50}),
+    ("RSI", {"period": 14}),
+    ("MACD", {}),
+    ("BOLLINGER", {"period": 20, "std_dev": 2.5}),
+    ("ATR", {"period": 10}),
+    ("STOCHASTIC", {"k_period": 14, "d_period": 3}),
+]
+
+
+def assert_outputs_equal(actual: dict, expected: dict) -> None:
+    assert actual.keys() == expected.keys()
+    for field, values in expected.items():
+        np.testing.assert_allclose(actual[field], values, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_configs_cover_every_indicator():
+    assert {name for name, _ in CONFIGS} == set(INDICATORS)
+
+
+@pytest.mark.parametrize("name, params", CONFIGS, ids=[name for name, _ in CONFIGS])
+@pytest.mark.parametrize("sizes", [(1, 999), (7, 13, 980), (500, 1, 1, 498)])
+def test_chunked_run_matches_full_series(name, params, sizes, make_candles):
+    candles = make_candles(sum(sizes))
+    expected = compute_indicator(name, params, candles.columns())
+
+    chunks: dict[str, list[np.ndarray]] = {}
+    state = None
+    start = 0
+    for size in sizes:
+        outputs, state = run_indicator(name, params, candles[start : start + size].columns(), state)
+        for field, values in outputs.items():
+            chunks.setdefault(field, []).append(values)
+        start += size
+
+    assert_outputs_equal({f: np.concatenate(parts) for f, parts in chunks.items()}, expected)
+
+
+def test_moving_averages_match_naive_definitions(make_candles):
+    close = make_candles(300).close
+
+    naive_sma = [close[i - 19 : i + 1].mean() for i in range(19, len(close))]
+    np.testing.assert_allclose(sma(close, 20)[19:], naive_sma, rtol=1e-12)
+    assert np.isnan(sma(close, 20)[:19]).all()
+
+    alpha, expected = 2 / 11, [close[0]]
+    for value in close[1:]:
+        expected.append(alpha * value + (1 - alpha) * expected[-1])
+    np.testing.assert_allclose(ema(close, 10), expected, rtol=1e-12)
+
+
+def info(length: int, generation: int = 0) -> SeriesInfo:
+    return SeriesInfo(symbol="BTC/USDT", timeframe="1m", length=length, generation=generation)
+
+
+def test_cache_extends_entries_with_new_candles(make_candles):
+    cache = IndicatorCache(max_bytes=10 * 1024 * 1024)
+    candles = make_candles(2000)
+    params = {"period": 14}
+
+    first = cache.get(info(1500), candles[:1500], "RSI", params)
+    second = cache.get(info(2000), candles, "rsi", {})
+    again = cache.get(info(2000), candles, "RSI", params)
+
+    assert (cache.misses, cache.extensions, cache.hits) == (1, 1, 1)
+    assert len(first["value"]) == 1500
+    assert_outputs_equal(second, compute_indicator("RSI", params, candles.columns()))
+    assert again["value"] is not second["value"]
+    assert not again["value"].flags.writeable
+
+
+def test_cache_keys_by_generation(make_candles):
+    cache = IndicatorCache(max_bytes=10 * 1024 * 1024)
+    candles = make_candles(100)
+
+    cache.get(info(100, generation=0), candles, "EMA", {})
+    cache.get(info(100, generation=1), candles, "EMA", {})
+
+    assert cache.misses == 2
+
+
+def test_cache_spills_evicted_entries_and_reloads_them(make_candles, tmp_path):
+    candles = make_candles(1000)
+    # Room for about one MACD entry (three float64 outputs)
+    cache = IndicatorCache(max_bytes=30_000, spill_dir=tmp_path / "spill")
+
+    expected = cache.get(info(1000), candles, "MACD", {})
+    cache.get(info(1000), candles, "BOLLINGER", {})
+    assert cache.evictions >= 1
+    assert cache.spills >= 1
+
+    reloaded = cache.get(info(1000), candles, "MACD", {})
+
+    assert cache.spill_hits == 1
+    assert_outputs_equal(reloaded, expected)
+
+
+def test_disabled_cache_computes_directly(make_candles):
+    cache = IndicatorCache(max_bytes=0)
+    candles = make_candles(100)
+
+    outputs = cache.get(info(100), candles, "SMA", {"period": 5})
+
+    assert_outputs_equal(outputs, compute_indicator("SMA", {"period": 5}, candles.columns()))
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,40 @@
+"""SQL statement timing for request metrics."""
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import instrumentation
+from app.core.instrumentation import RequestStats
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/metrics.db", pool_size=1)
+    # Installed directly: instrument_engine is a no-op while metrics are disabled
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", instrumentation._before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", instrumentation._after_cursor_execute)
+    yield engine
+    await engine.dispose()
+
+
+async def test_failed_statements_leave_no_timing_state(engine):
+    stats = RequestStats()
+    token = instrumentation._request_stats.set(stats)
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM missing"))
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("SELECT 1")) == 1
+            assert await conn.scalar(text("SELECT 2")) == 2
+            info = (await conn.get_raw_connection()).info
+    finally:
+        instrumentation._request_stats.reset(token)
+
+    # Only completed statements are counted, timed from their own start
+    assert stats.sql_queries == 2
+    assert 0 < stats.sql_seconds < 1
+    assert not any("start" in key for key in info)
@@ -0,0 +1,136 @@
+"""Memory-mapped OHLCV store: appends, crash recovery, rebuilds and range reads."""
+import numpy as np
+import pytest
+
+from app.services.ohlcv_store import COLUMN_DTYPES, OHLCVStore, time_window
+
+SYMBOL, TIMEFRAME = "BTC/USDT", "1m"
+START = 1_700_000_000_000
+MINUTE = 60_000
+
+
+@pytest.fixture
+def store(tmp_path) -> OHLCVStore:
+    return OHLCVStore(tmp_path / "ohlcv")
+
+
+def assert_candles_equal(actual, expected) -> None:
+    for name in COLUMN_DTYPES:
+        np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name))
+
+
+def test_append_skips_candles_already_stored(store, make_candles):
+    candles = make_candles(150)
+
+    assert store.append(SYMBOL, TIMEFRAME, candles[:100]) == 100
+    # Overlapping batch: only the 50 newer candles are written
+    assert store.append(SYMBOL, TIMEFRAME, candles[60:150]) == 50
+    assert store.append(SYMBOL, TIMEFRAME, candles[120:150]) == 0
+
+    info = store.info(SYMBOL, TIMEFRAME)
+    assert (info.length, info.version) == (150, 2)
+    assert (info.first_timestamp, info.last_timestamp) == (START, START + 149 * MINUTE)
+    assert_candles_equal(store.read(SYMBOL, TIMEFRAME), candles)
+
+
+def test_append_rejects_unordered_candles(store, make_candles):
+    candles = make_candles(10)
+    candles.timestamp[5] = candles.timestamp[4]
+
+    with pytest.raises(ValueError):
+        store.append(SYMBOL, TIMEFRAME, candles)
+    assert store.info(SYMBOL, TIMEFRAME) is None
+
+
+def test_uncommitted_tail_is_ignored_and_truncated(store, make_candles, tmp_path):
+    candles = make_candles(80)
+    store.append(SYMBOL, TIMEFRAME, candles[:50])
+    # An append that died after writing columns but before committing meta.json
+    directory = store._series_dir(SYMBOL, TIMEFRAME)
+    for name in COLUMN_DTYPES:
+        with open(store._column_path(directory, name, 0), "ab") as f:
+            f.write(b"\xff" * 8 * 7)
+
+    reopened = OHLCVStore(tmp_path / "ohlcv")
+    assert_candles_equal(reopened.read(SYMBOL, TIMEFRAME), candles[:50])
+
+    assert reopened.append(SYMBOL, TIMEFRAME, candles[50:]) == 30
+    assert_candles_equal(reopened.read(SYMBOL, TIMEFRAME), candles)
+    for name, dtype in COLUMN_DTYPES.items():
+        path = store._column_path(directory, name, 0)
+        assert path.stat().st_size == 80 * np.dtype(dtype).itemsize
+
+
+def test_rebuild_switches_generation_without_breaking_readers(store, make_candles):
+    old = make_candles(100, seed=1)
+    new = make_candles(60, seed=2)
+    store.append(SYMBOL, TIMEFRAME, old)
+    _, mapped = store.load(SYMBOL, TIMEFRAME)
+
+    store.rebuild(SYMBOL, TIMEFRAME, new)
+
+    info = store.info(SYMBOL, TIMEFRAME)
+    assert (info.generation, info.version, info.length) == (1, 2, 60)
+    directory = store._series_dir(SYMBOL, TIMEFRAME)
+    assert not store._column_path(directory, "close", 0).exists()
+    # The earlier mapping still reads the old files
+    assert_candles_equal(mapped, old)
+    assert_candles_equal(store.read(SYMBOL, TIMEFRAME), new)
+    assert store.maps == 2
+
+
+def test_load_maps_once_per_version(store, make_candles):
+    candles = make_candles(20)
+    store.append(SYMBOL, TIMEFRAME, candles[:10])
+
+    store.read(SYMBOL, TIMEFRAME)
+    store.read(SYMBOL, TIMEFRAME)
+    assert store.maps == 1
+
+    store.append(SYMBOL, TIMEFRAME, candles[10:])
+    assert len(store.read(SYMBOL, TIMEFRAME)) == 20
+    assert store.maps == 2
+
+
+def test_read_returns_half_open_time_range(store, make_candles):
+    candles = make_candles(100)
+    store.append(SYMBOL, TIMEFRAME, candles)
+
+    window = store.read(SYMBOL, TIMEFRAME, START + 10 * MINUTE, START + 20 * MINUTE)
+    assert_candles_equal(window, candles[10:20])
+    # Bounds between candles round inward; missing bounds are open
+    assert len(store.read(SYMBOL, TIMEFRAME, START + 10 * MINUTE + 1)) == 89
+    assert len(store.read(SYMBOL, TIMEFRAME, end=START + 5 * MINUTE + 1)) == 6
+    assert len(store.read(SYMBOL, TIMEFRAME, START + 200 * MINUTE)) == 0
+    assert not window.close.flags.writeable
+
+
+def test_time_window_binary_search():
+    timestamps = np.array([10, 20, 30, 40], dtype=np.int64)
+
+    assert time_window(timestamps, None, None) == slice(0, 4)
+    assert time_window(timestamps, 20, 40) == slice(1, 3)
+    assert time_window(timestamps, 15, 35) == slice(1, 3)
+    assert time_window(timestamps, 50, None) == slice(4, 4)
+
+
+def test_symbols_with_separators_stay_distinct(store, make_candles):
+    store.append("BTC/USDT", TIMEFRAME, make_candles(10, seed=1))
+    store.append("BTC-USDT", TIMEFRAME, make_candles(20, seed=2))
+
+    assert store.info("BTC/USDT", TIMEFRAME).length == 10
+    assert store.info("BTC-USDT", TIMEFRAME).length == 20
+    assert store.info("BTC_USDT", TIMEFRAME) is None
+    assert [info.symbol for info in store.series()] == ["BTC-USDT", "BTC/USDT"]
+
+
+@pytest.mark.parametrize("symbol", ["../etc", "BTC/USDT/X", ""])
+def test_rejects_invalid_symbols(store, symbol):
+    with pytest.raises(ValueError):
+        store.info(symbol, TIMEFRAME)
+
+
+def test_missing_series_raises(store):
+    assert store.info(SYMBOL, TIMEFRAME) is None
+    with pytest.raises(ValueError):
+        store.read(SYMBOL, TIMEFRAME)
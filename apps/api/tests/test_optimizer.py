@@ -0,0 +1,186 @@
+"""Parameter sweeps: candidates, walk-forward windows and ranking."""
+import math
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.backtest import (
+    BacktestMetrics,
+    OptimizationRequest,
+    ParameterRange,
+    WalkForward,
+)
+from app.services.indicator_cache import IndicatorCache
+from app.services.ohlcv_store import OHLCVStore
+from app.services.optimizer import (
+    BacktestOptimizer,
+    _objective,
+    build_candidates,
+    build_strategies,
+    walk_forward_windows,
+)
+
+STRATEGY = {
+    "indicators": {
+        "rsi": {"indicator": "RSI", "period": 14},
+        "fast": {"indicator": "EMA", "period": 12},
+    },
+    "entry": {"operator": "<", "left": "rsi", "right": "30"},
+    "exit": {"operator": "crosses_above", "left": "close", "right": "fast"},
+}
+
+
+def optimization(make_candles, n: int = 3000, **fields) -> OptimizationRequest:
+    candles = make_candles(n)
+    return OptimizationRequest.model_validate(
+        {
+            "strategy": STRATEGY,
+            "candles": {"timestamp": candles.timestamp.tolist(), **candles.columns()},
+            **fields,
+        }
+    )
+
+
+def metrics(**fields) -> BacktestMetrics:
+    values = dict.fromkeys(BacktestMetrics.model_fields, 0)
+    return BacktestMetrics.model_validate({**values, "total_trades": 5, **fields})
+
+
+async def run(request: OptimizationRequest, tmp_path, mode: str = "thread"):
+    optimizer = BacktestOptimizer(mode=mode, max_workers=2)
+    try:
+        return await optimizer.optimize(
+            request, OHLCVStore(tmp_path / "ohlcv"), IndicatorCache(max_bytes=0)
+        )
+    finally:
+        optimizer.shutdown()
+
+
+def test_grid_covers_every_combination():
+    request = OptimizationRequest.model_validate(
+        {
+            "strategy": STRATEGY,
+            "market": {"symbol": "BTC/USDT", "timeframe": "1m"},
+            "parameters": [
+                {"path": "indicators.rsi.period", "min": 10, "max": 20, "step": 5},
+                {"path": "stop_loss", "values": [0.01, 0.02]},
+            ],
+        }
+    )
+
+    candidates = build_candidates(request)
+
+    assert candidates == [
+        {"indicators.rsi.period": period, "stop_loss": stop}
+        for period in (10, 15, 20)
+        for stop in (0.01, 0.02)
+    ]
+    strategies = build_strategies(request.strategy, candidates)
+    assert strategies[-1].indicators["rsi"].params()["period"] == 20
+    assert strategies[-1].stop_loss == 0.02
+
+
+def test_random_search_is_repeatable_and_distinct():
+    fields = {
+        "strategy": STRATEGY,
+        "market": {"symbol": "BTC/USDT", "timeframe": "1m"},
+        "search": "random",
+        "samples": 50,
+        "seed": 3,
+    }
+    request = OptimizationRequest.model_validate(
+        {
+            **fields,
+            "parameters": [
+                {"path": "indicators.rsi.period", "min": 5, "max": 30},
+                {"path": "take_profit", "min": 0.01, "max": 0.05},
+            ],
+        }
+    )
+
+    candidates = build_candidates(request)
+
+    assert candidates == build_candidates(request)
+    assert len({tuple(c.values()) for c in candidates}) == 50
+    assert all(isinstance(c["indicators.rsi.period"], int) for c in candidates)
+    assert all(0.01 <= c["take_profit"] <= 0.05 for c in candidates)
+
+    # Only three distinct values exist; sampling stops instead of looping
+    small = OptimizationRequest.model_validate(
+        {**fields, "parameters": [{"path": "entry.right", "min": 20, "max": 40, "step": 10}]}
+    )
+    assert sorted(c["entry.right"] for c in build_candidates(small)) == [20, 30, 40]
+
+
+def test_parameter_range_bounds():
+    assert ParameterRange(path="stop_loss", min=0.01, max=0.03, step=0.01).grid() == [
+        0.01,
+        0.02,
+        0.03,
+    ]
+    with pytest.raises(ValueError):
+        ParameterRange(path="stop_loss", values=[0.01]).bounds
+    with pytest.raises(ValidationError):
+        ParameterRange(path="stop_loss", min=0.01)
+
+
+@pytest.mark.parametrize("anchored", [False, True])
+def test_walk_forward_windows_tile_the_range(anchored):
+    folds = walk_forward_windows(1000, WalkForward(folds=4, train_ratio=3, anchored=anchored))
+
+    tests = [test for _, test in folds]
+    assert tests == [(432, 574), (574, 716), (716, 858), (858, 1000)]
+    for (train_start, train_stop), (test_start, _) in folds:
+        assert train_stop == test_start
+        assert train_start == (0 if anchored else test_start - 426)
+
+
+def test_walk_forward_needs_enough_candles():
+    with pytest.raises(ValueError):
+        walk_forward_windows(20, WalkForward(folds=10))
+
+
+def test_objective_ranks_untraded_candidates_last():
+    assert math.isnan(_objective(metrics(total_trades=0, sharpe_ratio=0.0), "sharpe_ratio"))
+    assert _objective(metrics(profit_factor=None, win_rate=0.6), "profit_factor") == math.inf
+    # Only breakeven trades: no profit factor to speak of
+    assert math.isnan(_objective(metrics(profit_factor=None, win_rate=0.0), "profit_factor"))
+    assert _objective(metrics(profit_factor=1.5), "profit_factor") == 1.5
+
+
+@pytest.mark.parametrize("objective", ["profit_factor", "sharpe_ratio", "mdd"])
+async def test_candidates_without_trades_rank_last(objective, make_candles, tmp_path):
+    request = optimization(
+        make_candles,
+        parameters=[{"path": "entry.right", "values": [-5, 30, 45]}],
+        objective=objective,
+    )
+
+    result = await run(request, tmp_path)
+
+    assert [row.metrics.total_trades > 0 for row in result.rows] == [True, True, False]
+    assert result.rows[-1].params == {"entry.right": -5}
+    assert result.rows[-1].score is None
+
+
+async def test_process_pool_matches_thread_pool(make_candles, tmp_path):
+    request = optimization(
+        make_candles,
+        parameters=[
+            {"path": "indicators.rsi.period", "values": [7, 14, 21]},
+            {"path": "entry.right", "min": 25, "max": 35, "step": 5},
+        ],
+        walk_forward={"folds": 3, "train_ratio": 2},
+    )
+
+    threaded = await run(request, tmp_path, mode="thread")
+    processed = await run(request, tmp_path, mode="process")
+
+    assert threaded.candidates == 9
+    assert threaded.indicators == 4  # Three RSI periods and the shared EMA
+    assert len(threaded.folds) == 3
+    assert processed.model_dump(exclude={"elapsed_ms"}) == threaded.model_dump(
+        exclude={"elapsed_ms"}
+    )
+    scores = [row.score for row in threaded.rows if row.score is not None]
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,100 @@
+"""Two-tier principal cache and its invalidation on user changes."""
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from app.core.principal_cache import Principal, PrincipalCache, principal_cache
+from app.models.user import User
+
+
+@pytest.fixture
+def shared_cache(redis):
+    """The module-level cache the session listeners invalidate, backed by fakeredis."""
+    principal_cache.bind_redis(redis)
+    yield principal_cache
+    principal_cache.local.clear()
+    principal_cache.bind_redis(None)
+
+
+async def create_user(session_maker, email: str = "trader@example.com") -> Principal:
+    async with session_maker() as session:
+        user = User(email=email, hashed_password="x", full_name="Trader")
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return Principal.from_user(user)
+
+
+async def change_user(session_maker, user_id: str, commit: bool = True, **fields) -> None:
+    async with session_maker() as session:
+        user = await session.get(User, UUID(user_id))
+        for name, value in fields.items():
+            setattr(user, name, value)
+        await session.flush()
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+
+
+async def settle(cache: PrincipalCache) -> None:
+    """Wait for the Redis deletes scheduled by the commit listener."""
+    await asyncio.gather(*cache._pending)
+
+
+async def test_redis_tier_backfills_local_tier(redis, session_maker):
+    cache = PrincipalCache(local_maxsize=10, local_ttl=60, redis_ttl=60)
+    cache.bind_redis(redis)
+    principal = await create_user(session_maker)
+
+    await cache.set(principal)
+    # Another worker: empty local tier, same Redis
+    other = PrincipalCache(local_maxsize=10, local_ttl=60, redis_ttl=60)
+    other.bind_redis(redis)
+
+    assert await other.get(principal.id) == principal
+    assert other.local.get(principal.id) == principal
+    assert other.redis_hits == 1
+    assert 0 < await redis.ttl(cache.key_prefix + principal.id) <= 60
+
+    await cache.invalidate(principal.id)
+    other.local.delete(principal.id)
+    assert await other.get(principal.id) is None
+    assert other.redis_misses == 1
+
+
+@pytest.mark.parametrize("fields", [{"is_active": False}, {"is_superuser": True}])
+async def test_committed_user_change_evicts_principal(shared_cache, redis, session_maker, fields):
+    principal = await create_user(session_maker)
+    await shared_cache.set(principal)
+
+    await change_user(session_maker, principal.id, **fields)
+    # The local tier is cleared synchronously in after_commit
+    assert shared_cache.local.get(principal.id) is None
+    await settle(shared_cache)
+
+    assert await redis.get(shared_cache.key_prefix + principal.id) is None
+    assert await shared_cache.get(principal.id) is None
+
+
+async def test_deleted_user_evicts_principal(shared_cache, session_maker):
+    principal = await create_user(session_maker)
+    await shared_cache.set(principal)
+
+    async with session_maker() as session:
+        await session.delete(await session.get(User, UUID(principal.id)))
+        await session.commit()
+    await settle(shared_cache)
+
+    assert await shared_cache.get(principal.id) is None
+
+
+async def test_rolled_back_change_keeps_principal(shared_cache, session_maker):
+    principal = await create_user(session_maker)
+    await shared_cache.set(principal)
+
+    await change_user(session_maker, principal.id, commit=False, is_superuser=True)
+    await settle(shared_cache)
+
+    assert await shared_cache.get(principal.id) == principal
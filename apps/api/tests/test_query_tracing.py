@@ -0,0 +1,67 @@
+"""Per-request SQL tracing and query budgets."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.tracing import QueryBudgetExceededError, install_query_tracer, trace_queries
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/trace.db", pool_size=1)
+    install_query_tracer(engine.sync_engine)
+    yield engine
+    await engine.dispose()
+
+
+async def test_trace_counts_statements_and_repeats(engine):
+    with trace_queries(name="test") as trace:
+        async with engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+
+    assert trace.count == 4
+    assert trace.duplicates() == {"SELECT 1": 3}
+    assert trace.summary()["duplicates"] == 2
+    assert trace.violations() == []
+
+
+async def test_budget_violations_raise_or_log(engine, caplog):
+    with pytest.raises(QueryBudgetExceededError):
+        with trace_queries(budget=1):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+
+    with trace_queries(repeat_limit=1, action="log") as trace:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 1"))
+    assert len(trace.violations()) == 1
+    assert "Query budget exceeded" in caplog.text
+
+
+async def test_failed_statements_leave_no_trace_state(engine):
+    with trace_queries() as trace:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("SELECT * FROM missing"))
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            info = (await conn.get_raw_connection()).info
+
+    assert trace.count == 1
+    assert 0 < trace.seconds < 1
+    assert not any("start" in key for key in info)
+
+
+async def test_statements_outside_a_trace_are_ignored(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        with trace_queries() as trace:
+            await conn.execute(text("SELECT 2"))
+
+    assert dict(trace.statements) == {"SELECT 2": 1}
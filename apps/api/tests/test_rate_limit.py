@@ -0,0 +1,108 @@
+"""GCRA admission, leasing and degraded-mode fallback."""
+import pytest
+
+from app.core.rate_limit import HierarchicalRateLimiter, RateLimitMiddleware
+
+KEY = "rate_limit:test:bucket"
+
+
+class BrokenRedis:
+    """Redis client whose scripts always fail."""
+
+    def register_script(self, script: str):
+        async def run(keys, args):
+            raise ConnectionError("redis down")
+
+        return run
+
+
+async def drain(limiter, redis_client, limit: int, window: int = 60, attempts: int = 0):
+    """Run attempts (default 2 * limit) checks; return the results."""
+    return [
+        await limiter.check(redis_client, KEY, limit, window)
+        for _ in range(attempts or 2 * limit)
+    ]
+
+
+async def test_gcra_admits_burst_then_rejects(redis):
+    limiter = HierarchicalRateLimiter(lease_fraction=0)
+
+    results = await drain(limiter, redis, limit=5)
+
+    assert [r.allowed for r in results] == [True] * 5 + [False] * 5
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    # One request frees up every period / limit = 12 s
+    assert results[5].retry_after == 12
+    assert results[5].reset_after == 60
+    assert limiter.redis_calls == 10
+    assert limiter.rejected == 5
+
+
+async def test_lease_answers_locally_without_exceeding_limit(redis):
+    limiter = HierarchicalRateLimiter(lease_fraction=0.5)
+
+    results = await drain(limiter, redis, limit=10)
+
+    assert sum(r.allowed for r in results) == 10
+    assert [r.remaining for r in results[:10]] == list(range(9, -1, -1))
+    # Two leases of 5 cover the quota, then one call per rejection
+    assert limiter.local_decisions == 8
+    assert limiter.redis_calls == 2 + 10
+
+
+async def test_workers_share_the_global_limit(redis):
+    workers = [HierarchicalRateLimiter(lease_fraction=0.3) for _ in range(3)]
+
+    allowed = 0
+    for _ in range(10):
+        for limiter in workers:
+            result = await limiter.check(redis, KEY, 20, 60)
+            allowed += result.allowed
+
+    assert allowed == 20
+
+
+async def test_redis_failure_falls_back_to_local_share():
+    limiter = HierarchicalRateLimiter(local_workers=2, failure_mode="local")
+
+    results = await drain(limiter, BrokenRedis(), limit=10)
+
+    assert sum(r.allowed for r in results) == 5
+    assert limiter.redis_errors == 20
+    assert limiter.degraded_decisions == 20
+    assert results[-1].retry_after > 0
+
+
+async def test_missing_redis_uses_local_buckets():
+    limiter = HierarchicalRateLimiter(local_workers=1)
+
+    results = await drain(limiter, None, limit=3)
+
+    assert [r.allowed for r in results] == [True] * 3 + [False] * 3
+    assert limiter.redis_calls == 0
+
+
+async def test_fail_open_lets_requests_through():
+    limiter = HierarchicalRateLimiter(failure_mode="open")
+
+    assert await limiter.check(BrokenRedis(), KEY, 1, 60) is None
+    assert await limiter.check(None, KEY, 1, 60) is None
+
+
+def test_rejects_unknown_failure_mode():
+    with pytest.raises(ValueError):
+        HierarchicalRateLimiter(failure_mode="closed")
+
+
+def test_endpoint_rules_match_paths():
+    middleware = RateLimitMiddleware(
+        app=None,
+        default_limit=100,
+        window=60,
+        endpoint_limits={"/api/login": (5, 60), "/api/users/*/export": (2, 300)},
+    )
+
+    assert middleware._match("/api/login") == ("/api/login", 5, 60)
+    assert middleware._match("/api/login/") == ("/api/login", 5, 60)
+    assert middleware._match("/api/users/42/export") == ("/api/users/*/export", 2, 300)
+    assert middleware._match("/api/users/42/export/x") == ("/api/users/42/export/x", 100, 60)
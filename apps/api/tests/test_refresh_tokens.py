@@ -0,0 +1,95 @@
+"""Refresh-token rotation, reuse detection and logout-all."""
+import pytest
+
+from app.core.refresh_tokens import RefreshTokenStore
+
+USER_ID = "user-1"
+
+
+@pytest.fixture
+def store(redis) -> RefreshTokenStore:
+    store = RefreshTokenStore(ttl_seconds=3600, key_prefix="test-refresh:")
+    store.bind_redis(redis)
+    return store
+
+
+def token(claims: dict) -> dict:
+    """Build the decoded refresh-token payload the API hands to rotate()."""
+    return {"sub": USER_ID, "type": "refresh", **claims}
+
+
+async def test_rotate_issues_successor(store):
+    claims = await store.issue(USER_ID)
+
+    successor = await store.rotate(token(claims))
+
+    assert successor is not None
+    assert successor["fam"] == claims["fam"]
+    assert successor["jti"] != claims["jti"]
+    assert await store.rotate(token(successor)) is not None
+    assert store.rotated == 2
+
+
+async def test_reused_token_revokes_family(store):
+    claims = await store.issue(USER_ID)
+    successor = await store.rotate(token(claims))
+
+    # Replaying the rotated token kills the family, including the successor
+    assert await store.rotate(token(claims)) is None
+    assert await store.rotate(token(successor)) is None
+    assert store.reuse_detected == 1
+
+
+async def test_token_without_family_is_rejected(store):
+    claims = await store.issue(USER_ID)
+    del claims["fam"]
+
+    assert await store.rotate(token(claims)) is None
+    assert store.rejected == 1
+
+
+async def test_revoke_family_logs_out_one_session(store):
+    first = await store.issue(USER_ID)
+    second = await store.issue(USER_ID)
+
+    await store.revoke_family(token(first))
+
+    assert await store.rotate(token(first)) is None
+    assert await store.rotate(token(second)) is not None
+
+
+async def test_revoke_user_invalidates_all_families(store):
+    first = await store.issue(USER_ID)
+    second = await store.issue(USER_ID)
+
+    await store.revoke_user(USER_ID)
+
+    assert await store.rotate(token(first)) is None
+    assert await store.rotate(token(second)) is None
+    # Sessions started afterwards carry the new generation
+    fresh = await store.issue(USER_ID)
+    assert fresh["gen"] == 1
+    assert await store.rotate(token(fresh)) is not None
+
+
+async def test_generation_survives_repeated_revocation(store, redis):
+    key = store._generation_key(USER_ID)
+    await store.revoke_user(USER_ID)
+    claims = await store.issue(USER_ID)
+    assert claims["gen"] == 1
+    await store.revoke_user(USER_ID)
+
+    # The counter never expires, so it can't fall back to a generation in use
+    assert await redis.pttl(key) == -1
+    assert int(await redis.get(key)) == 2
+    assert await store.rotate(token(claims)) is None
+
+
+async def test_untracked_outside_production_accepts_signed_tokens():
+    store = RefreshTokenStore(ttl_seconds=3600)
+
+    claims = await store.issue(USER_ID)
+
+    assert claims["gen"] == 0
+    assert await store.rotate(token(claims)) is not None
+    await store.revoke_user(USER_ID)
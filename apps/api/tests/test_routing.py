@@ -0,0 +1,171 @@
+"""Read-replica choice, health checks and read-your-writes pinning."""
+import asyncio
+import contextvars
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.routing import (
+    ReadYourWritesMiddleware,
+    ReplicaSet,
+    primary_pinned,
+    routing_session_class,
+)
+
+metadata = MetaData()
+items = Table("items", metadata, Column("id", Integer, primary_key=True), Column("src", String))
+
+
+async def make_engine(path, src: str):
+    """SQLite engine whose items table holds one row naming the database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(items).values(src=src))
+    return engine
+
+
+@pytest.fixture
+async def databases(tmp_path):
+    primary = await make_engine(tmp_path / "primary.db", "primary")
+    replica_set = ReplicaSet(
+        [
+            await make_engine(tmp_path / "replica1.db", "replica1"),
+            await make_engine(tmp_path / "replica2.db", "replica2"),
+        ],
+        pin_seconds=30,
+    )
+    await replica_set.check()
+    session_maker = async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=routing_session_class(primary, replica_set),
+        expire_on_commit=False,
+    )
+    yield primary, replica_set, session_maker
+    await replica_set.stop()
+    await primary.dispose()
+
+
+async def read_source(session_maker) -> str:
+    async with session_maker() as session:
+        return (await session.execute(select(items.c.src).limit(1))).scalar_one()
+
+
+async def in_new_request(coroutine_function, *args):
+    """Run a coroutine in a fresh context, like a separate request."""
+    return await asyncio.create_task(coroutine_function(*args), context=contextvars.Context())
+
+
+async def test_round_robin_over_healthy_replicas(databases):
+    _, replica_set, _ = databases
+    first, second = replica_set.replicas
+
+    assert [replica_set.choose() for _ in range(3)] == [first, second, first]
+
+    second.healthy = False
+    assert [replica_set.choose() for _ in range(2)] == [first, first]
+    first.healthy = False
+    assert replica_set.choose() is None
+
+
+async def test_health_check_marks_unreachable_replica(tmp_path):
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/x.db")
+    replica_set = ReplicaSet([broken], max_lag=1)
+
+    await replica_set.check()
+
+    (replica,) = replica_set.replicas
+    assert not replica.healthy
+    assert replica.lag is None and replica.last_error
+    assert replica_set.choose() is None
+    assert replica_set.stats()[0]["healthy"] is False
+    await replica_set.stop()
+
+
+async def test_reads_go_to_replicas_and_writes_to_primary(databases):
+    _, _, session_maker = databases
+
+    assert await in_new_request(read_source, session_maker) in ("replica1", "replica2")
+
+    async with session_maker() as session:
+        await session.execute(insert(items).values(src="written"))
+        # Reads after a write in the same session see it
+        rows = (await session.execute(select(items.c.src))).scalars().all()
+        assert rows == ["primary", "written"]
+        await session.rollback()
+
+    async with session_maker() as session:
+        session.info["use_primary"] = True
+        assert (await session.execute(select(items.c.src))).scalars().first() == "primary"
+
+
+async def test_commit_pins_the_rest_of_the_request(databases):
+    _, _, session_maker = databases
+
+    async def request() -> str:
+        async with session_maker() as session:
+            await session.execute(insert(items).values(src="written"))
+            await session.commit()
+        assert primary_pinned()
+        return await read_source(session_maker)
+
+    assert await in_new_request(request) == "primary"
+    # Without a client, the pin ends with the request
+    assert await in_new_request(read_source, session_maker) != "primary"
+
+
+@pytest.mark.parametrize("shared", [False, True])
+async def test_client_pin_carries_over_to_later_requests(databases, redis, shared):
+    _, replica_set, session_maker = databases
+    if shared:
+        replica_set.bind_redis(redis)
+
+    async def request(client: str) -> str:
+        await replica_set.follow_client(client)
+        return await read_source(session_maker)
+
+    await replica_set.pin_client("user-1")
+
+    assert await in_new_request(request, "user-1") == "primary"
+    assert await in_new_request(request, "user-2") != "primary"
+    assert 0 < await replica_set.client_pin("user-1") <= 30
+    assert replica_set.pin_stats()["pinned_requests"] == 1
+    if shared:
+        # Another API process sees the pin through Redis
+        other = ReplicaSet([], pin_seconds=30)
+        other.bind_redis(redis)
+        assert await other.client_pin("user-1") > 0
+
+
+async def test_middleware_pins_client_after_a_write(databases):
+    _, replica_set, session_maker = databases
+
+    async def endpoint(scope, receive, send):
+        await replica_set.follow_client(scope["path"].strip("/"))
+        if scope["method"] == "POST":
+            async with session_maker() as session:
+                await session.execute(insert(items).values(src="written"))
+                await session.commit()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = ReadYourWritesMiddleware(endpoint, replicas=replica_set)
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent.append(await replica_set.client_pin("writer"))
+
+    async def call(method: str, client: str):
+        scope = {"type": "http", "method": method, "path": f"/{client}"}
+        await in_new_request(middleware, scope, None, send)
+
+    await call("GET", "writer")
+    assert await replica_set.client_pin("writer") == 0
+
+    await call("POST", "writer")
+    # Stored before the client saw the response
+    assert sent[-1] > 0
+    assert await replica_set.client_pin("reader") == 0
@@ -0,0 +1,49 @@
+"""Streaming user export in NDJSON and CSV."""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.user import User
+from app.services.user_export import EXPORT_FIELDS, export_users
+
+
+@pytest.fixture
+async def users(session_maker) -> list[User]:
+    async with session_maker() as session:
+        users = [User(email=f"user{i}@example.com", hashed_password="x") for i in range(3)]
+        session.add_all(users)
+        await session.commit()
+        return users
+
+
+async def export(session_maker, fmt: str) -> str:
+    chunks = [chunk async for chunk in export_users(session_maker, fmt, batch_size=2)]
+    return b"".join(chunks).decode()
+
+
+async def test_ndjson_uses_iso_timestamps_and_uuid_strings(session_maker, users):
+    records = [json.loads(line) for line in (await export(session_maker, "ndjson")).splitlines()]
+
+    assert sorted(record["email"] for record in records) == [user.email for user in users]
+    for record in records:
+        assert list(record) == EXPORT_FIELDS
+        assert uuid.UUID(record["id"])
+        assert "T" in record["created_at"]
+        assert datetime.fromisoformat(record["created_at"])
+
+
+async def test_csv_matches_ndjson_encoding(session_maker, users):
+    rows = list(csv.DictReader(io.StringIO(await export(session_maker, "csv"))))
+    records = [json.loads(line) for line in (await export(session_maker, "ndjson")).splitlines()]
+
+    assert len(rows) == 3
+    assert [row["created_at"] for row in rows] == [r["created_at"] for r in records]
+    assert [row["id"] for row in rows] == [r["id"] for r in records]
+
+
+async def test_empty_csv_has_header(session_maker):
+    assert (await export(session_maker, "csv")).splitlines() == [",".join(EXPORT_FIELDS)]
@@ -0,0 +1,119 @@
+"""Bulk user import: validation, deduplication and the ON CONFLICT fallback."""
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.core.hashing import PasswordHashPool
+from app.models.user import User
+from app.services.user_import import _insert_rows, import_users, read_records
+
+PASSWORD = "Corr3ct-Horse-Battery!"
+
+
+@pytest.fixture
+def hash_pool():
+    pool = PasswordHashPool(mode="thread", max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+class RacingHashPool(PasswordHashPool):
+    """Registers a user through another session while the batch is hashed."""
+
+    def __init__(self, session_maker, email: str):
+        super().__init__(mode="thread", max_workers=2)
+        self.session_maker = session_maker
+        self.email = email
+
+    async def run(self, func, *args):
+        if self.email is not None:
+            email, self.email = self.email, None
+            async with self.session_maker() as session:
+                session.add(User(email=email, hashed_password="x"))
+                await session.commit()
+        return await super().run(func, *args)
+
+
+def row(email: str) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "email": email,
+        "hashed_password": "x",
+        "full_name": None,
+        "is_active": True,
+        "is_superuser": False,
+    }
+
+
+async def emails(session_maker) -> list[str]:
+    async with session_maker() as session:
+        return sorted((await session.execute(select(User.email))).scalars().all())
+
+
+async def test_insert_skips_existing_emails(session_maker):
+    async with session_maker() as session:
+        session.add(User(email="taken@example.com", hashed_password="x"))
+        await session.commit()
+
+    async with session_maker() as session:
+        rows = [row("taken@example.com"), row("new@example.com")]
+        assert await _insert_rows(session, rows, use_copy=False) == 1
+        await session.commit()
+
+    assert await emails(session_maker) == ["new@example.com", "taken@example.com"]
+
+
+async def test_import_counts_invalid_duplicate_and_existing(session_maker, hash_pool, tmp_path):
+    async with session_maker() as session:
+        session.add(User(email="existing@example.com", hashed_password="x"))
+        await session.commit()
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                f'{{"email": "a@example.com", "password": "{PASSWORD}"}}',
+                f'{{"email": "existing@example.com", "password": "{PASSWORD}"}}',
+                "{not json",
+                f'{{"email": "a@example.com", "password": "{PASSWORD}"}}',
+                '{"email": "b@example.com", "password": "short"}',
+                f'{{"email": "c@example.com", "password": "{PASSWORD}", "full_name": "C"}}',
+            ]
+        )
+    )
+
+    report = await import_users(session_maker, read_records(path), hash_pool, batch_size=2)
+
+    assert (report.read, report.inserted) == (6, 2)
+    assert (report.invalid, report.duplicates, report.existing) == (2, 1, 1)
+    assert [line for line, _ in report.errors] == [3, 5]
+    assert await emails(session_maker) == [
+        "a@example.com",
+        "c@example.com",
+        "existing@example.com",
+    ]
+
+
+async def test_concurrent_registration_is_skipped_and_counted(session_maker):
+    records = [
+        (1, {"email": "a@example.com", "password": PASSWORD}),
+        (2, {"email": "b@example.com", "password": PASSWORD}),
+    ]
+    pool = RacingHashPool(session_maker, "b@example.com")
+    try:
+        # b@ passes the existence check, then conflicts on insert
+        report = await import_users(session_maker, records, pool)
+    finally:
+        pool.shutdown()
+
+    assert (report.inserted, report.existing) == (1, 1)
+    assert await emails(session_maker) == ["a@example.com", "b@example.com"]
+
+
+async def test_dry_run_inserts_nothing(session_maker, hash_pool):
+    records = [(1, {"email": "a@example.com", "password": PASSWORD})]
+
+    report = await import_users(session_maker, records, hash_pool, dry_run=True)
+
+    assert (report.read, report.inserted) == (1, 0)
+    assert await emails(session_maker) == []